@@ -0,0 +1,88 @@
+"""
+Compare parsing a log of bid Textbox commands with the InputValidation patterns and splitting the input, as
+UI._bid_action did before, with the single-pass command parser.
+
+    python -m benchmarks.bench_commands [--commands 100000] [--invalid 0.05]
+"""
+from benchmarks.common import timer, print_table
+from tjanseauktion.command import Bid, ParseError, parse_bid_command
+from tjanseauktion.currency import DEFAULT_RATES
+from tjanseauktion.validation import InputValidation
+
+import argparse
+import random
+from typing import List
+
+
+def command_log(n: int, invalid: float, n_teams: int = 8, seed: int = 0) -> List[str]:
+    """
+    :param invalid: share of commands which are mistyped
+    """
+    rng = random.Random(seed)
+    commands = []
+    for _ in range(n):
+        team = rng.randrange(n_teams)
+        r = rng.random()
+        if r < invalid:
+            commands.append(rng.choice([f'{team} 1:0:7', f'{team} iwn', f'{team}  ,,4', f'x{team} ,,1']))
+        elif r < .9:
+            amounts = ','.join(str(rng.randrange(30)) if rng.random() < .7 else '' for _ in range(3))
+            commands.append(f'{team} {amounts}')
+        else:
+            commands.append(f'{team} {rng.choice(["win", "free"])}')
+    return commands
+
+
+def parse_with_patterns(commands: List[str]) -> int:
+    n_valid = 0
+    for msg in commands:
+        if InputValidation.validate_bid_instant_win(msg):
+            int(msg.split()[0])
+        elif InputValidation.validate_bid_input(msg):
+            team, bid_str = msg.strip().split(' ')
+            int(team), DEFAULT_RATES.value([int(x) if x else None for x in bid_str.split(',')])
+            ':'.join(x if x else '0' for x in msg.split()[1].split(':')).strip()
+        elif InputValidation.validate_bid_freebie(msg):
+            int(msg.split()[0])
+        else:
+            continue
+        n_valid += 1
+    return n_valid
+
+
+def parse_single_pass(commands: List[str]) -> int:
+    n_valid = 0
+    for msg in commands:
+        command = parse_bid_command(msg)
+        if isinstance(command, Bid):
+            command.value()
+            command.bid_str
+        elif isinstance(command, ParseError):
+            continue
+        n_valid += 1
+    return n_valid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--commands', type=int, default=100000)
+    parser.add_argument('--invalid', type=float, default=.05)
+    args = parser.parse_args()
+
+    commands = command_log(args.commands, args.invalid)
+    results, n_valid = {}, {}
+    for name, parse in [('patterns', parse_with_patterns), ('single pass', parse_single_pass)]:
+        with timer(results, name):
+            n_valid[name] = parse(commands)
+
+    if n_valid['patterns'] != n_valid['single pass']:
+        raise AssertionError(f'parsers disagree: {n_valid}')
+
+    baseline = results['patterns']
+    print_table(['parser', 'commands', 'valid', 'ms', 'commands/s', 'speedup'],
+                [[name, len(commands), n_valid[name], f'{seconds * 1000:.0f}', f'{len(commands) / seconds:.0f}',
+                  f'{baseline / seconds:.2f}x'] for name, seconds in results.items()])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Measure auction generation over large synthetic chore lists, in particular with the amount of secrets
+approaching the amount of chores.
+
+    python -m benchmarks.bench_create_auctions [--chores 10000] [--secrets 10 5000 9990 10000] [--teams 30]
+"""
+from benchmarks.common import synthetic_chores, timer, print_table
+from tjanseauktion import constants
+from tjanseauktion.auction import Auction
+
+import argparse
+import random
+
+
+def run(n_chores: int, n_secrets: int, n_teams: int, repeat: int) -> list:
+    chores = synthetic_chores(n_chores)
+    results = {}
+
+    with timer(results, 'create'):
+        for i in range(repeat):
+            auctions = Auction.create_auctions(chores, n_secrets, n_teams, random.Random(i))
+    assert sum(1 for x in auctions if x.is_secret and x.chore.desc != constants.FREE_CHORE_DESC) == n_secrets
+
+    return [n_chores, n_secrets, f'{results["create"] / repeat * 1000:.2f}']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chores', type=int, default=10000)
+    parser.add_argument('--secrets', type=int, nargs='+', default=[10, 5000, 9990, 10000])
+    parser.add_argument('--teams', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = [run(args.chores, n, args.teams, args.repeat) for n in args.secrets]
+    print_table(['chores', 'secrets', 'create ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare peak memory and throughput of loading chores all at once, as Chore.load_chores did before streaming, with
+streaming them from a JSON array or JSON Lines, either into a list or one by one.
+
+    python -m benchmarks.bench_load_chores [--chores 10000 100000]
+"""
+from benchmarks.common import synthetic_chores_json, print_table
+from tjanseauktion.chore import Chore
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+
+def load_all_at_once(path: str) -> list:
+    with open(path, 'r') as f:
+        data = json.loads(f.read())
+
+    return [Chore.from_json(row) for row in data]
+
+
+def count(path: str) -> int:
+    return sum(1 for _ in Chore.iter_chores(path))
+
+
+def run(name: str, path: str, load: Callable, n_chores: int) -> list:
+    start = time.perf_counter()
+    load(path)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    load(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return [name, os.path.basename(path), n_chores, f'{peak / 2 ** 20:.1f}', f'{seconds * 1000:.0f}',
+            f'{n_chores / seconds:.0f}']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chores', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_chores in args.chores:
+            data = synthetic_chores_json(n_chores)
+            json_path = os.path.join(tmp_dir, f'chores-{n_chores}.json')
+            with open(json_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(data, ensure_ascii=False, indent=4))
+            jsonl_path = os.path.join(tmp_dir, f'chores-{n_chores}.jsonl')
+            with open(jsonl_path, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(x, ensure_ascii=False) + '\n' for x in data)
+
+            rows += [
+                run('all at once', json_path, load_all_at_once, n_chores),
+                run('load_chores', json_path, Chore.load_chores, n_chores),
+                run('iter_chores', json_path, count, n_chores),
+                run('load_chores', jsonl_path, Chore.load_chores, n_chores),
+                run('iter_chores', jsonl_path, count, n_chores),
+            ]
+
+    print_table(['loader', 'file', 'chores', 'peak MiB', 'ms', 'chores/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Measure the memory footprint per object of chores, auctions, teams and messages with tracemalloc, comparing the
+slotted classes with the dict-backed classes they replaced. Chores are loaded from JSON, such that every day and time
+is a separate string unless it is interned.
+
+    python -m benchmarks.bench_memory [--auctions 100000]
+"""
+from benchmarks.common import synthetic_chores_json, print_table
+from tjanseauktion import constants
+from tjanseauktion.auction import Auction
+from tjanseauktion.chore import Chore
+from tjanseauktion.message import Message
+from tjanseauktion.outcome import Outcome
+from tjanseauktion.team import Team
+
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import Callable
+
+
+class DictChore:
+    def __init__(self, desc: str, day: str, time: str):
+        self.desc = desc
+        self.day = day
+        self.time = time
+
+
+class DictAuction:
+    def __init__(self, chore):
+        self.chore = chore
+        self.current_bid = 0
+        self.current_bid_str = ''
+        self.bidder = None
+        self.is_completed = False
+        self.is_secret = False
+
+
+class DictTeam:
+    def __init__(self, _id: int):
+        self.coins = constants.START_COINS
+        self.chores = []
+        self.id = _id
+        self.has_free_win = True
+        self.COIN_STR_LEN = 17
+
+
+class DictMessage:
+    def __init__(self, txt: str, colour: int = 0, action: str = '', team=None, bid=None, outcome=Outcome.OK):
+        self.txt = txt
+        self.colour = colour
+        self.action = action
+        self.team = team
+        self.bid = bid
+        self.outcome = outcome
+
+
+def measure(build: Callable[[], list]) -> int:
+    """
+    Bytes still allocated by the objects :param build returns, once it is done
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = build()
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--auctions', type=int, default=100000)
+    args = parser.parse_args()
+
+    n = args.auctions
+    text = json.dumps(synthetic_chores_json(n), ensure_ascii=False)
+    cases = [
+        ('chore', lambda: [DictChore(r['desc'], r['day'], r['time']) for r in json.loads(text)],
+         lambda: [Chore.from_json(r) for r in json.loads(text)]),
+        ('auction incl. chore', lambda: [DictAuction(DictChore(r['desc'], r['day'], r['time']))
+                                         for r in json.loads(text)],
+         lambda: [Auction(Chore.from_json(r)) for r in json.loads(text)]),
+        ('team', lambda: [DictTeam(i) for i in range(n)], lambda: [Team(i) for i in range(n)]),
+        ('message', lambda: [DictMessage(f'team{i % 8} bid {i} coins', action='bid', team=i % 8, bid=i)
+                             for i in range(n)],
+         lambda: [Message(f'team{i % 8} bid {i} coins', action='bid', team=i % 8, bid=i) for i in range(n)]),
+    ]
+
+    rows = []
+    for name, before, after in cases:
+        size_before, size_after = measure(before), measure(after)
+        rows.append([name, n, f'{size_before / n:.0f}', f'{size_after / n:.0f}',
+                     f'{(1 - size_after / size_before) * 100:.0f}%', f'{(size_before - size_after) / 2 ** 20:.1f}'])
+
+    print_table(['object', 'count', 'bytes/object (dict)', 'bytes/object (slots)', 'saved', 'saved MiB'], rows)
+
+
+if __name__ == '__main__':
+    main()
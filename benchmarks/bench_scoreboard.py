@@ -0,0 +1,192 @@
+"""
+Load test of the scoreboard feed of the AuctionServer: viewers on local sockets receive a snapshot and then the delta
+of every command of an operator entering bids and sales at --rate commands per second. The server runs on this
+process, and the operator and viewers on a child process, such that the CPU time of the server can be measured.
+
+    python -m benchmarks.bench_scoreboard [--viewers 100 300] [--commands 1000] [--rate 100] [--teams 30] [--tcp]
+
+Every viewer holds a socket on both processes, so raise the limit of open files (ulimit -n) for many viewers. Some
+systems fail to receive on more than ~450 Unix sockets (EINVAL), in which case use --tcp.
+"""
+from benchmarks.common import synthetic_chores, print_table
+from tjanseauktion.engine import AuctionEngine
+from tjanseauktion.server import AuctionClient, AuctionServer, encode
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import statistics
+import tempfile
+import time
+from typing import List, Tuple
+
+# bids on each auction before it is sold
+BIDS_PER_AUCTION = 9
+
+
+def commands(n: int, n_teams: int) -> List[Tuple[str, str]]:
+    """
+    :param n: amount of commands, all of which succeed: bids of 10% over the current bid by teams in turn, and a
+              sale of every auction after BIDS_PER_AUCTION bids, such that every team buys as many chores
+    """
+    result = []
+    for auction in range(n // (BIDS_PER_AUCTION + 1) + 1):
+        bid = 100
+        for i in range(BIDS_PER_AUCTION):
+            result.append(('bid', f'{(auction + i) % n_teams} ,,{bid}'))
+            bid = int(bid * 1.1) + 1
+        result.append(('sell', None))
+    return result[:n]
+
+
+async def connect(address: tuple) -> AuctionClient:
+    kind, where = address
+    if kind == 'unix':
+        return await AuctionClient.connect(path=where)
+    return await AuctionClient.connect('127.0.0.1', where)
+
+
+async def run_viewer(client: AuctionClient, last_seq: int) -> Tuple[int, int, List[float]]:
+    """
+    :return: bytes of the snapshot, bytes of the deltas, and the latency of every delta in seconds
+    """
+    line = await client.reader.readline()
+    n_snapshot_bytes, n_delta_bytes, latencies = len(line), 0, []
+    while True:
+        line = await client.reader.readline()
+        received = time.time()
+        delta = json.loads(line)
+        n_delta_bytes += len(line)
+        latencies.append(received - delta['timestamp'])
+        if delta['seq'] >= last_seq:
+            break
+    client.close()
+    return n_snapshot_bytes, n_delta_bytes, latencies
+
+
+async def run_clients_async(viewer_address: tuple, operator_address: tuple, n_viewers: int,
+                            todo: List[Tuple[str, str]], rate: float) -> dict:
+    """
+    :param rate: commands sent per second, 0 to send all commands at once
+    """
+    viewers = []
+    # connect one at a time, rather than overflowing the backlog of the server
+    for _ in range(n_viewers):
+        viewers.append(asyncio.ensure_future(run_viewer(await connect(viewer_address), len(todo))))
+    # let all viewers receive their snapshot before commands are sent
+    await asyncio.sleep(.5)
+
+    operator = await connect(operator_address)
+    await operator.receive()
+    start = time.time()
+    for i, (op, text) in enumerate(todo):
+        if rate:
+            await asyncio.sleep(max(start + i / rate - time.time(), 0))
+        await operator.send(op, text)
+
+    n_failed, n_results = 0, 0
+    while n_results < len(todo):
+        data = await operator.receive()
+        if data['type'] == 'result':
+            n_results += 1
+            n_failed += data['outcome'] not in ('ok', 'override')
+    results = await asyncio.wait_for(asyncio.gather(*viewers), 120)
+    seconds = time.time() - start
+    operator.close()
+
+    return {
+        'seconds': seconds,
+        'n_failed': n_failed,
+        'snapshot_bytes': results[0][0],
+        'delta_bytes': sum(x[1] for x in results),
+        'latencies': sorted(y for x in results for y in x[2])
+    }
+
+
+def run_clients(viewer_address: tuple, operator_address: tuple, n_viewers: int, todo: List[Tuple[str, str]],
+                rate: float, results: multiprocessing.Queue):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        results.put(loop.run_until_complete(run_clients_async(viewer_address, operator_address, n_viewers, todo,
+                                                                    rate)))
+    finally:
+        loop.close()
+
+
+def wait_for_results(process: multiprocessing.Process, results: multiprocessing.Queue) -> dict:
+    while True:
+        try:
+            return results.get(timeout=.1)
+        except queue.Empty:
+            if not process.is_alive():
+                raise RuntimeError('the clients failed, see their traceback')
+
+
+async def serve(server: AuctionServer, tmp_dir: str, tcp: bool) -> Tuple[tuple, tuple]:
+    """
+    :return: addresses of viewers and of operators
+    """
+    if tcp or not hasattr(asyncio, 'start_unix_server'):
+        return ('tcp', await server.listen_tcp('127.0.0.1', 0, read_only=True)), \
+               ('tcp', await server.listen_tcp('127.0.0.1', 0))
+
+    addresses = ('unix', os.path.join(tmp_dir, 'viewers.sock')), ('unix', os.path.join(tmp_dir, 'operators.sock'))
+    await server.listen_unix(addresses[0][1], read_only=True)
+    await server.listen_unix(addresses[1][1])
+    return addresses
+
+
+def run(n_viewers: int, n_commands: int, rate: float, n_teams: int, n_chores: int, tcp: bool) -> list:
+    engine = AuctionEngine.create(synthetic_chores(n_chores), n_teams, 0, .1, seed=0)
+    server = AuctionServer(engine)
+    todo = commands(n_commands, n_teams)
+    results = multiprocessing.Queue()
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            addresses = loop.run_until_complete(serve(server, tmp_dir, tcp))
+            process = multiprocessing.Process(target=run_clients, args=(*addresses, n_viewers, todo, rate, results))
+            process.start()
+            cpu_start = time.process_time()
+            data = loop.run_until_complete(loop.run_in_executor(None, wait_for_results, process, results))
+            cpu_seconds = time.process_time() - cpu_start
+            process.join()
+        finally:
+            loop.run_until_complete(server.close())
+            loop.close()
+
+    if data['n_failed']:
+        raise AssertionError(f"{data['n_failed']} commands failed")
+
+    latencies = data['latencies']
+    n_deltas = n_commands * n_viewers
+    return [n_viewers, n_commands, f"{data['seconds']:.2f}", f"{n_commands / data['seconds']:.0f}",
+            f"{n_deltas / data['seconds']:.0f}", f"{cpu_seconds / data['seconds'] * 100:.0f}%",
+            data['snapshot_bytes'], f"{data['delta_bytes'] / n_deltas:.0f}",
+            f'{statistics.median(latencies) * 1000:.1f}', f'{latencies[int(len(latencies) * .99)] * 1000:.1f}',
+            len(encode(server.snapshot()))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--viewers', type=int, nargs='+', default=[100, 300])
+    parser.add_argument('--commands', type=int, default=1000)
+    parser.add_argument('--rate', type=float, default=100, help='commands per second, 0 to send all at once')
+    parser.add_argument('--teams', type=int, default=30)
+    parser.add_argument('--chores', type=int, default=1000)
+    parser.add_argument('--tcp', action='store_true', help='use TCP on localhost rather than Unix sockets')
+    args = parser.parse_args()
+
+    rows = [run(n_viewers, args.commands, args.rate, args.teams, args.chores, args.tcp) for n_viewers in args.viewers]
+    print_table(['viewers', 'commands', 'seconds', 'commands/s', 'deltas/s', 'server CPU', 'snapshot bytes',
+                 'bytes/delta', 'p50 ms', 'p99 ms', 'final snapshot bytes'], rows)
+
+
+if __name__ == '__main__':
+    main()
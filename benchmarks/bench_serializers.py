@@ -0,0 +1,77 @@
+"""
+Compare snapshot size and throughput of the state serializers, on tests/fixtures/test_chores.json
+scaled up synthetically with half of the auctions completed.
+
+    python -m benchmarks.bench_serializers [--chores 500 5000 50000] [--teams 30] [--repeat 5]
+"""
+from benchmarks.common import print_table
+from tjanseauktion import logger
+from tjanseauktion.logger import StateLogger, FsyncPolicy
+from tjanseauktion.auction import Auction
+from tjanseauktion.auction_queue import AuctionQueue
+from tjanseauktion.chore import Chore
+from tjanseauktion.team import Team
+from tjanseauktion.serializer import SERIALIZERS
+
+import argparse
+import os
+import tempfile
+import time
+
+FIXTURE = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'test_chores.json')
+
+
+def scaled_state(n_chores: int, n_teams: int):
+    fixture = Chore.load_chores(FIXTURE)
+    chores = [Chore(f'{c.desc} #{i}', c.day, c.time) for i, c in
+              ((i, fixture[i % len(fixture)]) for i in range(n_chores))]
+
+    teams = [Team(i) for i in range(n_teams)]
+    auctions = [Auction(c) for c in chores]
+    n_completed = n_chores // 2
+    for i, auction in enumerate(auctions[:n_completed]):
+        auction.current_bid = 10 + i % 100
+        auction.current_bid_str = f'0:0:{auction.current_bid}'
+        auction.bidder = teams[i % n_teams]
+        auction.bidder.buy(auction.chore, auction.current_bid)
+        auction.is_completed = True
+
+    return teams, AuctionQueue(auctions, n_completed)
+
+
+def run(name: str, state: tuple, n_chores: int, repeat: int) -> list:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        logger.LOG_DIR = tmp_dir
+        state_logger = StateLogger(fsync_policy=FsyncPolicy.from_str('never'), serializer=SERIALIZERS[name]())
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            state_logger.log_state(*state)
+        write = (time.perf_counter() - start) / repeat
+        size = os.path.getsize(state_logger.path)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            StateLogger(serializer=SERIALIZERS[name]()).load_state()
+        read = (time.perf_counter() - start) / repeat
+
+    return [name, f'{size / 1024:.0f}', f'{write * 1000:.1f}', f'{read * 1000:.1f}',
+            f'{n_chores / write:.0f}', f'{n_chores / read:.0f}']
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--chores', type=int, nargs='+', default=[500, 5000, 50000])
+    parser.add_argument('--teams', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for n_chores in args.chores:
+        state = scaled_state(n_chores, args.teams)
+        print(f'\n{n_chores} chores, {args.teams} teams')
+        print_table(['format', 'size KiB', 'write ms', 'read ms', 'written auctions/s', 'read auctions/s'],
+                    [run(name, state, n_chores, args.repeat) for name in SERIALIZERS])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Measure how simulated auctions scale with the amount of worker processes.
+
+    python -m benchmarks.bench_simulation [--runs 2000] [--workers 1 2 4 8] [--chores 48] [--teams 8]
+"""
+from benchmarks.common import synthetic_chores, timer, print_table
+from tjanseauktion import simulation
+from tjanseauktion.simulation import SimulationParams
+
+import argparse
+
+
+def run(n_runs: int, workers: int, chores: list, params: SimulationParams) -> list:
+    results = {}
+
+    with timer(results, 'simulate'):
+        summary = simulation.simulate(chores, params, n_runs, workers=workers)
+    assert summary.n_runs == n_runs
+
+    return [workers, n_runs, f'{results["simulate"]:.2f}', f'{n_runs / results["simulate"]:.0f}',
+            f'{summary.n_auctions / results["simulate"]:.0f}']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--chores', type=int, default=48)
+    parser.add_argument('--teams', type=int, default=8)
+    args = parser.parse_args()
+
+    chores = synthetic_chores(args.chores)
+    params = SimulationParams(n_teams=args.teams, n_secrets=2, overbid_factor=.1)
+    rows = [run(args.runs, n, chores, params) for n in args.workers]
+    print_table(['workers', 'auctions', 'seconds', 'auctions/s', 'chores/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
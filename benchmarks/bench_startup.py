@@ -0,0 +1,75 @@
+"""
+Measure cold-start cost: loading chores and generating auctions on a fresh start, and reading a
+snapshot plus replaying the journal tail when resuming.
+
+    python -m benchmarks.bench_startup [--chores 50 500 5000] [--tail 0 1000 10000] [--teams 30]
+"""
+from benchmarks.common import synthetic_chores_json, print_table
+from benchmarks.bench_state_fsync import workload
+from tjanseauktion import logger
+from tjanseauktion.logger import StateLogger, FsyncPolicy
+from tjanseauktion.engine import AuctionEngine
+from tjanseauktion.chore import Chore
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from itertools import islice
+
+
+def fresh_start(tmp_dir: str, n_chores: int, n_teams: int) -> float:
+    path = os.path.join(tmp_dir, 'chores.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(synthetic_chores_json(n_chores), ensure_ascii=False))
+
+    start = time.perf_counter()
+    state_logger = StateLogger(journal=True, snapshot_interval=10 ** 9)
+    engine = AuctionEngine.create(Chore.load_chores(path), n_teams, 2, .1)
+    state_logger.init_state(*engine.state())
+    elapsed = time.perf_counter() - start
+
+    state_logger.close()
+    return elapsed
+
+
+def resume() -> float:
+    start = time.perf_counter()
+    state_logger = StateLogger(journal=True)
+    state_logger.replay_journal(AuctionEngine(*state_logger.read_state(), overbid_factor=.1))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--chores', type=int, nargs='+', default=[50, 500, 5000])
+    parser.add_argument('--tail', type=int, nargs='+', default=[0, 1000, 10000])
+    parser.add_argument('--teams', type=int, default=30)
+    args = parser.parse_args()
+
+    rows = []
+    for n_chores in args.chores:
+        for n_tail in args.tail:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                logger.LOG_DIR = tmp_dir
+                fresh = fresh_start(tmp_dir, n_chores, args.teams)
+
+                # append a journal tail which has not been compacted into the snapshot yet
+                state_logger = StateLogger(journal=True, snapshot_interval=10 ** 9,
+                                           fsync_policy=FsyncPolicy.from_str('never'))
+                engine = AuctionEngine(*state_logger.read_state(), overbid_factor=.1)
+                engine.subscribe(lambda record, _: state_logger.log_action(record, *engine.state()))
+                n_tail = min(n_tail, 4 * (n_chores - 1))
+                for action in islice(workload(n_chores, args.teams), n_tail):
+                    engine.apply(action)
+                state_logger.close()
+
+                rows.append([n_chores, n_tail, f'{fresh * 1000:.1f}', f'{resume() * 1000:.1f}'])
+
+    print(f'{args.teams} teams')
+    print_table(['chores', 'journal tail', 'fresh start ms', 'resume ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare per-action state persistence latency across fsync policies, in snapshot and journal mode.
+
+    python -m benchmarks.bench_state_fsync [--chores 500] [--teams 30]
+"""
+from benchmarks.common import synthetic_chores, print_table
+from tjanseauktion import logger
+from tjanseauktion.logger import StateLogger, FsyncPolicy
+from tjanseauktion.engine import AuctionEngine
+from tjanseauktion.auction import Auction
+from tjanseauktion.auction_queue import AuctionQueue
+from tjanseauktion.team import Team
+
+import argparse
+import tempfile
+import time
+
+POLICIES = ['always', '10', '250ms', 'never']
+
+
+def workload(n_auctions: int, n_teams: int):
+    """
+    Three bids followed by a sale on every auction
+    """
+    for i in range(n_auctions):
+        for j in range(3):
+            yield {'op': 'bid', 'team': (i + j) % n_teams, 'bid': 10 + j * 10, 'bid_str': f'0:0:{10 + j * 10}'}
+        yield {'op': 'sell', 'team': (i + 2) % n_teams}
+
+
+def run(n_chores: int, n_teams: int, journal: bool, policy: str) -> list:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        logger.LOG_DIR = tmp_dir
+        state_logger = StateLogger(journal=journal, fsync_policy=FsyncPolicy.from_str(policy))
+
+        teams = [Team(i) for i in range(n_teams)]
+        auctions = [Auction(c) for c in synthetic_chores(n_chores)]
+        engine = AuctionEngine(teams, AuctionQueue(auctions), .1)
+        state_logger.init_state(*engine.state())
+
+        latencies = []
+        for action in workload(n_chores, n_teams):
+            engine.apply(action)
+            start = time.perf_counter()
+            state_logger.log_action(action, *engine.state())
+            latencies.append(time.perf_counter() - start)
+        state_logger.close()
+
+    latencies.sort()
+    return [
+        'journal' if journal else 'snapshot',
+        policy,
+        len(latencies),
+        f'{sum(latencies) * 1000:.1f}',
+        f'{latencies[len(latencies) // 2] * 1e6:.0f}',
+        f'{latencies[int(len(latencies) * .99)] * 1e6:.0f}',
+        f'{latencies[-1] * 1e6:.0f}'
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--chores', type=int, default=500)
+    parser.add_argument('--teams', type=int, default=30)
+    args = parser.parse_args()
+
+    rows = [run(args.chores, args.teams, journal, policy) for journal in [False, True] for policy in POLICIES]
+    print(f'{args.chores} chores, {args.teams} teams')
+    print_table(['mode', 'fsync', 'actions', 'total ms', 'p50 us', 'p99 us', 'max us'], rows)
+
+
+if __name__ == '__main__':
+    main()
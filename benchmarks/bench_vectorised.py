@@ -0,0 +1,47 @@
+"""
+Compare the scalar simulation on a single process with the vectorised numpy simulation.
+
+    python -m benchmarks.bench_vectorised [--runs 500] [--numpy-runs 50000] [--batch-sizes 1000 10000] [--teams 8]
+"""
+from benchmarks.common import synthetic_chores, timer, print_table
+from tjanseauktion import simulation, vectorised
+from tjanseauktion.simulation import SimulationParams
+
+import argparse
+
+
+def row(name: str, seconds: float, summary: simulation.SimulationSummary, baseline: float) -> list:
+    runs_per_second = summary.n_runs / seconds
+    return [name, summary.n_runs, f'{seconds:.2f}', f'{runs_per_second:.0f}', f'{runs_per_second / baseline:.1f}x',
+            f'{summary.mean_price:.0f}', f'{summary.mean_gini:.3f}']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=500, help='auctions simulated by the scalar simulation')
+    parser.add_argument('--numpy-runs', type=int, default=50000, help='auctions simulated by the numpy simulation')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--chores', type=int, default=48)
+    parser.add_argument('--teams', type=int, default=8)
+    args = parser.parse_args()
+
+    chores = synthetic_chores(args.chores)
+    params = SimulationParams(n_teams=args.teams, n_secrets=2, overbid_factor=.1)
+    results = {}
+
+    with timer(results, 'scalar'):
+        summary = simulation.simulate(chores, params, args.runs, workers=1)
+    baseline = args.runs / results['scalar']
+    rows = [row('scalar', results['scalar'], summary, baseline)]
+
+    for batch_size in args.batch_sizes:
+        key = f'numpy, batches of {batch_size}'
+        with timer(results, key):
+            summary = vectorised.simulate(chores, params, args.numpy_runs, batch_size=batch_size)
+        rows.append(row(key, results[key], summary, baseline))
+
+    print_table(['engine', 'auctions', 'seconds', 'auctions/s', 'speedup', 'mean price', 'gini'], rows)
+
+
+if __name__ == '__main__':
+    main()
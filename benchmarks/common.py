@@ -0,0 +1,39 @@
+from tjanseauktion.chore import Chore
+
+import random
+import time
+from contextlib import contextmanager
+from typing import List
+
+DAYS = ['Fredag', 'Lørdag', 'Søndag', 'Mandag']
+TIMES = ['8:00', '10:00', '12:00', '14:00', '17:00', '20:00', 'Efter aftensmad', 'Hele dagen']
+DESCS = ['Mad prep', 'Opvask efter frokost', 'Udendørsvagt', 'Oprydning i fællesrum', 'Borddækning',
+         'Afrydning og opvask efter aftensmad', 'Morgenmad', 'Rengøring af toiletter']
+
+
+def synthetic_chores(n: int, seed: int = 0) -> List[Chore]:
+    """
+    Generate :param n chores resembling data/chores.json
+    """
+    rng = random.Random(seed)
+    return [Chore(f'{rng.choice(DESCS)} #{i}', rng.choice(DAYS), rng.choice(TIMES)) for i in range(n)]
+
+
+def synthetic_chores_json(n: int, seed: int = 0) -> List[dict]:
+    return [c.to_json() for c in synthetic_chores(n, seed)]
+
+
+@contextmanager
+def timer(results: dict, key: str):
+    """
+    Time the body of the with statement and store the elapsed seconds in :param results[key]
+    """
+    start = time.perf_counter()
+    yield
+    results[key] = time.perf_counter() - start
+
+
+def print_table(header: List[str], rows: List[list]):
+    widths = [max(len(str(x)) for x in col) for col in zip(header, *rows)]
+    for row in [header, ['-' * w for w in widths], *rows]:
+        print('  '.join(str(x).rjust(w) for x, w in zip(row, widths)))
@@ -0,0 +1,264 @@
+"""
+Time every hot path of the tjanseauktion on synthetic fixtures, from 50 chores and 8 teams up to 50,000 chores and
+500 teams, and save the results as JSON. Two saved runs can be compared to flag regressions.
+
+    python -m benchmarks.suite run [--out bench.json] [--scales 50x8 500x30 5000x100 50000x500] [--only parse]
+    python -m benchmarks.suite compare BASELINE.json NEW.json [--threshold 10]
+
+The exit code of compare is 1 if any benchmark got slower by more than --threshold percent.
+"""
+from benchmarks.common import synthetic_chores, synthetic_chores_json, print_table
+from benchmarks.bench_serializers import scaled_state
+from tjanseauktion import logger
+from tjanseauktion.logger import StateLogger, MessageLogger, FsyncPolicy
+from tjanseauktion.auction import Auction
+from tjanseauktion.catalog import ChoreCatalog
+from tjanseauktion.chore import Chore
+from tjanseauktion.command import parse_bid_command, parse_convert_command
+from tjanseauktion.message import Message
+from tjanseauktion.output import OutputWriter
+from tjanseauktion.stats import AuctionStats
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+SCALES = ['50x8', '500x30', '5000x100', '50000x500']
+
+
+class Result(NamedTuple):
+    name: str
+    n_chores: int
+    n_teams: int
+    # best time of a single call across rounds
+    seconds: float
+    calls: int
+
+    @property
+    def key(self) -> Tuple[str, int, int]:
+        return self.name, self.n_chores, self.n_teams
+
+
+def bench_load_chores(tmp_dir: str, n_chores: int, n_teams: int) -> Callable:
+    path = os.path.join(tmp_dir, 'chores.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(synthetic_chores_json(n_chores), ensure_ascii=False))
+    return lambda: Chore.load_chores(path)
+
+
+def bench_catalog(tmp_dir: str, n_chores: int, n_teams: int) -> Callable:
+    chores = synthetic_chores(n_chores)
+    return lambda: list(ChoreCatalog(chores, day_order=['Fredag', 'Lørdag', 'Søndag']).ordered())
+
+
+def bench_create_auctions(tmp_dir: str, n_chores: int, n_teams: int) -> Callable:
+    chores = synthetic_chores(n_chores)
+    return lambda: Auction.create_auctions(chores, n_chores // 10, n_teams, random.Random(0))
+
+
+def bench_log_state(tmp_dir: str, n_chores: int, n_teams: int) -> Callable:
+    state = scaled_state(n_chores, n_teams)
+    state_logger = StateLogger(fsync_policy=FsyncPolicy.from_str('never'))
+    return lambda: state_logger.log_state(*state)
+
+
+def bench_load_state(tmp_dir: str, n_chores: int, n_teams: int) -> Callable:
+    StateLogger(fsync_policy=FsyncPolicy.from_str('never')).log_state(*scaled_state(n_chores, n_teams))
+    # a new logger per call, as loggers cache the last parsed snapshot
+    return lambda: StateLogger().load_state()
+
+
+def bench_log_msg(tmp_dir: str, n_chores: int, n_teams: int) -> Callable:
+    msgs = [Message(f'team{i % n_teams} bid {i} coins (0,0,{i})', action='bid', team=i % n_teams, bid=i)
+            for i in range(n_chores)]
+    message_logger = MessageLogger()
+
+    def log():
+        for msg in msgs:
+            message_logger.log_msg(msg)
+        message_logger.flush()
+
+    return log
+
+
+def bench_ui_row_string(tmp_dir: str, n_chores: int, n_teams: int) -> Callable:
+    teams, _ = scaled_state(n_chores, n_teams)
+    return lambda: [x.ui_row_string() for x in teams]
+
+
+def bench_coin_string(tmp_dir: str, n_chores: int, n_teams: int) -> Callable:
+    teams, _ = scaled_state(n_chores, n_teams)
+    return lambda: [x.coin_string() for x in teams]
+
+
+def bench_bid_value(tmp_dir: str, n_chores: int, n_teams: int) -> Callable:
+    bids = [f'{i % n_teams} {i % 3},{i % 20},{i % 500}' for i in range(n_chores)]
+    return lambda: [parse_bid_command(x).value() for x in bids]
+
+
+def bench_parse_bid_command(tmp_dir: str, n_chores: int, n_teams: int) -> Callable:
+    inputs = [x for i in range(n_chores) for x in (f'{i % n_teams} {i % 3},,{i % 500}', f'{i % n_teams} win',
+                                                   f'{i % n_teams} free', f'{i % n_teams} {i % 3}:{i % 20}')]
+    return lambda: [parse_bid_command(x) for x in inputs]
+
+
+def bench_parse_convert_command(tmp_dir: str, n_chores: int, n_teams: int) -> Callable:
+    inputs = [x for i in range(n_chores) for x in (f'{i % 3},{i % 20},', f',,{i % 500}', f'{i % 3}:{i % 20}')]
+    return lambda: [parse_convert_command(x) for x in inputs]
+
+
+def bench_write_to_pdf(tmp_dir: str, n_chores: int, n_teams: int) -> Callable:
+    teams, queue = scaled_state(n_chores, n_teams)
+    stats = AuctionStats.from_state(teams, queue, math.ceil(n_chores / n_teams))
+    return lambda: OutputWriter.write_to_pdf(teams, stats)
+
+
+BENCHMARKS = {
+    'Chore.load_chores': bench_load_chores,
+    'ChoreCatalog': bench_catalog,
+    'Auction.create_auctions': bench_create_auctions,
+    'StateLogger.log_state': bench_log_state,
+    'StateLogger.load_state': bench_load_state,
+    'MessageLogger.log_msg': bench_log_msg,
+    'Team.ui_row_string': bench_ui_row_string,
+    'Team.coin_string': bench_coin_string,
+    'Bid.value': bench_bid_value,
+    'parse_bid_command': bench_parse_bid_command,
+    'parse_convert_command': bench_parse_convert_command,
+    'OutputWriter.write_to_pdf': bench_write_to_pdf,
+}  # type: Dict[str, Callable[[str, int, int], Callable]]
+
+
+def time_call(fn: Callable, rounds: int, min_time: float) -> Tuple[float, int]:
+    """
+    Best time of a single call of :param fn across :param rounds rounds, each repeating the call for at least
+    :param min_time seconds
+    :return: best seconds per call, and the total amount of calls
+    """
+    start = time.perf_counter()
+    fn()
+    n = max(1, int(min_time / max(time.perf_counter() - start, 1e-9)))
+
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        best = min(best, (time.perf_counter() - start) / n)
+
+    return best, 1 + n * rounds
+
+
+def parse_scale(scale: str) -> Tuple[int, int]:
+    """
+    Parse "CHORESxTEAMS", e.g., "500x30"
+    """
+    n_chores, n_teams = scale.lower().split('x')
+    return int(n_chores), int(n_teams)
+
+
+def run(scales: List[Tuple[int, int]], names: List[str], rounds: int = 3, min_time: float = .2) -> List[Result]:
+    results = []
+    for n_chores, n_teams in scales:
+        for name in names:
+            cwd = os.getcwd()
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                # logs, and the report of OutputWriter, are written to the temporary directory
+                logger.LOG_DIR = tmp_dir
+                fn = BENCHMARKS[name](tmp_dir, n_chores, n_teams)
+                os.chdir(tmp_dir)
+                try:
+                    seconds, calls = time_call(fn, rounds, min_time)
+                finally:
+                    os.chdir(cwd)
+            results.append(Result(name, n_chores, n_teams, seconds, calls))
+            print(f'{name:<28}{n_chores:>7} chores {n_teams:>4} teams {seconds * 1000:>12.3f} ms', file=sys.stderr)
+    return results
+
+
+def save(results: List[Result], path: str):
+    data = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': [x._asdict() for x in results]
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+def load(path: str) -> List[Result]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [Result(**x) for x in json.load(f)['results']]
+
+
+def compare(baseline: List[Result], results: List[Result], threshold: float) -> Tuple[List[list], int]:
+    """
+    Compare benchmarks present in both runs
+    :param threshold: percent a benchmark may get slower before it is flagged as a regression
+    :return: table rows, and the amount of regressions
+    """
+    old = {x.key: x for x in baseline}
+    rows, n_regressions = [], 0
+    for result in results:
+        before = old.get(result.key)  # type: Optional[Result]
+        if not before:
+            continue
+
+        change = (result.seconds / before.seconds - 1) * 100
+        if change > threshold:
+            verdict = 'REGRESSION'
+            n_regressions += 1
+        elif change < -threshold:
+            verdict = 'faster'
+        else:
+            verdict = ''
+        rows.append([result.name, result.n_chores, result.n_teams, f'{before.seconds * 1000:.3f}',
+                     f'{result.seconds * 1000:.3f}', f'{change:+.1f}%', verdict])
+
+    return rows, n_regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command')
+    run_parser = subparsers.add_parser('run')
+    run_parser.add_argument('--out', default='bench.json')
+    run_parser.add_argument('--scales', nargs='+', default=SCALES, help='CHORESxTEAMS')
+    run_parser.add_argument('--only', nargs='+', help='run benchmarks whose name contains one of these')
+    run_parser.add_argument('--rounds', type=int, default=3)
+    run_parser.add_argument('--min-time', type=float, default=.2, help='seconds per round')
+    compare_parser = subparsers.add_parser('compare')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=10, help='percent')
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.error('a command is required')
+
+    if args.command == 'run':
+        names = [x for x in BENCHMARKS if not args.only or any(y.lower() in x.lower() for y in args.only)]
+        results = run([parse_scale(x) for x in args.scales], names, args.rounds, args.min_time)
+        save(results, args.out)
+        print_table(['benchmark', 'chores', 'teams', 'ms', 'calls'],
+                    [[x.name, x.n_chores, x.n_teams, f'{x.seconds * 1000:.3f}', x.calls] for x in results])
+        print(f'\nsaved to {args.out}')
+        return
+
+    rows, n_regressions = compare(load(args.baseline), load(args.new), args.threshold)
+    print_table(['benchmark', 'chores', 'teams', 'baseline ms', 'new ms', 'change', ''], rows)
+    print(f'\n{n_regressions} regressions above {args.threshold:g}%')
+    sys.exit(1 if n_regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
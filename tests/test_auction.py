@@ -1,10 +1,12 @@
 from tjanseauktion import constants
 from tjanseauktion.auction import Auction
 from tjanseauktion.chore import Chore
+from tjanseauktion.outcome import Outcome
 from tjanseauktion.team import Team
 
 import unittest
 import curses
+import random
 
 
 class TestAuction(unittest.TestCase):
@@ -52,6 +54,15 @@ class TestAuction(unittest.TestCase):
         self.assertFalse(self.auction.is_bidder_valid(bidder0))
         self.assertTrue(self.auction.is_bidder_valid(bidder1))
 
+    def test_min_bid(self):
+        self.assertEqual(Auction.min_bid(0, .1), 1)
+        self.assertEqual(Auction.min_bid(5, .1), 6)
+        self.assertEqual(Auction.min_bid(500, .1), 550)
+
+        self.auction.current_bid = 500
+        self.assertTrue(self.auction.is_bid_valid(550) and self.auction.is_bid_high_enough(550, .1))
+        self.assertFalse(self.auction.is_bid_high_enough(549, .1))
+
     def test_try_bid_too_low(self):
         bidder = Team(0)
         self.auction.current_bid = 2000
@@ -83,6 +94,59 @@ class TestAuction(unittest.TestCase):
         self.assertEqual(self.auction.current_bid_str, bid_str)
         self.assertEqual(self.auction.bidder, bidder)
         self.assertEqual(msg.attr, curses.color_pair(constants.COLOUR_SUCCESS_MSG))
+        self.assertEqual((msg.action, msg.team, msg.bid), ('bid', 0, bid))
+
+    def test_try_late_bid(self):
+        teams = [Team(0), Team(1)]
+        self.auction.try_bid(100, teams[0], ',,100', .1, timestamp=1.)
+        msg = self.auction.try_bid(150, teams[0], ',,150', .1, timestamp=3.)
+        self.assertEqual(msg.outcome, Outcome.OVERRIDE)
+
+        # the bid missed between the bids of team0
+        msg = self.auction.try_bid(120, teams[1], ',,120', .1, timestamp=2.)
+        self.assertEqual(msg.txt, "team1 bid 120 coins (,,120) before team0 bid 150")
+        self.assertEqual((msg.outcome, msg.action, msg.team, msg.bid), (Outcome.OK, 'bid', 1, 120))
+        self.assertEqual([(x.bid, x.outcome) for x in self.auction.bids.accepted],
+                         [(100, Outcome.OK), (120, Outcome.OK), (150, Outcome.OK)])
+        self.assertEqual((self.auction.current_bid, self.auction.current_bid_str), (150, ',,150'))
+        self.assertIs(self.auction.bidder, teams[0])
+
+    def test_try_late_bid_conflict(self):
+        teams = [Team(0), Team(1), Team(2)]
+        self.auction.try_bid(100, teams[0], '', .1, timestamp=1.)
+        self.auction.try_bid(200, teams[1], '', .1, timestamp=3.)
+
+        outcomes = [self.auction.try_bid(105, teams[2], '', .1, timestamp=2.).outcome,
+                    self.auction.try_bid(190, teams[2], '', .1, timestamp=2.).outcome,
+                    self.auction.try_bid(150, teams[1], '', .1, timestamp=2.).outcome,
+                    self.auction.try_bid(150, teams[0], '', .1, timestamp=2.).outcome]
+        self.assertEqual(outcomes, [Outcome.OVERBID_TOO_LOW, Outcome.CONFLICTS_WITH_LATER_BID,
+                                    Outcome.CONFLICTS_WITH_LATER_BID, Outcome.BIDDER_HAS_LEAD])
+        # rejected bids are recorded, but don't change the bids
+        self.assertEqual(len(self.auction.bids.attempts), 6)
+        self.assertEqual([x.bid for x in self.auction.bids.accepted], [100, 200])
+        self.assertEqual(self.auction.current_bid, 200)
+
+    def test_ledger_from_fields(self):
+        # a highest bid set directly is made before any bid entered since
+        self.auction.bidder = Team(0)
+        self.auction.current_bid = 500
+        msg = self.auction.try_bid(520, Team(1), '', .1, timestamp=0.)
+        self.assertEqual(msg.outcome, Outcome.OVERBID_TOO_LOW)
+        self.assertEqual(self.auction.bids.leader.bid, 500)
+
+    def test_memento(self):
+        team = Team(0)
+        memento = self.auction.memento()
+        self.auction.try_bid(100, team, '', .1)
+        after = self.auction.memento()
+
+        self.auction.restore(memento)
+        self.assertIsNone(self.auction.bids)
+        self.assertEqual(self.auction.current_bid, 0)
+        self.auction.restore(after)
+        self.assertEqual(self.auction.bids.leader.bid, 100)
+        self.assertIs(self.auction.bidder, team)
 
     def test_instant_win(self):
         buyer = Team(0)
@@ -101,6 +165,7 @@ class TestAuction(unittest.TestCase):
         msg = self.auction.complete_auction()
         self.assertEqual(msg.txt, "Chore some chore sold to team0")
         self.assertEqual(msg.attr, curses.color_pair(constants.COLOUR_SUCCESS_MSG))
+        self.assertEqual((msg.action, msg.team, msg.bid), ('sell', 0, 500))
         self.assertTrue(self.auction.is_completed)
 
     def test_create_auctions(self):
@@ -116,6 +181,40 @@ class TestAuction(unittest.TestCase):
         # monday chore should be first
         self.assertEqual(auctions[0].chore, chores[1])
 
+    def test_create_auctions_day_order(self):
+        days = ['Fredag', 'Lørdag', 'Søndag', 'Mandag']
+        chores = [Chore(f"chore {i}", days[i % 4], "20:00") for i in range(40)]
+        auctions = Auction.create_auctions(chores, 0, 4, random.Random(0), day_order=['Søndag', 'Fredag'])
+        self.assertListEqual([x.chore.day for x in auctions[:20]], ['Søndag'] * 10 + ['Fredag'] * 10)
+        self.assertSetEqual({x.chore.day for x in auctions[20:]}, {'Lørdag', 'Mandag'})
+
+        # the default day order generates the same auctions as before it could be configured
+        auctions = Auction.create_auctions(chores, 5, 4, random.Random(1))
+        rng = random.Random(1)
+        expected = [Auction(x) for x in chores]
+        for selection in rng.sample(expected, 5):
+            selection.is_secret = True
+        rng.shuffle(expected)
+        expected = [*[x for x in expected if x.chore.day == 'Mandag'],
+                    *[x for x in expected if x.chore.day != 'Mandag']]
+        self.assertListEqual([(x.chore.desc, x.is_secret) for x in auctions],
+                             [(x.chore.desc, x.is_secret) for x in expected])
+
+    def test_create_auctions_seeded(self):
+        chores = [Chore(f"chore {i}", "Fredag", "20:00") for i in range(50)]
+
+        def generate(seed: int) -> list:
+            auctions = Auction.create_auctions(chores, 10, 7, random.Random(seed))
+            return [(x.chore.desc, x.is_secret) for x in auctions]
+
+        self.assertListEqual(generate(42), generate(42))
+        self.assertNotEqual(generate(42), generate(43))
+
+    def test_create_auctions_all_secret(self):
+        chores = [Chore(f"chore {i}", "Fredag", "20:00") for i in range(50)]
+        auctions = Auction.create_auctions(chores, 50, 5, random.Random(0))
+        self.assertTrue(all(x.is_secret for x in auctions))
+
     def test_reset_bids(self):
         team = Team(0)
         self.auction.bidder = team
@@ -144,6 +243,38 @@ class TestAuction(unittest.TestCase):
 
         self.assertDictEqual(j, expected)
 
+    def test_to_json_bidder(self):
+        self.auction.bidder = Team(3)
+        self.assertEqual(self.auction.to_json()['bidder'], 3)
+
+    def test_from_json_bidder(self):
+        teams = [Team(0), Team(1)]
+        chore = Chore("some chore", "yesterday", "25:00")
+        j = self.auction.to_json()
+        j['bidder'] = 1
+
+        auction = Auction.from_json(j, teams, chore)
+        self.assertIs(auction.bidder, teams[1])
+        self.assertIs(auction.chore, chore)
+
+    def test_json_bids(self):
+        teams = [Team(0), Team(1)]
+        self.auction.try_bid(100, teams[0], ',,100', .1, timestamp=1.)
+        self.auction.try_bid(150, teams[0], ',,150', .1, timestamp=3.)
+        j = self.auction.to_json()
+        self.assertEqual(j['bids'], [[1., 100, ',,100', 0, 'ok'], [3., 150, ',,150', 0, 'override']])
+
+        auction = Auction.from_json(j, teams, self.auction.chore)
+        self.assertEqual(auction.bids.accepted, self.auction.bids.accepted)
+        self.assertIs(auction.bids.leader.bidder, teams[0])
+        # the late bid resolves the OVERRIDE as it would have before saving
+        self.assertTrue(auction.try_bid(120, teams[1], ',,120', .1, timestamp=2.).outcome.is_success)
+        self.assertEqual(auction.bids.accepted[-1].outcome, Outcome.OK)
+
+        # bids of completed auctions are not needed anymore
+        auction.complete_auction()
+        self.assertNotIn('bids', auction.to_json())
+
     def test_from_json(self):
         j = {
             'chore': {
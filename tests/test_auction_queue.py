@@ -0,0 +1,44 @@
+from tjanseauktion.auction import Auction
+from tjanseauktion.auction_queue import AuctionQueue
+from tjanseauktion.chore import Chore
+
+import unittest
+
+
+class TestAuctionQueue(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.auctions = [Auction(Chore(f"chore {i}", "Fredag", "20:00")) for i in range(3)]
+        self.queue = AuctionQueue(self.auctions)
+
+    def test_init(self):
+        self.assertIs(self.queue.current, self.auctions[0])
+        self.assertEqual(self.queue.n_completed, 0)
+        self.assertEqual(self.queue.n_left, 3)
+        self.assertListEqual(self.queue.pending(), self.auctions[1:])
+        self.assertIsNone(self.queue.last_completed())
+
+        self.assertRaises(ValueError, AuctionQueue, self.auctions, 4)
+        self.assertRaises(ValueError, AuctionQueue, self.auctions, -1)
+
+    def test_advance(self):
+        self.assertIs(self.queue.advance(), self.auctions[1])
+        self.assertListEqual(self.queue.completed(), self.auctions[:1])
+        self.assertIs(self.queue.last_completed(), self.auctions[0])
+
+        self.queue.advance()
+        self.assertIsNone(self.queue.advance())
+        self.assertTrue(self.queue.is_done())
+        self.assertEqual(self.queue.n_left, 0)
+        self.assertListEqual(self.queue.pending(), [])
+        self.assertRaises(IndexError, self.queue.advance)
+
+    def test_revert(self):
+        self.assertRaises(IndexError, self.queue.revert)
+
+        self.queue.advance()
+        self.queue.advance()
+        self.assertIs(self.queue.revert(), self.auctions[1])
+        self.assertEqual(self.queue.cursor, 1)
+        # auctions are never moved
+        self.assertListEqual(list(self.queue), self.auctions)
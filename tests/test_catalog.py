@@ -0,0 +1,45 @@
+from tjanseauktion.catalog import ChoreCatalog, time_key
+from tjanseauktion.chore import Chore
+
+import unittest
+
+
+class TestChoreCatalog(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.chores = [
+            Chore("Opvask", "Lørdag", "20:00"),
+            Chore("Mad prep", "Fredag", "20:00"),
+            Chore("Udendørsvagt", "Lørdag", "Hele dagen"),
+            Chore("Mad prep", "Lørdag", "8:00"),
+            Chore("Oprydning", "Mandag", "10:00"),
+            Chore("Morgenmad", "Søndag", "8:00"),
+        ]
+        self.catalog = ChoreCatalog(self.chores, day_order=['Fredag', 'Lørdag'])
+
+    def test_load(self):
+        catalog = ChoreCatalog.load(path='tests/fixtures/test_chores.json')
+        self.assertEqual(len(catalog), 3)
+        self.assertEqual(len(catalog.on_day('Fredag')), 3)
+
+    def test_lookups(self):
+        self.assertListEqual(list(self.catalog.on_day('Lørdag')), [self.chores[0], self.chores[2], self.chores[3]])
+        self.assertListEqual(list(self.catalog.at_time('8:00')), [self.chores[3], self.chores[5]])
+        self.assertListEqual(list(self.catalog.with_desc('Mad prep')), [self.chores[1], self.chores[3]])
+        self.assertListEqual(list(self.catalog.in_slot('Lørdag', '8:00')), [self.chores[3]])
+        self.assertEqual(len(self.catalog.on_day('Tirsdag')), 0)
+        self.assertListEqual(list(self.catalog), self.chores)
+
+    def test_days(self):
+        # days of the day order first, then the others in the order they were loaded in
+        self.assertListEqual(self.catalog.days(), ['Fredag', 'Lørdag', 'Mandag', 'Søndag'])
+        self.assertListEqual(ChoreCatalog(self.chores, day_order=[]).days(), ['Lørdag', 'Fredag', 'Mandag', 'Søndag'])
+
+    def test_times(self):
+        self.assertListEqual(self.catalog.times(), ['8:00', '10:00', '20:00', 'Hele dagen'])
+        self.assertLess(time_key('9:30'), time_key('10.00'))
+        self.assertLess(time_key('23:59'), time_key('Efter aftensmad'))
+
+    def test_ordered(self):
+        expected = [self.chores[i] for i in (1, 3, 0, 2, 4, 5)]
+        self.assertListEqual(list(self.catalog.ordered()), expected)
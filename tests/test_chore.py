@@ -1,12 +1,34 @@
+from tjanseauktion import chore
 from tjanseauktion.chore import Chore
 
+import json
+import os
 import unittest
+from unittest import mock
 
 
 class TestChore(unittest.TestCase):
 
     def setUp(self) -> None:
         self.chore = Chore("some chore", "yesterday", "25:00")
+        self.path = 'tests/fixtures/streamed-chores.json'
+
+    def tearDown(self) -> None:
+        for path in (self.path, self.path + 'l'):
+            if os.path.isfile(path):
+                os.remove(path)
+
+    def write(self, text: str, path: str = '') -> str:
+        path = path or self.path
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def assert_error(self, text: str, line_no: int, path: str = ''):
+        path = self.write(text, path)
+        with self.assertRaises(ValueError) as cm:
+            Chore.load_chores(path)
+        self.assertTrue(str(cm.exception).startswith(f'{path}:{line_no}: '), str(cm.exception))
 
     def test_str(self):
         self.assertEqual(self.chore.__str__(), "some chore - yesterday at 25:00")
@@ -31,6 +53,15 @@ class TestChore(unittest.TestCase):
         self.assertEqual(chore.day, j['day'])
         self.assertEqual(chore.time, j['time'])
 
+    def test_interned(self):
+        chores = Chore.load_chores(path='tests/fixtures/test_chores.json')
+        self.assertIs(chores[0].day, chores[1].day)
+        self.assertIs(chores[0].time, Chore('', '', ''.join(['20', ':00'])).time)
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            self.chore.typo = ''
+
     def test_to_json(self):
         expected = {
             'desc': "some chore",
@@ -39,3 +70,33 @@ class TestChore(unittest.TestCase):
         }
         j = self.chore.to_json()
         self.assertDictEqual(j, expected)
+
+    def test_iter_chores(self):
+        with open('data/chores.json', 'r', encoding='utf-8') as f:
+            expected = [Chore.from_json(x) for x in json.load(f)]
+
+        self.assertListEqual(list(Chore.iter_chores('data/chores.json')), expected)
+        # rows cut off at the end of every read
+        with mock.patch.object(chore, 'CHUNK_SIZE', 7):
+            self.assertListEqual(list(Chore.iter_chores('data/chores.json')), expected)
+
+    def test_iter_chores_json_lines(self):
+        rows = [x.to_json() for x in Chore.load_chores('data/chores.json')]
+        path = self.write('\n'.join(json.dumps(x, ensure_ascii=False) for x in rows) + '\n\n', self.path + 'l')
+        self.assertListEqual([x.to_json() for x in Chore.iter_chores(path)], rows)
+
+    def test_iter_chores_empty(self):
+        self.assertListEqual(Chore.load_chores(self.write(' [ ]\n')), [])
+
+    def test_iter_chores_errors(self):
+        row = '{"desc": "a", "day": "b", "time": "c"}'
+        self.assert_error(f'[\n  {row},\n  {{"desc": "a", "day": "b"}}\n]', 3)
+        self.assert_error(f'[\n  {row},\n\n  {row}\n  {row}\n]', 5)
+        self.assert_error(f'[{row},\n{row},\n  {{"desc": "a",\n "day": }}]', 4)
+        self.assert_error(f'[\n  {row},\n  {row},\n', 4)
+        self.assert_error(f'[{row},\n{row},\n]', 3)
+        self.assert_error(f'[{row}, 5]', 1)
+        self.assert_error(f'{row}\n{row}\n{{"desc": "a", "day": 1, "time": "c"}}\n', 3, self.path + 'l')
+        self.assert_error(f'{row}\n\n{row[:-1]}\n', 3, self.path + 'l')
+        with mock.patch.object(chore, 'CHUNK_SIZE', 5):
+            self.assert_error(f'[{row},\n{row},\n  {{"desc": "a",\n "day": }}]', 4)
@@ -0,0 +1,129 @@
+from tjanseauktion.command import Bid, Convert, Freebie, InstantWin, ParseError, parse_bid_command, \
+    parse_convert_command
+from tjanseauktion.currency import DEFAULT_RATES, Rates
+from tjanseauktion.validation import InputValidation
+
+import random
+import unittest
+
+FUZZ_ALPHABET = '0123456789, winfre\t\nx:'
+FUZZ_ROUNDS = 20000
+
+
+def random_command(rng: random.Random) -> str:
+    """
+    Random input which is valid roughly half of the time
+    """
+    if rng.random() < .5:
+        return ''.join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(0, 12)))
+
+    amounts = ','.join(str(rng.randint(0, 999)) if rng.random() < .7 else '' for _ in range(3))
+    command = rng.choice([amounts, f'{rng.randint(0, 99)} {amounts}', f'{rng.randint(0, 99)} win',
+                          f'{rng.randint(0, 99)} free'])
+    if rng.random() < .3:
+        # mutate a single character
+        i = rng.randrange(len(command) + 1)
+        command = command[:i] + rng.choice(FUZZ_ALPHABET) + command[i + 1:]
+    return rng.choice(['', ' ']) + command + rng.choice(['', '  ', '\n'])
+
+
+def split_value(amounts: str) -> int:
+    """
+    Coins worth "HIGH,MID,LOW" at the default rates, summed as the UI did before commands were parsed
+    """
+    return sum(int(x) * rate for x, rate in zip(amounts.split(','), DEFAULT_RATES) if x)
+
+
+class TestCommand(unittest.TestCase):
+
+    def test_parse_bid(self):
+        self.assertEqual(parse_bid_command("2 ,,"), Bid(2, (None, None, None)))
+        self.assertEqual(parse_bid_command("10 2,,14"), Bid(10, (2, None, 14)))
+        self.assertEqual(parse_bid_command(" 4 1,1,1  \n"), Bid(4, (1, 1, 1)))
+        self.assertEqual(parse_bid_command("5 win"), InstantWin(5))
+        self.assertEqual(parse_bid_command("7 free  "), Freebie(7))
+
+        bid = parse_bid_command("10 1,2,3")
+        self.assertEqual(bid.value(), 1 * 493 + 2 * 29 + 3)
+        self.assertEqual(bid.value(Rates(100, 10, 1)), 123)
+        self.assertEqual(parse_bid_command("3 1,,7").bid_str, '1,0,7')
+
+    def test_bid_value(self):
+        self.assertEqual(parse_bid_command("2 ,,").value(), 0)
+        self.assertEqual(parse_bid_command("10 2,,14").value(), 1000)
+        self.assertEqual(parse_bid_command("10 ,1,500").value(), 529)
+
+    def test_parse_late_bid(self):
+        self.assertEqual(parse_bid_command("2 ,,120 @5"), Bid(2, (None, None, 120), 5.))
+        self.assertEqual(parse_bid_command(" 2 1,,7@2.5 "), Bid(2, (1, None, 7), 2.5))
+        self.assertEqual(parse_bid_command("2 ,,120 @5").timestamp(100.), 95.)
+        self.assertIsNone(parse_bid_command("2 ,,120").timestamp(100.))
+
+        for text, position in [("2 ,,120 @", 9), ("2 ,,120 @x", 9), ("2 ,,120 @-1", 9), ("2 ,,120 @5s", 10),
+                               ("2 1,x @5", 4), ("2 win @5", 2)]:
+            error = parse_bid_command(text)
+            self.assertIsInstance(error, ParseError, text)
+            self.assertEqual(error.position, position, text)
+
+    def test_parse_bid_errors(self):
+        for text, position in [("", 0), ("   ", 0), ("f ,,2", 0), ("2", 1), ("2  win", 2), ("2 2", 3),
+                               ("3 2,", 4), ("1 iwn", 2), ("1 wins", 2), ("1 1:0:7", 3), ("1 1,2,3,", 7),
+                               (" 1 1,x,3", 5)]:
+            error = parse_bid_command(text)
+            self.assertIsInstance(error, ParseError, text)
+            self.assertEqual(error.position, position, text)
+            self.assertEqual(error.text, text)
+
+        self.assertEqual(str(parse_bid_command("1 iwn")), "expected an amount, 'win' or 'free' at column 3")
+
+    def test_parse_convert(self):
+        self.assertEqual(parse_convert_command(",,"), Convert((None, None, None)))
+        self.assertEqual(parse_convert_command("4,20, "), Convert((4, 20, None)))
+        self.assertEqual(parse_convert_command(",,4").value(), 4)
+        self.assertEqual(parse_convert_command("2,2,14").value(), 1058)
+        self.assertEqual(parse_convert_command(",10,10").value(), 300)
+        self.assertEqual(parse_convert_command("6,,9").conversion_str, '6,0,9')
+
+        error = parse_convert_command("1 ,,")
+        self.assertIsInstance(error, ParseError)
+        self.assertEqual(error.position, 1)
+        self.assertIsInstance(parse_convert_command("4 win"), ParseError)
+
+    def test_fuzz_bid(self):
+        """
+        The parser accepts exactly the input the InputValidation patterns accept, with the same result as
+        splitting it, which is how the UI parsed commands before
+        """
+        rng = random.Random(0)
+        for _ in range(FUZZ_ROUNDS):
+            text = random_command(rng)
+            command = parse_bid_command(text)
+
+            if InputValidation.validate_bid_instant_win(text):
+                self.assertEqual(command, InstantWin(int(text.split()[0])), repr(text))
+            elif InputValidation.validate_bid_input(text):
+                team, amounts = text.split()
+                self.assertIsInstance(command, Bid, repr(text))
+                self.assertEqual((command.team, command.value()), (int(team), split_value(amounts)), repr(text))
+            elif InputValidation.validate_bid_freebie(text):
+                self.assertEqual(command, Freebie(int(text.split()[0])), repr(text))
+            else:
+                self.assertIsInstance(command, ParseError, repr(text))
+                self.assertTrue(0 <= command.position <= len(text), repr(text))
+
+    def test_fuzz_convert(self):
+        rng = random.Random(1)
+        for _ in range(FUZZ_ROUNDS):
+            text = random_command(rng)
+            command = parse_convert_command(text)
+
+            if InputValidation.validate_convert_input(text):
+                self.assertIsInstance(command, Convert, repr(text))
+                self.assertEqual(command.value(), split_value(text.strip()), repr(text))
+            else:
+                self.assertIsInstance(command, ParseError, repr(text))
+                self.assertTrue(0 <= command.position <= len(text), repr(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
-from tjanseauktion.config import Config
+from tjanseauktion.config import Config, ConfigError, Settings
+from tjanseauktion.currency import Rates
 
 import unittest
 
@@ -19,6 +20,13 @@ class TestConfig(unittest.TestCase):
     def test_auction_n_secrets(self):
         self.assertEqual(self.cfg.auction_n_secrets(), 1000)
 
+    def test_auction_day_order(self):
+        self.assertTupleEqual(self.cfg.auction_day_order(), ('Mandag',))
+        self.cfg.cfg.set('auction', 'day_order', 'Fredag, Lørdag,Søndag')
+        self.assertTupleEqual(self.cfg.auction_day_order(), ('Fredag', 'Lørdag', 'Søndag'))
+        self.cfg.cfg.set('auction', 'day_order', '')
+        self.assertTupleEqual(self.cfg.auction_day_order(), ())
+
     def test_currency_high_name(self):
         self.assertEqual(self.cfg.currency_high_name(), "big doinks")
 
@@ -29,4 +37,54 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(self.cfg.currency_low_name(), "small doinks")
 
     def test_currency_instant_win_name(self):
-        self.assertEqual(self.cfg.currency_instant_win_name(), "absolute doinks")
\ No newline at end of file
+        self.assertEqual(self.cfg.currency_instant_win_name(), "absolute doinks")
+
+    def test_state_journal(self):
+        self.assertFalse(self.cfg.state_journal())
+
+    def test_state_snapshot_interval(self):
+        self.assertEqual(self.cfg.state_snapshot_interval(), 200)
+
+    def test_state_fsync(self):
+        self.assertEqual(self.cfg.state_fsync(), 'always')
+
+    def test_state_format(self):
+        self.assertEqual(self.cfg.state_format(), 'json')
+
+    def test_missing_file(self):
+        with self.assertRaises(ConfigError):
+            Config('tests/fixtures/nope.ini')
+
+    def test_settings(self):
+        settings = self.cfg.settings(env={}, overrides={'auction.min_overbid_percent': '15'})
+        self.assertIsInstance(settings, Settings)
+        self.assertEqual(settings.n_teams, 500)
+        self.assertEqual(settings.min_overbid_factor, .15)
+        self.assertIsNone(settings.seed)
+        self.assertEqual(settings.start_coins, 5000)
+        self.assertEqual(settings.rates, Rates())
+        self.assertEqual(settings.high_name, "big doinks")
+        self.assertEqual(settings.format, 'json')
+        with self.assertRaises(AttributeError):
+            settings.n_teams = 1
+
+    def test_settings_overrides(self):
+        env = {'TJANSEAUKTION_AUCTION_MIN_OVERBID_PERCENT': '10', 'TJANSEAUKTION_AUCTION_N_TEAMS': '12',
+               'TJANSEAUKTION_AUCTION_START_COINS': '4000', 'TJANSEAUKTION_CURRENCY_MID_VALUE': '30'}
+        settings = self.cfg.settings(env=env, overrides={'auction.n_teams': '16', 'state.journal': 'yes'})
+        self.assertEqual(settings.n_teams, 16)
+        self.assertEqual(settings.start_coins, 4000)
+        self.assertEqual(settings.rates, Rates(mid=30))
+        self.assertTrue(settings.journal)
+
+    def test_settings_errors(self):
+        # min_overbid_percent is missing from the fixture
+        with self.assertRaisesRegex(ConfigError, 'min_overbid_percent'):
+            self.cfg.settings(env={})
+
+        valid = {'auction.min_overbid_percent': '10'}
+        for key, value in [('auction.n_teams', 'many'), ('auction.n_teams', '0'), ('auction.n_secrets', '-1'),
+                           ('currency.mid_value', '500'), ('state.fsync', 'sometimes'), ('state.format', 'yaml'),
+                           ('state.journal', 'maybe'), ('auction.typo', '1')]:
+            with self.assertRaises(ConfigError, msg=key):
+                Config().settings(env={}, overrides={**valid, key: value})
@@ -0,0 +1,235 @@
+from tjanseauktion import constants
+from tjanseauktion.auction import Auction
+from tjanseauktion.auction_queue import AuctionQueue
+from tjanseauktion.chore import Chore
+from tjanseauktion.engine import AuctionEngine
+from tjanseauktion.outcome import Outcome
+from tjanseauktion.team import Team
+
+import unittest
+
+
+class TestAuctionEngine(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.teams = [Team(0), Team(1)]
+        self.auctions = [Auction(Chore(f"chore {i}", "Fredag", "20:00")) for i in range(4)]
+        self.engine = AuctionEngine(self.teams, AuctionQueue(self.auctions), .1)
+
+        self.records = []
+        self.engine.subscribe(lambda record, _: self.records.append(record))
+
+    def test_n_chores_per_team(self):
+        self.assertEqual(self.engine.n_chores_per_team, 2)
+
+        self.auctions.append(Auction(Chore(constants.FREE_CHORE_DESC, '', '')))
+        engine = AuctionEngine(self.teams, AuctionQueue(self.auctions), .1)
+        self.assertEqual(engine.n_chores_per_team, 2)
+
+    def test_create(self):
+        chores = [Chore(f"chore {i}", "Fredag", "20:00") for i in range(5)]
+        engine = AuctionEngine.create(chores, 2, 1, .1)
+
+        self.assertEqual(len(engine.teams), 2)
+        self.assertEqual(len(engine.queue), 6)
+        self.assertFalse(engine.is_done())
+        self.assertIsNotNone(engine.queue.seed)
+
+    def test_create_seeded(self):
+        chores = [Chore(f"chore {i}", "Fredag", "20:00") for i in range(20)]
+        engine = AuctionEngine.create(chores, 3, 4, .1, seed=7)
+        same = AuctionEngine.create(chores, 3, 4, .1, seed=engine.queue.seed)
+
+        self.assertEqual(engine.queue.seed, 7)
+        self.assertListEqual([(x.chore, x.is_secret) for x in engine.queue],
+                             [(x.chore, x.is_secret) for x in same.queue])
+
+    def test_bid(self):
+        msg = self.engine.bid(1, 500, '1:0:7')
+        self.assertEqual(msg.outcome, Outcome.OK)
+        self.assertIs(self.engine.cur_auction.bidder, self.teams[1])
+        self.assertEqual(self.records, [{'op': 'bid', 'team': 1, 'bid': 500, 'bid_str': '1:0:7',
+                                         'timestamp': self.engine.cur_auction.bids.leader.timestamp}])
+
+        msg = self.engine.bid(0, 510, '1:0:17')
+        self.assertEqual(msg.outcome, Outcome.OVERBID_TOO_LOW)
+        self.assertEqual(len(self.records), 1)
+
+    def test_bid_unknown_team(self):
+        self.assertEqual(self.engine.bid(2, 500, '1:0:7').outcome, Outcome.UNKNOWN_TEAM)
+        self.assertEqual(self.engine.bid(-1, 500, '1:0:7').outcome, Outcome.UNKNOWN_TEAM)
+
+    def test_sell(self):
+        self.assertEqual(self.engine.sell().outcome, Outcome.NO_BIDS)
+
+        self.engine.bid(1, 500, '1:0:7')
+        msg = self.engine.sell()
+        self.assertEqual(msg.outcome, Outcome.OK)
+        self.assertEqual(self.teams[1].coins, constants.START_COINS - 500)
+        self.assertListEqual(self.teams[1].chores, [self.auctions[0].chore])
+        self.assertIs(self.engine.cur_auction, self.auctions[1])
+        self.assertListEqual(self.engine.queue.completed(), [self.auctions[0]])
+        self.assertEqual(self.records[-1], {'op': 'sell', 'team': 1})
+
+    def test_instant_win(self):
+        self.assertEqual(self.engine.instant_win(0).outcome, Outcome.OK)
+        self.assertFalse(self.teams[0].has_free_win)
+        self.assertIs(self.engine.cur_auction, self.auctions[1])
+
+        self.assertEqual(self.engine.instant_win(0).outcome, Outcome.INSTANT_WIN_USED)
+
+    def test_freebie(self):
+        self.assertEqual(self.engine.freebie(0).outcome, Outcome.FREEBIE_NOT_ALLOWED)
+
+        self.engine.instant_win(0)
+        self.engine.instant_win(1)
+        self.engine.bid(0, 100, '0:0:100')
+        self.engine.sell()
+        msg = self.engine.freebie(1)
+        self.assertEqual(msg.outcome, Outcome.OK)
+        self.assertEqual(len(self.teams[1].chores), 2)
+        self.assertTrue(self.engine.is_done())
+
+    def test_reset(self):
+        self.engine.bid(1, 500, '1:0:7')
+        self.assertEqual(self.engine.reset().outcome, Outcome.OK)
+        self.assertIsNone(self.engine.cur_auction.bidder)
+        self.assertEqual(self.engine.cur_auction.current_bid, 0)
+
+    def test_revert(self):
+        self.assertEqual(self.engine.revert().outcome, Outcome.NOTHING_TO_REVERT)
+
+        self.engine.bid(1, 500, '1:0:7')
+        self.engine.sell()
+        self.engine.instant_win(0)
+        self.assertEqual(self.engine.revert().outcome, Outcome.OK)
+        self.assertTrue(self.teams[0].has_free_win)
+        self.assertListEqual(self.teams[0].chores, [])
+        self.assertEqual(self.engine.revert().outcome, Outcome.OK)
+        self.assertEqual(self.teams[1].coins, constants.START_COINS)
+        self.assertIs(self.engine.cur_auction, self.auctions[0])
+        self.assertFalse(self.engine.cur_auction.is_completed)
+        self.assertListEqual(self.engine.queue.pending(), self.auctions[1:])
+
+    def test_revert_when_done(self):
+        for i in range(4):
+            self.engine.bid(i % 2, 100, '0:0:100')
+            self.engine.sell()
+        self.assertTrue(self.engine.is_done())
+        self.assertEqual(self.engine.bid(0, 100, '0:0:100').outcome, Outcome.NO_AUCTION)
+
+        self.assertEqual(self.engine.revert().outcome, Outcome.OK)
+        self.assertIs(self.engine.cur_auction, self.auctions[3])
+        self.assertListEqual(self.engine.queue.pending(), [])
+
+    def test_apply(self):
+        self.engine.bid(1, 500, '1:0:7')
+        self.engine.sell()
+        self.engine.instant_win(0)
+        self.engine.revert()
+
+        teams = [Team(0), Team(1)]
+        auctions = [Auction(Chore(f"chore {i}", "Fredag", "20:00")) for i in range(4)]
+        replayed = AuctionEngine(teams, AuctionQueue(auctions), .1)
+        for record in self.records:
+            self.assertTrue(replayed.apply(record).outcome.is_success)
+
+        self.assertEqual([t.coins for t in teams], [t.coins for t in self.teams])
+        self.assertEqual([len(t.chores) for t in teams], [len(t.chores) for t in self.teams])
+        self.assertEqual(replayed.queue.cursor, self.engine.queue.cursor)
+
+    def test_apply_late_bid(self):
+        self.engine.bid(0, 100, '', timestamp=1.)
+        self.engine.bid(0, 150, '')
+        self.engine.bid(1, 120, '', timestamp=2.)
+
+        auctions = [Auction(Chore(f"chore {i}", "Fredag", "20:00")) for i in range(4)]
+        replayed = AuctionEngine([Team(0), Team(1)], AuctionQueue(auctions), .1)
+        for record in self.records:
+            self.assertTrue(replayed.apply(record).outcome.is_success)
+
+        self.assertEqual(replayed.cur_auction.bids.accepted, self.engine.cur_auction.bids.accepted)
+        self.assertEqual([x.outcome for x in replayed.cur_auction.bids.accepted], [Outcome.OK] * 3)
+
+    def test_undo_late_bid(self):
+        self.engine.bid(0, 100, '', timestamp=1.)
+        self.engine.bid(0, 150, '', timestamp=3.)
+        self.engine.bid(1, 120, '', timestamp=2.)
+        self.engine.undo()
+
+        bids = self.engine.cur_auction.bids
+        self.assertEqual([(x.bid, x.outcome) for x in bids.accepted], [(100, Outcome.OK), (150, Outcome.OVERRIDE)])
+        self.assertEqual(self.engine.cur_auction.current_bid, 150)
+
+    def test_apply_sell_other_bidder(self):
+        self.engine.bid(1, 500, '1:0:7')
+        self.assertFalse(self.engine.apply({'op': 'sell', 'team': 0}).outcome.is_success)
+        self.assertRaises(ValueError, self.engine.apply, {'op': 'yeet'})
+
+    def test_undo_bid(self):
+        self.assertEqual(self.engine.undo().outcome, Outcome.NOTHING_TO_UNDO)
+
+        self.engine.bid(1, 500, '1:0:7')
+        self.engine.bid(0, 600, '1:3:20')
+        msg = self.engine.undo()
+        self.assertEqual(msg.outcome, Outcome.OK)
+        self.assertEqual(self.records[-1], {'op': 'undo', 'team': 0})
+        self.assertIs(self.engine.cur_auction.bidder, self.teams[1])
+        self.assertEqual(self.engine.cur_auction.current_bid, 500)
+
+        self.engine.undo()
+        self.assertIsNone(self.engine.cur_auction.bidder)
+        self.assertEqual(self.engine.undo().outcome, Outcome.NOTHING_TO_UNDO)
+
+    def test_undo_redo_sales(self):
+        self.engine.bid(1, 500, '1:0:7')
+        self.engine.sell()
+        self.engine.instant_win(0)
+        self.engine.reset()
+
+        for _ in range(4):
+            self.engine.undo()
+        self.assertEqual(self.teams[1].coins, constants.START_COINS)
+        self.assertTrue(self.teams[0].has_free_win)
+        self.assertListEqual(self.teams[1].chores, [])
+        self.assertIs(self.engine.cur_auction, self.auctions[0])
+        self.assertFalse(self.auctions[0].is_completed)
+        self.assertEqual(self.engine.stats.coins_in_circulation, 2 * constants.START_COINS)
+
+        for _ in range(4):
+            self.assertEqual(self.engine.redo().outcome, Outcome.OK)
+        self.assertEqual(self.engine.redo().outcome, Outcome.NOTHING_TO_REDO)
+        self.assertEqual(self.teams[1].coins, constants.START_COINS - 500)
+        self.assertListEqual(self.teams[0].chores, [self.auctions[1].chore])
+        self.assertIs(self.engine.cur_auction, self.auctions[2])
+        self.assertEqual(self.engine.stats.coins_in_circulation, 2 * constants.START_COINS - 500)
+
+    def test_undo_revert(self):
+        self.engine.bid(1, 500, '1:0:7')
+        self.engine.sell()
+        self.engine.revert()
+        self.engine.undo()
+        self.assertEqual(self.teams[1].coins, constants.START_COINS - 500)
+        self.assertIs(self.engine.cur_auction, self.auctions[1])
+
+    def test_new_command_clears_redo(self):
+        self.engine.bid(1, 500, '1:0:7')
+        self.engine.undo()
+        self.engine.bid(0, 100, '0:0:100')
+        self.assertEqual(self.engine.redo().outcome, Outcome.NOTHING_TO_REDO)
+
+    def test_undo_limit(self):
+        engine = AuctionEngine(self.teams, AuctionQueue(self.auctions), .1, undo_limit=2)
+        for i in range(5):
+            engine.bid(i % 2, 100 * (i + 1), f'0:0:{100 * (i + 1)}')
+        self.assertEqual(len(engine.history), 2)
+
+        engine.undo()
+        engine.undo()
+        self.assertEqual(engine.undo().outcome, Outcome.NOTHING_TO_UNDO)
+        self.assertEqual(engine.cur_auction.current_bid, 300)
+
+    def test_checkpoint(self):
+        self.engine.bid(1, 500, '1:0:7')
+        self.assertTrue(self.engine.apply({'op': 'checkpoint'}).outcome.is_success)
+        self.assertEqual(self.engine.undo().outcome, Outcome.NOTHING_TO_UNDO)
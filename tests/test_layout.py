@@ -0,0 +1,30 @@
+from tjanseauktion.layout import Box, Layout
+
+import unittest
+
+
+class TestLayout(unittest.TestCase):
+
+    def setUp(self):
+        self.layout = Layout.compute(cols=200, n_header_rows=5, n_teams=10, n_help_rows=13, n_stat_rows=6)
+
+    def test_rows(self):
+        self.assertEqual(self.layout.header_row, 1)
+        self.assertEqual(self.layout.team_table_row, 6)
+        # team table and horizontal rule
+        self.assertEqual(self.layout.textbox_text_row, 17)
+        self.assertEqual(self.layout.msg_output_row, 22)
+        self.assertEqual(self.layout.log_text_row, 24)
+        self.assertEqual(self.layout.stat_menu_row, 19)
+        self.assertEqual(self.layout.legend_menu_row, 30)
+
+    def test_boxes(self):
+        self.assertEqual(self.layout.bid_box, Box(19, 70, 1, Layout.INPUT_BOX_COLS))
+        self.assertEqual(self.layout.convert_box, Box(19, 110, 1, Layout.INPUT_BOX_COLS))
+        self.assertEqual(self.layout.log_box, Box(27, 70, Layout.LOG_BOX_ROWS, Layout.LOG_BOX_COLS))
+
+    def test_resize_only_moves_columns(self):
+        resized = Layout.compute(cols=120, n_header_rows=5, n_teams=10, n_help_rows=13, n_stat_rows=6)
+        self.assertEqual(resized.log_box.y, self.layout.log_box.y)
+        self.assertEqual(resized.log_box.x, 30)
+        self.assertEqual(resized.stat_menu_row, self.layout.stat_menu_row)
@@ -0,0 +1,93 @@
+from tjanseauktion.ledger import BidLedger, LedgerEntry
+from tjanseauktion.outcome import Outcome
+from tjanseauktion.team import Team
+
+import random
+import time
+import unittest
+
+
+class TestBidLedger(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.teams = [Team(0), Team(1), Team(2)]
+        self.ledger = BidLedger()
+
+    def entry(self, timestamp: float, bid: int, team: int, outcome: Outcome = Outcome.OK) -> LedgerEntry:
+        return LedgerEntry(timestamp, bid, f',,{bid}', self.teams[team], outcome)
+
+    def test_empty(self):
+        self.assertIsNone(self.ledger.leader)
+        self.assertEqual(self.ledger.neighbours(10.), (0, None, None))
+        self.assertAlmostEqual(self.ledger.now(), time.time(), delta=1)
+
+    def test_record(self):
+        self.ledger.record(self.entry(1., 100, 0))
+        self.ledger.record(self.entry(2., 90, 1, Outcome.BID_TOO_LOW))
+        self.ledger.record(self.entry(3., 150, 0, Outcome.OVERRIDE))
+
+        # rejected bids are only attempts
+        self.assertEqual(len(self.ledger.attempts), 3)
+        self.assertEqual(len(self.ledger), 2)
+        self.assertEqual(self.ledger.leader.bid, 150)
+
+    def test_late_bid(self):
+        self.ledger.record(self.entry(1., 100, 0))
+        self.ledger.record(self.entry(3., 150, 0, Outcome.OVERRIDE))
+
+        i, before, after = self.ledger.neighbours(2.)
+        self.assertEqual((i, before.bid, after.bid), (1, 100, 150))
+        # bids made at the same time are placed after the accepted bid
+        self.assertEqual(self.ledger.neighbours(3.)[0], 2)
+
+        self.ledger.record(self.entry(2., 120, 1))
+        self.assertEqual([x.bid for x in self.ledger.accepted], [100, 120, 150])
+        self.assertEqual(self.ledger.leader.bid, 150)
+        self.assertEqual([x.bid for x in self.ledger.attempts], [100, 150, 120])
+
+    def test_sorted(self):
+        rng = random.Random(0)
+        for _ in range(1000):
+            self.ledger.record(self.entry(rng.random(), rng.randint(0, 1000), rng.randint(0, 2)))
+
+        timestamps = [x.timestamp for x in self.ledger.accepted]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertEqual(self.ledger.timestamps, timestamps)
+        self.assertEqual(self.ledger.leader.timestamp, max(timestamps))
+
+    def test_now(self):
+        # bids made now are never placed before an accepted bid, even if the clock is behind
+        future = time.time() + 3600
+        self.ledger.record(self.entry(future, 100, 0))
+        self.assertEqual(self.ledger.now(), future)
+        self.assertIsNone(self.ledger.neighbours(self.ledger.now())[2])
+
+    def test_memento(self):
+        self.ledger.record(self.entry(1., 100, 0))
+        self.ledger.record(self.entry(3., 150, 0, Outcome.OVERRIDE))
+        memento = self.ledger.memento()
+        self.ledger.replace(1, self.entry(3., 150, 0))
+        self.ledger.record(self.entry(2., 120, 1))
+        after = self.ledger.memento()
+
+        self.ledger.restore(memento)
+        self.assertEqual([(x.bid, x.outcome) for x in self.ledger.accepted],
+                         [(100, Outcome.OK), (150, Outcome.OVERRIDE)])
+        self.assertEqual(self.ledger.timestamps, [1., 3.])
+        # attempts are a log, which is not undone
+        self.assertEqual(len(self.ledger.attempts), 3)
+
+        self.ledger.restore(after)
+        self.assertEqual([(x.bid, x.outcome) for x in self.ledger.accepted],
+                         [(100, Outcome.OK), (120, Outcome.OK), (150, Outcome.OK)])
+        self.assertEqual(self.ledger.timestamps, [1., 2., 3.])
+
+        # a new change after undoing discards the undone changes
+        self.ledger.restore(memento)
+        self.ledger.record(self.entry(4., 200, 1))
+        self.assertEqual(len(self.ledger.changes), 3)
+        self.assertEqual([x.bid for x in self.ledger.accepted], [100, 150, 200])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,19 @@
 from tjanseauktion import logger
-from tjanseauktion.logger import MessageLogger, StateLogger
+from tjanseauktion.config import Config
+from tjanseauktion.logger import MessageLogger, StateLogger, StateError, FsyncPolicy, open_engine
+from tjanseauktion.serializer import BinarySerializer
 from tjanseauktion.message import Message
 from tjanseauktion.auction import Auction
+from tjanseauktion.auction_queue import AuctionQueue
 from tjanseauktion.chore import Chore
 from tjanseauktion.team import Team
+from tjanseauktion.engine import AuctionEngine
 
+import glob
 import os
 import unittest
 import json
+from unittest import mock
 
 
 class TestMessageLogger(unittest.TestCase):
@@ -19,6 +25,7 @@ class TestMessageLogger(unittest.TestCase):
         self.logger = MessageLogger()
 
     def tearDown(self) -> None:
+        self.logger.close()
         if os.path.isfile(self.logger.path):
             os.remove(self.logger.path)
 
@@ -30,9 +37,70 @@ class TestMessageLogger(unittest.TestCase):
         msg = Message("some informative log message")
 
         self.logger.log_msg(msg)
+        self.logger.flush()
 
         with open(self.logger.path, 'r') as f:
-            self.assertEqual(f.read(), msg.txt + '\n')
+            line = f.read()
+        self.assertTrue(line.endswith('\t-\t-\t-\t' + msg.txt + '\n'))
+
+    def test_log_msg_structured(self):
+        msg = Message("team3 bid 500 coins (1:0:7)", action='bid', team=3, bid=500)
+
+        self.logger.log_msg(msg)
+        self.logger.flush()
+
+        with open(self.logger.path, 'r') as f:
+            fields = MessageLogger.parse_line(f.readline())
+        self.assertEqual(fields['action'], 'bid')
+        self.assertEqual(fields['team'], 3)
+        self.assertEqual(fields['bid'], 500)
+        self.assertIsNone(fields['bid_time'])
+        self.assertEqual(fields['txt'], msg.txt)
+
+    def test_log_msg_bid_time(self):
+        msg = Message("team3 bid 500 coins (1:0:7)", action='bid', team=3, bid=500, bid_time=1700000000.123456)
+
+        self.logger.log_msg(msg)
+        self.logger.flush()
+
+        with open(self.logger.path, 'r') as f:
+            self.assertEqual(MessageLogger.parse_line(f.readline())['bid_time'], msg.bid_time)
+
+    def test_flush_failed_writer(self):
+        log_file = self.logger._file
+        self.logger._file = mock.Mock(write=mock.Mock(side_effect=OSError('disk full')))
+        self.logger.log_msg(Message("lost"))
+        with self.assertRaises(OSError):
+            self.logger.flush()
+        self.assertFalse(self.logger._thread.is_alive())
+
+        # the thread is gone, so later calls mustn't wait for it either
+        with self.assertRaises(OSError):
+            self.logger.flush()
+        with self.assertRaises(OSError):
+            self.logger.close()
+        self.logger._error = None
+        log_file.close()
+
+    def test_parse_line_without_bid_time(self):
+        fields = MessageLogger.parse_line('2024-05-01T20:00:00.000\tbid\t3\t500\tteam3 bid 500 coins (1:0:7)\n')
+        self.assertEqual((fields['team'], fields['bid'], fields['bid_time']), (3, 500, None))
+        self.assertEqual(fields['txt'], 'team3 bid 500 coins (1:0:7)')
+
+    def test_log_msg_is_buffered(self):
+        self.logger.close()
+        self.logger = MessageLogger(flush_size=3, flush_interval=60)
+
+        self.logger.log_msg(Message("first"))
+        self.logger.log_msg(Message("second"))
+        self.assertEqual(os.path.getsize(self.logger.path), 0)
+
+        self.logger.log_msg(Message("third"))
+        self.logger.log_msg(Message("fourth"))
+        self.logger.close()
+
+        with open(self.logger.path, 'r') as f:
+            self.assertEqual([MessageLogger.parse_line(x)['txt'] for x in f], ["first", "second", "third", "fourth"])
 
 
 class TestStateLogger(unittest.TestCase):
@@ -47,17 +115,20 @@ class TestStateLogger(unittest.TestCase):
         chores = Chore.load_chores(path="tests/fixtures/test_chores.json")
         self.auctions = [Auction(c) for c in chores]
         self.cur_auction = self.auctions[0]
+        self.queue = AuctionQueue(self.auctions)
 
         self.state_json = {
-            'teams': [x.to_json() for x in self.teams],
+            'version': logger.STATE_VERSION,
+            'teams': [x.to_json({}) for x in self.teams],
             'auctions': [x.to_json() for x in self.auctions],
-            'completed_auctions': [],
-            'cur_auction': self.cur_auction.to_json()
+            'cursor': 0,
+            'seed': None
         }
 
     def tearDown(self) -> None:
-        if os.path.isfile(self.logger.path):
-            os.remove(self.logger.path)
+        # including logs moved aside
+        for path in glob.glob(f'{self.logger.path}*'):
+            os.remove(path)
 
     def test_init(self):
         self.assertEqual(self.logger.path, "tests/fixtures/state-log-4-20-1969.json")
@@ -66,8 +137,7 @@ class TestStateLogger(unittest.TestCase):
         default = {
             'teams': [],
             'auctions': [],
-            'completed_auctions': [],
-            'cur_auction': None
+            'cursor': 0
         }
 
         with open(self.logger.path, 'r') as f:
@@ -76,7 +146,7 @@ class TestStateLogger(unittest.TestCase):
         self.assertDictEqual(data, default)
 
     def test_log_state(self):
-        self.logger.log_state(self.teams, self.auctions, [], self.cur_auction)
+        self.logger.log_state(self.teams, self.queue)
 
         with open(self.logger.path, 'r') as f:
             data = json.loads(f.read())
@@ -84,18 +154,329 @@ class TestStateLogger(unittest.TestCase):
         self.assertDictEqual(data, self.state_json)
 
     def test_load_state(self):
-        self.logger.log_state(self.teams, self.auctions, [], self.cur_auction)
+        self.logger.log_state(self.teams, self.queue)
 
-        teams, auctions, completed_auctions, cur_auction = self.logger.load_state()
+        teams, queue = self.logger.load_state()
 
         self.assertListEqual(teams, self.teams)
-        self.assertListEqual(auctions, self.auctions)
-        self.assertListEqual(completed_auctions, [])
-        self.assertEqual(cur_auction, self.cur_auction)
+        self.assertListEqual(list(queue), self.auctions)
+        self.assertEqual(queue.cursor, 0)
+        self.assertEqual(queue.current, self.cur_auction)
+
+    def test_load_state_seed(self):
+        self.logger.log_state(self.teams, AuctionQueue(self.auctions, seed=1234))
+        _, queue = self.logger.load_state()
+        self.assertEqual(queue.seed, 1234)
+
+    def test_load_state_shares_objects(self):
+        self.cur_auction.try_bid(500, self.teams[1], '1:0:7', .1)
+        self.cur_auction.complete_auction()
+        self.auctions[1].try_bid(200, self.teams[2], '0:6:26', .1)
+        self.queue.advance()
+        self.logger.log_state(self.teams, self.queue)
+
+        with open(self.logger.path, 'r') as f:
+            data = json.loads(f.read())
+        self.assertEqual(data['teams'][1]['chores'], [0])
+        self.assertEqual(data['auctions'][1]['bidder'], 2)
+        self.assertEqual(data['cursor'], 1)
+
+        teams, queue = self.logger.load_state()
+        self.assertIs(queue.completed()[0].bidder, teams[1])
+        self.assertIs(teams[1].chores[0], queue.completed()[0].chore)
+        self.assertIs(queue.current.bidder, teams[2])
+        self.assertEqual(teams[1].coins, 4500)
+
+    def test_binary_serializer(self):
+        binary_logger = StateLogger(serializer=BinarySerializer())
+        try:
+            self.assertEqual(binary_logger.path, "tests/fixtures/state-log-4-20-1969.bin")
+            binary_logger.log_state(self.teams, self.queue)
+
+            teams, queue = binary_logger.load_state()
+            self.assertListEqual(teams, self.teams)
+            self.assertListEqual(list(queue), self.auctions)
+            self.assertEqual(queue.current, self.cur_auction)
+        finally:
+            os.remove(binary_logger.path)
+
+    def test_load_state_version_mismatch(self):
+        self.state_json['version'] = 1
+        with open(self.logger.path, 'w') as f:
+            f.write(json.dumps(self.state_json))
+        self.assertRaises(ValueError, self.logger.load_state)
+        with self.assertRaisesRegex(StateError, 'unsupported state log version 1'):
+            self.logger.read_state()
 
     def test_is_state_log_present(self):
         self.assertFalse(self.logger.is_state_log_present())
-        self.logger.log_state(self.teams, self.auctions, [], self.cur_auction)
+        self.logger.log_state(self.teams, self.queue)
+        self.assertTrue(self.logger.is_state_log_present())
+        self.queue.advance()
+        self.logger.log_state(self.teams, self.queue)
         self.assertTrue(self.logger.is_state_log_present())
-        self.logger.log_state(self.teams, self.auctions, [self.cur_auction], self.cur_auction)
-        self.assertTrue(self.logger.is_state_log_present())
\ No newline at end of file
+
+    def test_is_state_log_present_last_auction(self):
+        self.logger.log_state(self.teams, AuctionQueue(self.auctions, len(self.auctions) - 1))
+        self.assertTrue(self.logger.is_state_log_present())
+
+        # a finished auction is not resumed
+        self.logger.log_state(self.teams, AuctionQueue(self.auctions, len(self.auctions)))
+        self.assertFalse(self.logger.is_state_log_present())
+
+    def test_read_state(self):
+        self.assertIsNone(self.logger.read_state())
+
+        self.logger.log_state(self.teams, self.queue)
+        teams, queue = self.logger.read_state()
+        self.assertListEqual(teams, self.teams)
+        self.assertListEqual(list(queue), self.auctions)
+        self.assertEqual(queue.current, self.cur_auction)
+
+    def test_read_state_invalid(self):
+        self.state_json['teams'][0].pop('coins')
+        with open(self.logger.path, 'w') as f:
+            f.write(json.dumps(self.state_json))
+        self.assertRaisesRegex(StateError, "KeyError: 'coins'", self.logger.read_state)
+
+        with open(self.logger.path, 'w') as f:
+            f.write('{"teams": [{"coi')
+        self.assertRaises(StateError, self.logger.read_state)
+
+    def test_read_state_finished(self):
+        self.logger.log_state(self.teams, AuctionQueue(self.auctions, len(self.auctions)))
+        self.assertIsNone(self.logger.read_state())
+
+        # the finished auction is moved aside when a new one is started
+        self.logger.init_state(self.teams, self.queue)
+        with open(f'{self.logger.path}.1', 'r') as f:
+            self.assertEqual(json.loads(f.read())['cursor'], len(self.auctions))
+        self.assertEqual(self.logger.read_state()[1].cursor, 0)
+
+    def test_read_state_other_format(self):
+        binary_logger = StateLogger(serializer=BinarySerializer())
+        try:
+            binary_logger.log_state(self.teams, self.queue)
+            with self.assertRaisesRegex(StateError, 'format = binary'):
+                self.logger.read_state()
+        finally:
+            os.remove(binary_logger.path)
+
+    def test_snapshot_parsed_once(self):
+        self.logger.log_state(self.teams, self.queue)
+
+        with mock.patch.object(logger.json, 'loads', wraps=json.loads) as loads:
+            self.assertTrue(self.logger.is_state_log_present())
+            self.logger.load_state()
+            self.assertEqual(loads.call_count, 1)
+
+            # rewriting the snapshot invalidates the parsed document
+            self.queue.advance()
+            self.logger.log_state(self.teams, self.queue)
+            _, queue = self.logger.load_state()
+            self.assertEqual(loads.call_count, 2)
+            self.assertEqual(queue.n_completed, 1)
+
+    def test_is_state_log_present_truncated(self):
+        with open(self.logger.path, 'w') as f:
+            f.write('{"teams": [{"coi')
+        self.assertFalse(self.logger.is_state_log_present())
+
+    def test_log_state_is_atomic(self):
+        self.logger.log_state(self.teams, self.queue)
+        self.assertFalse(os.path.isfile(self.logger.path + '.tmp'))
+
+class TestStateJournal(unittest.TestCase):
+
+    def setUp(self) -> None:
+        logger.LOG_DIR = 'tests/fixtures'
+        logger.TIMESTAMP = '4-20-1969'
+
+        self.logger = StateLogger(journal=True, snapshot_interval=3)
+
+        teams = [Team(0), Team(1), Team(2)]
+        auctions = [Auction(c) for c in Chore.load_chores(path="tests/fixtures/test_chores.json")]
+        self.engine = AuctionEngine(teams, AuctionQueue(auctions), .1)
+        self.engine.subscribe(self._persist)
+
+        self.logger.init_state(*self.engine.state())
+
+    def tearDown(self) -> None:
+        self.logger.close()
+        for path in glob.glob(f'{self.logger.path}*') + glob.glob(f'{self.logger.journal_path}*'):
+            os.remove(path)
+
+    def _persist(self, record: dict, _):
+        if self.logger.log_action(record, *self.engine.state()):
+            self.engine.checkpoint()
+
+    def _log(self, action: dict):
+        self.assertTrue(self.engine.apply(action).outcome.is_success)
+
+    def test_init_state(self):
+        records = self.logger.read_journal()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['op'], 'init')
+
+        with open(self.logger.path, 'r') as f:
+            data = json.loads(f.read())
+        self.assertEqual(data['journal_offset'], os.path.getsize(self.logger.journal_path))
+
+    def test_log_action_appends(self):
+        with open(self.logger.path, 'r') as f:
+            snapshot = f.read()
+
+        self._log({'op': 'bid', 'team': 1, 'bid': 500, 'bid_str': '1:0:7'})
+
+        self.assertEqual(len(self.logger.read_journal()), 2)
+        # snapshot is not rewritten until the snapshot interval is reached
+        with open(self.logger.path, 'r') as f:
+            self.assertEqual(f.read(), snapshot)
+
+    def test_compaction(self):
+        self._log({'op': 'bid', 'team': 1, 'bid': 500, 'bid_str': '1:0:7'})
+        self._log({'op': 'sell', 'team': 1})
+        self._log({'op': 'win', 'team': 2})
+
+        self.assertEqual(self.logger.n_journal_records, 0)
+        with open(self.logger.path, 'r') as f:
+            data = json.loads(f.read())
+        self.assertEqual(data['journal_offset'], os.path.getsize(self.logger.journal_path))
+        self.assertEqual(data['teams'][1]['coins'], 4500)
+
+        # snapshots don't include the undo history
+        self.assertEqual(self.logger.read_journal()[-1], {'op': 'checkpoint'})
+        self.assertFalse(self.engine.history.can_undo())
+
+    def test_late_bid_after_compaction(self):
+        self._log({'op': 'bid', 'team': 0, 'bid': 100, 'bid_str': ',,100', 'timestamp': 1000.})
+        self._log({'op': 'bid', 'team': 1, 'bid': 200, 'bid_str': ',,200', 'timestamp': 1010.})
+        self._log({'op': 'bid', 'team': 0, 'bid': 300, 'bid_str': ',,300', 'timestamp': 1020.})
+        self.assertEqual(self.logger.n_journal_records, 0)
+        # checked against the bids made before and after it, which are only in the snapshot
+        self._log({'op': 'bid', 'team': 2, 'bid': 150, 'bid_str': ',,150', 'timestamp': 1005.})
+        self.logger.close()
+
+        state_logger = StateLogger(journal=True)
+        engine = AuctionEngine(*state_logger.read_state(), overbid_factor=.1)
+        self.assertEqual(state_logger.replay_journal(engine), 1)
+        self.assertEqual([(x.timestamp, x.bid, x.bidder.id) for x in engine.cur_auction.bids.accepted],
+                         [(1000., 100, 0), (1005., 150, 2), (1010., 200, 1), (1020., 300, 0)])
+        self.assertEqual(engine.cur_auction.current_bid, 300)
+
+    def test_load_state_replays_tail(self):
+        self._log({'op': 'bid', 'team': 1, 'bid': 500, 'bid_str': '1:0:7'})
+        self._log({'op': 'sell', 'team': 1})
+        self._log({'op': 'bid', 'team': 0, 'bid': 200, 'bid_str': '0:6:26'})
+        self._log({'op': 'win', 'team': 2})
+        self._log({'op': 'revert'})
+
+        state_logger = StateLogger(journal=True)
+        engine = AuctionEngine(*state_logger.load_state(), overbid_factor=.1)
+        # snapshot was taken after the third record
+        self.assertEqual(state_logger.replay_journal(engine), 2)
+
+        self.assertEqual([t.coins for t in engine.teams], [t.coins for t in self.engine.teams])
+        self.assertEqual([len(t.chores) for t in engine.teams], [0, 1, 0])
+        self.assertTrue(engine.teams[2].has_free_win)
+        self.assertEqual(engine.queue.cursor, 1)
+        self.assertEqual(engine.cur_auction.chore, self.engine.cur_auction.chore)
+        self.assertIsNone(engine.cur_auction.bidder)
+
+    def test_replay_journal_rejected_record(self):
+        self._log({'op': 'bid', 'team': 1, 'bid': 500, 'bid_str': '1:0:7'})
+
+        state_logger = StateLogger(journal=True)
+        engine = AuctionEngine(*state_logger.load_state(), overbid_factor=.1)
+        # diverge from the journal, making its bid too low
+        engine.bid(1, 600, '1:3:20')
+        self.assertRaises(StateError, state_logger.replay_journal, engine)
+
+    def test_init_state_moves_logs_aside(self):
+        self._log({'op': 'bid', 'team': 1, 'bid': 500, 'bid_str': '1:0:7'})
+        self.logger.init_state(*self.engine.state())
+
+        self.assertEqual([r['op'] for r in self.logger.read_journal()], ['init'])
+        self.assertEqual([r['op'] for r in StateLogger.parse_journal(f'{self.logger.journal_path}.1')],
+                         ['init', 'bid'])
+        self.assertTrue(os.path.isfile(f'{self.logger.path}.1'))
+
+    def test_read_state_journal_without_snapshot(self):
+        os.remove(self.logger.path)
+        state_logger = StateLogger(journal=True)
+        self.assertRaisesRegex(StateError, 'has no snapshot', state_logger.read_state)
+        # the journal is left as is
+        self.assertEqual(len(state_logger.read_journal()), 1)
+
+    def test_read_journal_ignores_torn_record(self):
+        self._log({'op': 'reset'})
+        with open(self.logger.journal_path, 'ab') as f:
+            f.write(b'{"op":"bi')
+
+        records = self.logger.read_journal()
+        self.assertEqual([r['op'] for r in records], ['init', 'reset'])
+
+
+class TestOpenEngine(unittest.TestCase):
+
+    def setUp(self) -> None:
+        logger.LOG_DIR = 'tests/fixtures'
+        logger.TIMESTAMP = '4-20-1969'
+
+        self.settings = Config('tests/fixtures/test_cfg.ini').settings(env={}, overrides={
+            'auction.n_teams': '3', 'auction.n_secrets': '1', 'auction.min_overbid_percent': '10'})
+        self.state_logger = StateLogger(journal=True, snapshot_interval=3)
+        self.msg_logger = MessageLogger()
+
+    def tearDown(self) -> None:
+        self.state_logger.close()
+        self.msg_logger.close()
+        for path in [self.state_logger.path, self.state_logger.journal_path, self.msg_logger.path]:
+            if os.path.isfile(path):
+                os.remove(path)
+
+    def test_open_engine(self):
+        engine = open_engine(self.settings, 1234, self.state_logger, self.msg_logger)
+        self.assertEqual(engine.queue.seed, 1234)
+        self.assertEqual(len(engine.teams), 3)
+        engine.bid(1, 500, '1:0:7')
+        engine.sell()
+        self.state_logger.close()
+
+        # the seed is ignored when resuming
+        resumed = open_engine(self.settings, 1, StateLogger(journal=True), self.msg_logger)
+        self.assertEqual(resumed.queue.seed, 1234)
+        self.assertEqual(resumed.queue.cursor, 1)
+        self.assertEqual(resumed.teams[1].coins, engine.teams[1].coins)
+        self.assertEqual([r['op'] for r in self.state_logger.read_journal()], ['init', 'bid', 'sell'])
+
+
+class TestFsyncPolicy(unittest.TestCase):
+
+    def test_from_str(self):
+        policy = FsyncPolicy.from_str('always')
+        self.assertEqual((policy.every_n_actions, policy.every_ms), (1, 0))
+        policy = FsyncPolicy.from_str('never')
+        self.assertEqual((policy.every_n_actions, policy.every_ms), (0, 0))
+        policy = FsyncPolicy.from_str('10')
+        self.assertEqual((policy.every_n_actions, policy.every_ms), (10, 0))
+        policy = FsyncPolicy.from_str('250ms')
+        self.assertEqual((policy.every_n_actions, policy.every_ms), (0, 250))
+
+    def test_should_sync_every_n_actions(self):
+        policy = FsyncPolicy(every_n_actions=3)
+        self.assertFalse(policy.should_sync())
+        self.assertFalse(policy.should_sync())
+        self.assertTrue(policy.should_sync())
+        policy.synced()
+        self.assertFalse(policy.should_sync())
+
+    def test_should_sync_never(self):
+        policy = FsyncPolicy(every_n_actions=0)
+        self.assertFalse(any(policy.should_sync() for _ in range(100)))
+
+    def test_should_sync_every_ms(self):
+        policy = FsyncPolicy(every_n_actions=0, every_ms=1000)
+        self.assertFalse(policy.should_sync())
+        policy.last_sync -= 1
+        self.assertTrue(policy.should_sync())
@@ -0,0 +1,113 @@
+from tjanseauktion import logger, replay
+from tjanseauktion.logger import MessageLogger, StateLogger
+from tjanseauktion.auction import Auction
+from tjanseauktion.auction_queue import AuctionQueue
+from tjanseauktion.chore import Chore
+from tjanseauktion.engine import AuctionEngine
+from tjanseauktion.team import Team
+
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self) -> None:
+        logger.LOG_DIR = 'tests/fixtures'
+        logger.TIMESTAMP = '4-20-1969'
+
+        self.state_logger = StateLogger(journal=True, snapshot_interval=6)
+        self.msg_logger = MessageLogger()
+
+        self.teams = [Team(0), Team(1), Team(2)]
+        self.auctions = [Auction(c) for c in Chore.load_chores(path="tests/fixtures/test_chores.json")]
+        self.engine = AuctionEngine(self.teams, AuctionQueue(self.auctions), .1)
+        self.engine.subscribe(self._persist)
+        self.state_logger.init_state(*self.engine.state())
+
+        self.engine.bid(1, 500, '1:0:7')
+        self.engine.bid(2, 600, '1:3:20')
+        self.engine.sell()
+        self.engine.instant_win(0)
+        self.engine.undo()
+        self.engine.redo()
+        self.engine.bid(0, 100, '0:0:100')
+        self.engine.reset()
+        self.engine.bid(1, 200, '0:6:26')
+        self.engine.revert()
+        self.msg_logger.close()
+
+    def _persist(self, record: dict, msg):
+        self.msg_logger.log_msg(msg)
+        if self.state_logger.log_action(record, *self.engine.state()):
+            self.engine.checkpoint()
+
+    def tearDown(self) -> None:
+        self.state_logger.close()
+        for path in [self.state_logger.path, self.state_logger.journal_path, self.msg_logger.path]:
+            if os.path.isfile(path):
+                os.remove(path)
+
+    def test_replay_journal(self):
+        state, records = replay.read_journal(self.state_logger.journal_path)
+        result = replay.replay(state, records, .1, 1000)
+        self.assertEqual(result.n_actions, len(records))
+        self.assertListEqual(replay.diff_state(self.engine, result.engine), [])
+
+        recovered, snapshot_path = replay.recover(self.state_logger.journal_path, .1, 1000)
+        self.assertEqual(snapshot_path, self.state_logger.path)
+        self.assertListEqual(replay.diff_state(recovered, result.engine), [])
+
+    def test_read_message_log(self):
+        records = replay.read_message_log(self.msg_logger.path)
+        self.assertEqual(len(records), 10)
+        self.assertEqual(records[0], {'op': 'bid', 'team': 1, 'bid': 500, 'bid_str': '1:0:7',
+                                      'timestamp': self.auctions[0].bids.accepted[0].timestamp})
+        self.assertEqual(records[2], {'op': 'sell', 'team': 2})
+        self.assertEqual(records[4], {'op': 'undo'})
+
+    def test_replay_message_log(self):
+        self.assertEqual(replay.default_journal(self.msg_logger.path), self.state_logger.journal_path)
+
+        state, _ = replay.read_journal(self.state_logger.journal_path)
+        result = replay.replay(state, replay.read_message_log(self.msg_logger.path), .1, 1000)
+        self.assertListEqual(replay.diff_state(self.engine, result.engine), [])
+
+    def test_replay_message_log_late_bid(self):
+        self.msg_logger = MessageLogger()
+        # the bid of team1 is entered after the OVERRIDE of team0 it was made before
+        self.engine.bid(0, 100, ',,100', timestamp=1.)
+        self.engine.bid(0, 150, ',,150', timestamp=3.)
+        self.engine.bid(1, 120, ',,120', timestamp=2.)
+        self.engine.sell()
+        self.msg_logger.close()
+
+        state, _ = replay.read_journal(self.state_logger.journal_path)
+        records = replay.read_message_log(self.msg_logger.path)
+        self.assertEqual(records[-2]['timestamp'], 2.)
+        result = replay.replay(state, records, .1, 1000)
+        self.assertListEqual(replay.diff_state(self.engine, result.engine), [])
+        self.assertEqual(self.teams[0].coins, 4850)
+
+    def test_main(self):
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(replay.main(self.msg_logger.path, None, .1, 1000), 0)
+        self.assertIn('OK: final state matches', out.getvalue())
+
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(replay.main('tests/fixtures/nope.journal', None, .1, 1000), 2)
+
+    def test_replay_rejected(self):
+        state, records = replay.read_journal(self.state_logger.journal_path)
+        # a bid that doesn't beat the previous one
+        records.insert(1, {'op': 'bid', 'team': 0, 'bid': 100, 'bid_str': '0:0:100'})
+        self.assertRaises(ValueError, replay.replay, state, records, .1, 1000)
+
+    def test_diff_state(self):
+        state, records = replay.read_journal(self.state_logger.journal_path)
+        result = replay.replay(state, records[:2], .1, 1000)
+        diffs = replay.diff_state(self.engine, result.engine)
+        self.assertIn('team2: expected 4400 coins, got 5000', diffs)
+        self.assertIn('expected 1 completed auctions, got 0', diffs)
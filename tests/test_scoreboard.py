@@ -0,0 +1,71 @@
+from tjanseauktion.auction import Auction
+from tjanseauktion.auction_queue import AuctionQueue
+from tjanseauktion.chore import Chore
+from tjanseauktion.engine import AuctionEngine
+from tjanseauktion.scoreboard import Scoreboard, apply_delta, render
+from tjanseauktion.team import Team
+
+import copy
+import unittest
+
+
+class TestScoreboard(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.teams = [Team(0), Team(1)]
+        self.auctions = [Auction(Chore(f"chore {i}", "Fredag", "20:00")) for i in range(2)]
+        self.engine = AuctionEngine(self.teams, AuctionQueue(self.auctions), .1)
+        self.scoreboard = Scoreboard(self.engine)
+
+    def test_snapshot(self):
+        snapshot = self.scoreboard.snapshot()
+        self.assertEqual(snapshot['auction'], {'cursor': 0, 'chore': str(self.auctions[0]), 'current_bid': 0,
+                                               'current_bid_str': '', 'bidder': None})
+        self.assertEqual(snapshot['teams'], [{'id': 0, 'coins': 5000, 'chores': 0, 'has_free_win': True},
+                                             {'id': 1, 'coins': 5000, 'chores': 0, 'has_free_win': True}])
+
+    def test_changes(self):
+        self.assertEqual(self.scoreboard.changes(), {})
+
+        self.engine.bid(1, 100, '0,0,100')
+        self.assertEqual(self.scoreboard.changes(),
+                         {'auction': {'current_bid': 100, 'current_bid_str': '0,0,100', 'bidder': 1}})
+        # changes are only published once
+        self.assertEqual(self.scoreboard.changes(), {})
+
+        self.engine.instant_win(0)
+        changes = self.scoreboard.changes()
+        self.assertEqual(changes['teams'], [{'id': 0, 'chores': 1, 'has_free_win': False}])
+        self.assertEqual(changes['auction']['cursor'], 1)
+
+        self.engine.bid(1, 100, '0,0,100')
+        self.engine.sell()
+        changes = self.scoreboard.changes()
+        self.assertEqual(changes['teams'], [{'id': 1, 'coins': 4900, 'chores': 1}])
+        self.assertIsNone(changes['auction'])
+
+        self.engine.undo()
+        self.assertEqual(self.scoreboard.changes()['auction']['cursor'], 1)
+
+    def test_apply_delta(self):
+        state = copy.deepcopy(self.scoreboard.snapshot())
+        for command in [lambda: self.engine.bid(0, 100, ''), lambda: self.engine.bid(1, 200, ''), self.engine.sell,
+                        lambda: self.engine.instant_win(0), self.engine.undo, self.engine.revert]:
+            command()
+            apply_delta(state, self.scoreboard.changes())
+            self.assertEqual(state, Scoreboard(self.engine).snapshot())
+
+    def test_render(self):
+        self.engine.bid(1, 522, '1,1,0')
+        self.scoreboard.changes()
+        lines = render(self.scoreboard.snapshot(), txt='team1 bid 522 coins').splitlines()
+
+        self.assertEqual(lines[0], f'Current auction: {self.auctions[0]}')
+        self.assertEqual(lines[1], 'Highest bidder: team1 (522 / 1,1,0)')
+        self.assertIn('5000 coins (10,2,12)', lines[3])
+        self.assertIn('instant win', lines[3])
+        self.assertEqual(lines[-1], 'team1 bid 522 coins')
+
+
+if __name__ == '__main__':
+    unittest.main()
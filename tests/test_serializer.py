@@ -0,0 +1,33 @@
+from tjanseauktion.serializer import Serializer, JsonSerializer, CompactJsonSerializer, BinarySerializer, get_serializer
+
+import unittest
+
+
+class TestSerializer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.data = {
+            'teams': [{'coins': 5000, 'chores': [0, 2], 'id': 0, 'has_free_win': True}],
+            'cur_auction': {'chore': {'desc': "Udendørsvagt", 'day': "Lørdag", 'time': "8:00"}, 'bidder': None}
+        }
+
+    def test_round_trip(self):
+        for serializer in [JsonSerializer(), CompactJsonSerializer(), BinarySerializer()]:
+            self.assertDictEqual(serializer.loads(serializer.dumps(self.data)), self.data)
+
+    def test_compact_is_smaller(self):
+        self.assertLess(len(CompactJsonSerializer().dumps(self.data)), len(JsonSerializer().dumps(self.data)))
+
+    def test_loads_invalid(self):
+        for serializer in [JsonSerializer(), CompactJsonSerializer(), BinarySerializer()]:
+            raw = serializer.dumps(self.data)
+            self.assertRaises(ValueError, serializer.loads, raw[:len(raw) // 2])
+
+    def test_get_serializer(self):
+        self.assertIsInstance(get_serializer('json'), JsonSerializer)
+        self.assertIsInstance(get_serializer('compact'), CompactJsonSerializer)
+        self.assertIsInstance(get_serializer('binary'), BinarySerializer)
+        self.assertRaises(ValueError, get_serializer, 'xml')
+
+    def test_abstract(self):
+        self.assertRaises(TypeError, Serializer)
@@ -0,0 +1,245 @@
+from tjanseauktion.auction import Auction
+from tjanseauktion.auction_queue import AuctionQueue
+from tjanseauktion.chore import Chore
+from tjanseauktion.engine import AuctionEngine
+from tjanseauktion.scoreboard import Scoreboard, apply_delta
+from tjanseauktion.server import AuctionClient, AuctionServer
+from tjanseauktion.team import Team
+
+import asyncio
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+from unittest import mock
+
+
+class TestAuctionServer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.teams = [Team(0), Team(1), Team(2)]
+        self.auctions = [Auction(Chore(f"chore {i}", "Fredag", "20:00")) for i in range(6)]
+        self.engine = AuctionEngine(self.teams, AuctionQueue(self.auctions), .1)
+        self.messages = []
+        self.server = AuctionServer(self.engine, on_message=self.messages.append)
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self) -> None:
+        self.loop.run_until_complete(self.server.close())
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(asyncio.wait_for(coroutine, 5))
+
+    async def connect(self, n: int) -> list:
+        port = await self.server.listen_tcp('127.0.0.1', 0)
+        return [await AuctionClient.connect('127.0.0.1', port) for _ in range(n)]
+
+    def test_snapshot(self):
+        async def test():
+            client, = await self.connect(1)
+            snapshot = await client.receive()
+            client.close()
+            return snapshot
+
+        snapshot = self.run_async(test())
+        self.assertEqual(snapshot['type'], 'snapshot')
+        self.assertEqual(snapshot['seq'], 0)
+        self.assertEqual(snapshot['auction']['chore'], str(self.auctions[0]))
+        self.assertIsNone(snapshot['auction']['bidder'])
+        self.assertEqual(snapshot['teams'][2], {'id': 2, 'coins': 5000, 'chores': 0, 'has_free_win': True})
+
+    def test_bid_broadcast(self):
+        async def test():
+            a, b = await self.connect(2)
+            await a.receive()
+            await b.receive()
+
+            result = await a.request('bid', '1 ,,100')
+            delta = await b.receive()
+            a.close()
+            b.close()
+            return result, delta
+
+        result, delta = self.run_async(test())
+        self.assertEqual(result['type'], 'result')
+        self.assertEqual(result['outcome'], 'ok')
+        self.assertEqual(result['seq'], 1)
+
+        self.assertEqual(delta['type'], 'delta')
+        self.assertEqual(delta['seq'], 1)
+        self.assertEqual(delta['timestamp'], result['timestamp'])
+        self.assertEqual((delta['op'], delta['team']), ('bid', 1))
+        self.assertEqual(delta['auction']['current_bid'], 100)
+        self.assertEqual(delta['auction']['current_bid_str'], '0,0,100')
+        self.assertEqual(delta['auction']['bidder'], 1)
+        # bids don't change teams
+        self.assertNotIn('teams', delta)
+        self.assertEqual(self.auctions[0].bidder, self.teams[1])
+
+    def test_sell_delta(self):
+        async def test():
+            a, b = await self.connect(2)
+            await a.receive()
+            await b.receive()
+            await a.request('bid', '2 ,,300')
+            await b.request('sell')
+            # the result of a command is sent before its delta
+            b.events.append(await b.receive())
+            a.close()
+            b.close()
+            return b.events
+
+        events = self.run_async(test())
+        self.assertEqual([x['op'] for x in events], ['bid', 'sell'])
+        sell = events[1]
+        # only changed fields are sent
+        self.assertEqual(sell['teams'], [{'id': 2, 'coins': 4700, 'chores': 1}])
+        self.assertEqual(sell['auction'], {'cursor': 1, 'chore': str(self.auctions[1]), 'current_bid': 0,
+                                           'current_bid_str': '', 'bidder': None})
+        self.assertEqual(self.engine.queue.cursor, 1)
+
+    def test_errors(self):
+        async def test():
+            client, = await self.connect(1)
+            await client.receive()
+            results = [await client.request('bid', '1 1:0:7'), await client.request('bid'),
+                       await client.request('jump'), await client.request('sell'),
+                       await client.request('bid', '9 ,,100')]
+            client.writer.write(b'not json\n')
+            results.append(await client.receive())
+            client.close()
+            return results, client.events
+
+        results, events = self.run_async(test())
+        self.assertEqual([x['outcome'] for x in results], ['invalid_command', 'invalid_command', 'invalid_command',
+                                                           'no_bids', 'unknown_team', 'invalid_command'])
+        self.assertIn('column 4', results[0]['txt'])
+        self.assertIsNone(results[-1]['id'])
+        # failed commands are not broadcast
+        self.assertEqual(events, [])
+        self.assertEqual(len(self.messages), 5)
+
+    def test_failing_command(self):
+        async def test():
+            client, = await self.connect(1)
+            await client.receive()
+            with mock.patch.object(self.engine, 'sell', side_effect=RuntimeError('disk full')):
+                failed = await client.request('sell')
+            result = await client.request('bid', '1 ,,100')
+            client.close()
+            return failed, result
+
+        with redirect_stderr(StringIO()) as err:
+            failed, result = self.run_async(test())
+        self.assertEqual(failed['outcome'], 'invalid_command')
+        self.assertIn('disk full', failed['txt'])
+        self.assertIn('RuntimeError', err.getvalue())
+        # commands after the failed one are still executed
+        self.assertEqual(result['outcome'], 'ok')
+        self.assertEqual(self.auctions[0].bidder, self.teams[1])
+
+    def test_late_bid(self):
+        async def test():
+            client, = await self.connect(1)
+            await client.receive()
+            results = [await client.request('bid', '0 ,,100 @60'), await client.request('bid', '0 ,,150'),
+                       await client.request('bid', '1 ,,120 @30'), await client.request('bid', '2 ,,130 @-1')]
+            client.close()
+            return results
+
+        results = self.run_async(test())
+        self.assertEqual([x['outcome'] for x in results], ['ok', 'override', 'ok', 'invalid_command'])
+        self.assertEqual([(x.bidder.id, x.bid) for x in self.auctions[0].bids.accepted],
+                         [(0, 100), (1, 120), (0, 150)])
+        self.assertEqual(self.auctions[0].current_bid, 150)
+
+    def test_ordering(self):
+        """
+        Commands sent concurrently by several operators are executed one at a time in the order received
+        """
+        async def test():
+            clients = await self.connect(4)
+            snapshots = [await x.receive() for x in clients]
+
+            async def bid(client, team):
+                for i in range(25):
+                    await client.send('bid', f'{team} ,,{100 + i * 100 + team}')
+
+            await asyncio.gather(*(bid(x, i) for i, x in enumerate(clients[:3])))
+            await clients[3].send('sell')
+
+            events = []
+            while not events or events[-1]['op'] != 'sell':
+                data = await clients[3].receive()
+                if data['type'] == 'delta':
+                    events.append(data)
+            for client in clients:
+                client.close()
+            return snapshots[3], events
+
+        state, events = self.run_async(test())
+        seqs = [x['seq'] for x in events]
+        self.assertEqual(seqs, sorted(seqs))
+        self.assertEqual(len(set(seqs)), len(seqs))
+        self.assertEqual(self.server.executed_seq, 76)
+        timestamps = [x['timestamp'] for x in events]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+        # applying the deltas to the snapshot ends in the state of the engine
+        for delta in events:
+            apply_delta(state, delta)
+        self.assertEqual({k: state[k] for k in ['auction', 'teams']}, Scoreboard(self.engine).snapshot())
+        self.assertEqual(state['teams'][self.auctions[0].bidder.id]['chores'], 1)
+
+    def test_viewers(self):
+        async def test():
+            operator, = await self.connect(1)
+            port = await self.server.listen_tcp('127.0.0.1', 0, read_only=True)
+            viewers = [await AuctionClient.connect('127.0.0.1', port) for _ in range(20)]
+            await operator.receive()
+            states = [await x.receive() for x in viewers]
+
+            rejected = await viewers[0].request('sell')
+            await operator.request('bid', '0 ,,100')
+            await operator.request('bid', '1 ,,200')
+            await operator.request('sell')
+            for viewer, state in zip(viewers, states):
+                for _ in range(3):
+                    apply_delta(state, await viewer.receive())
+                viewer.close()
+            operator.close()
+            return rejected, states
+
+        rejected, states = self.run_async(test())
+        self.assertEqual(rejected['outcome'], 'invalid_command')
+        self.assertEqual(self.engine.queue.cursor, 1)
+        expected = Scoreboard(self.engine).snapshot()
+        for state in states:
+            self.assertEqual(state['seq'], 0)
+            self.assertEqual({k: state[k] for k in ['auction', 'teams']}, expected)
+
+    @unittest.skipUnless(hasattr(asyncio, 'start_unix_server'), 'Unix sockets are not supported')
+    def test_unix_socket(self):
+        async def test(path):
+            await self.server.listen_unix(path)
+            client = await AuctionClient.connect(path=path)
+            await client.receive()
+            result = await client.request('bid', '0 win')
+            client.close()
+            return result
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = self.run_async(test(os.path.join(tmp_dir, 'auction.sock')))
+
+        self.assertEqual(result['outcome'], 'ok')
+        self.assertFalse(self.teams[0].has_free_win)
+        self.assertEqual(self.engine.queue.cursor, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+from tjanseauktion import simulation
+from tjanseauktion.auction import Auction
+from tjanseauktion.chore import Chore
+from tjanseauktion.simulation import SimulationParams, SimulationSummary
+from tjanseauktion.team import Team
+
+import random
+import unittest
+
+
+class TestSimulation(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.chores = Chore.load_chores(path="tests/fixtures/test_chores.json")
+        self.params = SimulationParams(n_teams=4, n_secrets=1, overbid_factor=.1, start_coins=1000)
+
+    def test_get_strategy(self):
+        self.assertIsInstance(simulation.get_strategy('sniper'), simulation.SniperBot)
+        with self.assertRaises(ValueError):
+            simulation.get_strategy('yolo')
+        # strategies must implement Bot.limit
+        self.assertRaises(TypeError, simulation.Bot)
+
+    def test_gini(self):
+        self.assertEqual(simulation.gini([1., 1., 1.]), 0)
+        self.assertEqual(simulation.gini([0., 0.]), 0)
+        self.assertAlmostEqual(simulation.gini([0., 0., 0., 1.]), .75)
+
+    def test_run_bidding(self):
+        teams = [Team(i) for i in range(3)]
+        bots = [simulation.GreedyBot(), simulation.GreedyBot(), simulation.SniperBot()]
+        auction = Auction(self.chores[0])
+
+        # bidding stops once team1 can't afford to outbid team0 within its limit
+        leader = simulation.run_bidding(auction, teams, bots, [100, 50, 0], [0, 1, 2], .1)
+        self.assertEqual(leader, 0)
+        self.assertEqual(auction.bidder, teams[0])
+        self.assertGreater(Auction.min_bid(auction.current_bid, .1), 50)
+        self.assertLessEqual(auction.current_bid, Auction.min_bid(50, .1))
+
+        # the sniper jumps straight to its limit once the greedy bots stop
+        auction.reset_bids()
+        leader = simulation.run_bidding(auction, teams, bots, [40, 30, 400], [2, 1, 0], .1)
+        self.assertEqual(leader, 2)
+        self.assertEqual(auction.current_bid, 400)
+
+        auction.reset_bids()
+        self.assertIsNone(simulation.run_bidding(auction, teams, bots, [0, 0, 0], [0, 1, 2], .1))
+        self.assertIsNone(auction.bidder)
+
+    def test_simulate_auction(self):
+        summary = simulation.simulate_auction(self.chores, self.params, random.Random(1))
+
+        self.assertEqual(summary.n_runs, 1)
+        # every chore is either bought, won instantly or given away
+        self.assertEqual(summary.n_bought + summary.n_instant_wins + summary.n_freebies + summary.n_unsold,
+                         summary.n_auctions)
+        self.assertEqual(sum(x.n_teams for x in summary.strategies.values()), 4)
+        self.assertLessEqual(sum(x.coins_left for x in summary.strategies.values()), 4 * 1000)
+        self.assertLessEqual(summary.n_instant_wins, 4)
+
+    def test_simulate_seeded(self):
+        a = simulation.simulate(self.chores, self.params, 20, seed=3, workers=1)
+        b = simulation.simulate(self.chores, self.params, 20, seed=3, workers=1)
+        self.assertEqual(a.prices, b.prices)
+        self.assertEqual(a.gini_sum, b.gini_sum)
+
+    def test_simulate_workers(self):
+        """
+        Simulating in a process pool gives the same outcome as simulating in this process
+        """
+        serial = simulation.simulate(self.chores, self.params, 20, workers=1)
+        parallel = simulation.simulate(self.chores, self.params, 20, workers=2)
+
+        self.assertEqual(parallel.n_runs, 20)
+        self.assertEqual(parallel.prices, serial.prices)
+        self.assertEqual(parallel.n_instant_wins, serial.n_instant_wins)
+        self.assertAlmostEqual(parallel.gini_sum, serial.gini_sum)
+
+    def test_summary(self):
+        summary = SimulationSummary()
+        summary.prices.update({100: 2, 200: 1, 600: 1})
+
+        self.assertEqual(summary.mean_price, 250)
+        self.assertEqual(summary.price_percentile(50), 100)
+        self.assertEqual(summary.price_percentile(90), 600)
+
+        other = SimulationSummary()
+        other.prices.update({100: 1})
+        other.n_runs = 1
+        summary.merge(other)
+        self.assertEqual(summary.prices[100], 3)
+        self.assertEqual(summary.n_runs, 1)
+        self.assertIn('p50 100', summary.report())
+
+
+if __name__ == '__main__':
+    unittest.main()
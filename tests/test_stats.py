@@ -0,0 +1,67 @@
+from tjanseauktion import constants
+from tjanseauktion.auction import Auction
+from tjanseauktion.auction_queue import AuctionQueue
+from tjanseauktion.chore import Chore
+from tjanseauktion.engine import AuctionEngine
+from tjanseauktion.stats import AuctionStats
+from tjanseauktion.team import Team
+
+import unittest
+
+
+class TestAuctionStats(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.teams = [Team(0), Team(1)]
+        self.auctions = [Auction(Chore(f"chore {i}", "Fredag", "20:00")) for i in range(4)]
+        self.auctions[1].is_secret = True
+        self.auctions.append(Auction(Chore(constants.FREE_CHORE_DESC, '', '')))
+        self.engine = AuctionEngine(self.teams, AuctionQueue(self.auctions), .1)
+
+    def assertStatsConsistent(self):
+        """
+        Incrementally maintained stats must match stats computed from scratch
+        """
+        expected = AuctionStats.from_state(self.teams, self.engine.queue, self.engine.n_chores_per_team)
+        self.assertDictEqual(vars(self.engine.stats), vars(expected))
+
+    def test_from_state(self):
+        stats = self.engine.stats
+        self.assertEqual(stats.secrets_left, 1)
+        self.assertEqual(stats.free_chores_left, 1)
+        self.assertEqual(stats.teams_satisfied, 0)
+        self.assertEqual(stats.coins_in_circulation, 2 * constants.START_COINS)
+        self.assertEqual(stats.average_price, 0)
+
+    def test_completed(self):
+        self.engine.bid(0, 300, '0:0:300')
+        self.engine.sell()
+        self.engine.bid(1, 100, '0:0:100')
+        self.engine.sell()
+        self.engine.instant_win(0)
+
+        stats = self.engine.stats
+        self.assertEqual(stats.secrets_left, 0)
+        self.assertEqual(stats.teams_satisfied, 1)
+        self.assertEqual(stats.coins_in_circulation, 2 * constants.START_COINS - 400)
+        self.assertEqual(stats.average_price, 200)
+        self.assertStatsConsistent()
+
+        self.engine.freebie(1)
+        self.assertEqual(stats.teams_satisfied, 2)
+        self.assertStatsConsistent()
+
+    def test_reverted(self):
+        self.engine.bid(0, 300, '0:0:300')
+        self.engine.sell()
+        self.engine.bid(0, 100, '0:0:100')
+        self.engine.sell()
+        self.engine.revert()
+        self.engine.revert()
+
+        stats = self.engine.stats
+        self.assertEqual(stats.secrets_left, 1)
+        self.assertEqual(stats.teams_satisfied, 0)
+        self.assertEqual(stats.coins_in_circulation, 2 * constants.START_COINS)
+        self.assertEqual(stats.n_bought, 0)
+        self.assertStatsConsistent()
@@ -1,5 +1,6 @@
 from tjanseauktion.team import Team
 from tjanseauktion.chore import Chore
+from tjanseauktion.currency import Rates
 
 import unittest
 
@@ -27,6 +28,12 @@ class TestTeam(unittest.TestCase):
         s = self.team.coin_string()
         self.assertEqual(s, "10.2.12 | 5000 | ☠")
 
+    def test_coin_string_rates(self):
+        team = Team(0, coins=1000)
+        self.assertEqual(team.coin_string(Rates(100, 10, 1)), "10.0.0 | 1000 | ★")
+        team.coins = 1234
+        self.assertEqual(team.coin_string(Rates(100, 10, 2)), "12.3.2 | 1234 | ★")
+
     def test_ui_row_string(self):
         s = self.team.ui_row_string()
 
@@ -35,6 +42,10 @@ class TestTeam(unittest.TestCase):
         self.assertIn("team0", s)
         self.assertIn("10.2.12 | 5000 | ★", s)
 
+        # coin strings are right aligned to the given length
+        self.team.coins = 5
+        self.assertEqual(len(self.team.ui_row_string(coin_str_len=20)), 3 * 20 + 20)
+
     def test_can_afford(self):
         self.assertTrue(self.team.can_afford(2000))
         self.assertTrue(self.team.can_afford(5000))
@@ -83,4 +94,23 @@ class TestTeam(unittest.TestCase):
         self.assertEqual(t.coins, 5000)
         self.assertListEqual(t.chores, [])
         self.assertEqual(t.id, 0)
-        self.assertTrue(t.has_free_win)
\ No newline at end of file
+        self.assertTrue(t.has_free_win)
+
+    def test_to_json_chore_index(self):
+        chore = Chore("some chore", "today", "now")
+        self.team.add_chore(chore)
+
+        self.assertEqual(self.team.to_json({id(chore): 4})['chores'], [4])
+        self.assertEqual(self.team.to_json()['chores'], [chore.to_json()])
+
+    def test_from_json_chores(self):
+        chores = [Chore("some chore", "today", "now"), Chore("other chore", "today", "later")]
+        j = {
+            'coins': 5000,
+            'chores': [1],
+            'id': 0,
+            'has_free_win': True
+        }
+
+        t = Team.from_json(j, chores)
+        self.assertIs(t.chores[0], chores[1])
@@ -1,38 +1,51 @@
-from tjanseauktion.ui import UI
+from tjanseauktion.ui import Damage, FrameStats
 
 import unittest
 
 
-class TestUI(unittest.TestCase):
-
-    def test_parse_bid(self):
-        team_id, bid = UI.parse_bid("2 ,,")
-        self.assertEqual(team_id, 2)
-        self.assertEqual(bid, 0)
-
-        team_id, bid = UI.parse_bid("10 2,,14")
-        self.assertEqual(team_id, 10)
-        self.assertEqual(bid, 1000)
-
-        _, bid = UI.parse_bid("10 ,1,500")
-        self.assertEqual(bid, 529)
-
-    def test_parse_instant_win_bid(self):
-        team_id = UI.parse_instant_win_bid("5 win")
-        self.assertEqual(team_id, 5)
-
-        team_id = UI.parse_instant_win_bid("0 win")
-        self.assertEqual(team_id, 0)
-
-        team_id = UI.parse_instant_win_bid("11 win")
-        self.assertEqual(team_id, 11)
-
-    def test_parse_conversion(self):
-        value = UI.parse_conversion(",,")
-        self.assertEqual(value, 0)
-
-        value = UI.parse_conversion("2,2,14")
-        self.assertEqual(value, 1058)
-
-        value = UI.parse_conversion(",10,10")
-        self.assertEqual(value, 300)
\ No newline at end of file
+class TestDamage(unittest.TestCase):
+
+    def setUp(self):
+        self.damage = Damage()
+
+    def test_bid_damages_header(self):
+        self.damage.add_action({'op': 'bid', 'team': 1, 'bid': 500, 'bid_str': '1:0:7'})
+        self.assertIn(Damage.HEADER, self.damage)
+        self.assertNotIn(Damage.TEAMS, self.damage)
+        self.assertNotIn(Damage.STATS, self.damage)
+
+    def test_sell_damages_team_row(self):
+        self.damage.add_action({'op': 'sell', 'team': 2})
+        self.assertIn(Damage.HEADER, self.damage)
+        self.assertIn(Damage.STATS, self.damage)
+        self.assertIn(Damage.TEAMS, self.damage)
+        self.assertEqual(self.damage.teams, {2})
+
+        self.damage.add_action({'op': 'revert', 'team': 0})
+        self.assertEqual(self.damage.teams, {0, 2})
+
+    def test_clear(self):
+        self.damage.add(*Damage.ALL)
+        self.damage.add_team(1)
+        self.damage.clear()
+        for region in Damage.ALL:
+            self.assertNotIn(region, self.damage)
+        self.assertFalse(self.damage.teams)
+
+
+class TestFrameStats(unittest.TestCase):
+
+    def test_late_window_allocs(self):
+        stats = FrameStats()
+        for _ in range(3):
+            stats.window_allocated()
+        stats.frame_drawn()
+        stats.frame_drawn()
+        self.assertEqual(stats.window_allocs, 3)
+        self.assertEqual(stats.late_window_allocs, 0)
+
+        stats.window_allocated()
+        stats.frame_drawn()
+        self.assertEqual(stats.frames, 3)
+        self.assertEqual(stats.late_window_allocs, 1)
+        self.assertEqual(str(stats), '3 frames drawn, 4 windows allocated (1 after first frame)')
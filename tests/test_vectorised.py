@@ -0,0 +1,140 @@
+from tjanseauktion import simulation
+from tjanseauktion.auction import Auction
+from tjanseauktion.chore import Chore
+from tjanseauktion.simulation import SimulationParams
+from tjanseauktion.team import Team
+
+import random
+import unittest
+from unittest import mock
+
+try:
+    import numpy as np
+    from tjanseauktion import vectorised
+except ImportError:
+    np = None
+
+
+@unittest.skipUnless(np, 'numpy is not installed')
+class TestVectorised(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.chores = Chore.load_chores(path="tests/fixtures/test_chores.json")
+        self.params = SimulationParams(n_teams=4, n_secrets=1, overbid_factor=.1, start_coins=1000)
+        self.rng = random.Random(0)
+
+    def test_min_bids(self):
+        current_bids = np.arange(0, 3000, 7)
+        for f in (0, .1, .25):
+            expected = [Auction.min_bid(x, f) for x in current_bids.tolist()]
+            self.assertListEqual(vectorised.min_bids(current_bids, f).tolist(), expected)
+
+    def test_try_bids(self):
+        n = 2000
+        current_bids = [self.rng.choice([0, self.rng.randint(0, 1000)]) for _ in range(n)]
+        bidders = [self.rng.randint(-1, 2) for _ in range(n)]
+        bids = [max(0, x + self.rng.randint(-50, 150)) for x in current_bids]
+        teams = [self.rng.randint(0, 2) for _ in range(n)]
+        coins = [self.rng.randint(0, 1200) for _ in range(n)]
+
+        codes, new_bids, new_bidders = vectorised.try_bids(np.array(current_bids), np.array(bidders), np.array(bids),
+                                                           np.array(teams), np.array(coins), .1)
+        for i in range(n):
+            auction = Auction(self.chores[0])
+            auction.current_bid = current_bids[i]
+            auction.bidder = Team(bidders[i]) if bidders[i] != vectorised.NO_TEAM else None
+            bidder = Team(teams[i])
+            bidder.coins = coins[i]
+            if auction.bidder and auction.bidder.id == bidder.id:
+                auction.bidder = bidder
+
+            msg = auction.try_bid(bids[i], bidder, '', .1)
+            self.assertEqual(vectorised.OUTCOMES[codes[i]], msg.outcome)
+            self.assertEqual(new_bids[i], auction.current_bid)
+            self.assertEqual(new_bidders[i], auction.bidder.id if auction.bidder else vectorised.NO_TEAM)
+
+    def test_buy(self):
+        coins = np.array([100, 50, 0])
+        bought = vectorised.buy(coins, np.array([60, 60, 0]))
+        self.assertListEqual(bought.tolist(), [True, False, True])
+        self.assertListEqual(coins.tolist(), [40, 50, 0])
+
+    def test_bid_ladder(self):
+        ladder = vectorised.bid_ladder(100, .1).tolist()
+        self.assertListEqual(ladder[:3], [0, 1, 2])
+        self.assertGreater(ladder[-1], 100)
+        self.assertLessEqual(ladder[-2], 100)
+        for a, b in zip(ladder, ladder[1:]):
+            self.assertEqual(b, Auction.min_bid(a, .1))
+
+    def assert_run_bidding(self, n_teams: int, is_late: list, overbid_factor: float):
+        n = 1000
+        limits = np.array([[self.rng.choice([0, self.rng.randint(0, 50), self.rng.randint(0, 3000)])
+                            for _ in range(n_teams)] for _ in range(n)])
+        orders = np.array([self.rng.sample(range(n_teams), n_teams) for _ in range(n)])
+        prices, leaders = vectorised.run_bidding(limits, np.array(is_late), orders, overbid_factor)
+
+        teams = [Team(i) for i in range(n_teams)]
+        bots = [simulation.SniperBot() if x else simulation.GreedyBot() for x in is_late]
+        for i in range(n):
+            auction = Auction(self.chores[0])
+            leader = simulation.run_bidding(auction, teams, bots, limits[i].tolist(), orders[i].tolist(),
+                                            overbid_factor)
+            self.assertEqual(leaders[i], vectorised.NO_TEAM if leader is None else leader)
+            self.assertEqual(prices[i], auction.current_bid)
+
+    def test_run_bidding(self):
+        self.assert_run_bidding(4, [False] * 4, .1)
+
+    def test_run_bidding_late_bots(self):
+        is_late = [False, True, False, False, True, False]
+        for f in (0, .1, .25):
+            self.assert_run_bidding(6, is_late, f)
+
+    def test_run_bidding_many_teams(self):
+        self.assert_run_bidding(12, [i % 4 == 2 for i in range(12)], .1)
+
+    def test_run_bidding_more_teams_than_bits(self):
+        self.assert_run_bidding(70, [i % 5 == 1 for i in range(70)], .1)
+
+    def test_ginis(self):
+        values = [[1., 1., 1.], [0., 0., 0.], [0., 0., 1.], [3., 1., 2.]]
+        for row, gini in zip(values, vectorised.ginis(np.array(values)).tolist()):
+            self.assertAlmostEqual(gini, simulation.gini(row))
+
+    def test_simulate(self):
+        summary = vectorised.simulate(self.chores, self.params, 50, seed=1, batch_size=20)
+        # 3 chores for 4 teams, so a free chore is added
+        n_auctions = 50 * (len(self.chores) + 1)
+        self.assertEqual(summary.n_runs, 50)
+        self.assertEqual(summary.n_auctions, n_auctions)
+        self.assertEqual(summary.n_bought + summary.n_instant_wins + summary.n_freebies + summary.n_unsold,
+                         n_auctions)
+        self.assertEqual(sum(x.n_teams for x in summary.strategies.values()), 50 * self.params.n_teams)
+        self.assertLessEqual(max(summary.prices), self.params.start_coins)
+        self.assertIn('instant-win', summary.report())
+
+    def test_simulate_unlisted_orders(self):
+        params = self.params._replace(n_teams=vectorised.MAX_LISTED_ORDERS + 1)
+        summary = vectorised.simulate(self.chores, params, 20, batch_size=10)
+        self.assertEqual(sum(x.n_teams for x in summary.strategies.values()), 20 * params.n_teams)
+
+    def test_simulate_day_order(self):
+        params = self.params._replace(day_order=('Fredag',))
+        with mock.patch.object(vectorised, 'day_key', wraps=vectorised.day_key) as day_key:
+            vectorised.simulate(self.chores, params, 10)
+        day_key.assert_called_with(('Fredag',))
+
+    def test_simulate_seeded(self):
+        def report(seed: int) -> str:
+            return vectorised.simulate(self.chores, self.params, 30, seed=seed).report()
+
+        self.assertEqual(report(1), report(1))
+        self.assertNotEqual(report(1), report(2))
+
+    def test_simulate_close_to_scalar(self):
+        n_runs = 400
+        expected = simulation.simulate(self.chores, self.params, n_runs, workers=1)
+        summary = vectorised.simulate(self.chores, self.params, n_runs)
+        self.assertAlmostEqual(summary.mean_price / expected.mean_price, 1, delta=.05)
+        self.assertAlmostEqual(summary.n_bought / expected.n_bought, 1, delta=.05)
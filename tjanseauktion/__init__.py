@@ -1,11 +1,111 @@
+from .chore import Chore
+from .config import Config, ConfigError
+from .logger import StateError
 from .ui import UI
+from . import replay, server, simulation
 
+import argparse
 import curses
+import itertools
+import sys
 
 
 def run():
+    parser = argparse.ArgumentParser(prog='tjanseauktion')
+    parser.add_argument('--seed', type=int, help='seed of secrets and auction order when starting a new auction '
+                                                 '(default: seed in cfg.ini, or random)')
+    parser.add_argument('--set', action='append', default=[], metavar='SECTION.OPTION=VALUE',
+                        help='override an option of cfg.ini, e.g., --set auction.n_teams=12. Options can also be '
+                             'overridden by environment variables, e.g., TJANSEAUKTION_AUCTION_N_TEAMS=12')
+    parser.add_argument('--profile', action='store_true', help='print how many frames were drawn and curses '
+                                                               'windows allocated to stderr on exit')
+    subparsers = parser.add_subparsers(dest='command')
+    replay_parser = subparsers.add_parser('replay', help='replay a state journal or message log without the UI, '
+                                                         'and check that it ends in the persisted state')
+    replay_parser.add_argument('path', help='logs/state-log-DATE.journal or logs/message-log-DATE.txt')
+    replay_parser.add_argument('--journal', help='journal holding the initial state when replaying a message log '
+                                                 '(default: journal of the same date)')
+    simulate_parser = subparsers.add_parser('simulate', help='simulate auctions between bidding bots to tune the '
+                                                             'settings; several values of a setting are compared')
+    simulate_parser.add_argument('--runs', type=int, default=2000, help='auctions per combination of settings')
+    simulate_parser.add_argument('--start-coins', type=int, nargs='+', help='(default: start_coins in cfg.ini)')
+    simulate_parser.add_argument('--overbid', type=int, nargs='+', help='minimum overbid in percent '
+                                                                        '(default: min_overbid_percent in cfg.ini)')
+    simulate_parser.add_argument('--secrets', type=int, nargs='+', help='(default: n_secrets in cfg.ini)')
+    simulate_parser.add_argument('--teams', type=int, help='(default: n_teams in cfg.ini)')
+    simulate_parser.add_argument('--strategies', nargs='+', choices=list(simulation.STRATEGIES),
+                                 default=list(simulation.STRATEGIES), help='strategies assigned to teams in turn')
+    simulate_parser.add_argument('--workers', type=int, help='processes to simulate on (default: amount of CPUs)')
+    simulate_parser.add_argument('--seed', type=int, default=0, dest='sim_seed')
+    simulate_parser.add_argument('--numpy', action='store_true', help='simulate all auctions at once with numpy '
+                                                                      'rather than on worker processes')
+    simulate_parser.add_argument('--chores', default='data/chores.json')
+    serve_parser = subparsers.add_parser('serve', help='run the auction as a server, taking commands from several '
+                                                       'operators at once, and showing it to read-only viewers')
+    operator_parser = subparsers.add_parser('operator', help='enter commands on a server: bids as in the bid text '
+                                                             'box, or s, r, p, u and y as in the UI')
+    scoreboard_parser = subparsers.add_parser('scoreboard', help='show the current auction and team table of a '
+                                                                 'server, e.g., on a projector')
+    for subparser, port in [(serve_parser, server.DEFAULT_PORT), (operator_parser, server.DEFAULT_PORT),
+                            (scoreboard_parser, server.DEFAULT_VIEWER_PORT)]:
+        subparser.add_argument('--host', default=server.DEFAULT_HOST)
+        subparser.add_argument('--port', type=int, default=port)
+        subparser.add_argument('--unix', metavar='PATH', help='Unix socket to use instead of --host and --port')
+    serve_parser.add_argument('--viewer-port', type=int, default=server.DEFAULT_VIEWER_PORT,
+                              help='port of viewers, 0 to only accept viewers on --viewer-unix')
+    serve_parser.add_argument('--viewer-unix', metavar='PATH', help='Unix socket of viewers')
+    args = parser.parse_args()
+
+    overrides = {}
+    for override in args.set:
+        key, sep, value = override.partition('=')
+        if not sep:
+            parser.error(f'--set expects SECTION.OPTION=VALUE, got "{override}"')
+        overrides[key.strip()] = value.strip()
+
+    try:
+        settings = Config().settings(overrides=overrides)
+    except ConfigError as e:
+        print(f'Error: {e}', file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == 'replay':
+        sys.exit(replay.main(args.path, args.journal, settings.min_overbid_factor, settings.undo_limit))
+
+    if args.command == 'simulate':
+        if args.teams is not None and args.teams < 1:
+            parser.error(f'--teams expects at least 1 team, got {args.teams}')
+        overbids = [x / 100 for x in args.overbid] if args.overbid else [settings.min_overbid_factor]
+        grid = [simulation.SimulationParams(args.teams or settings.n_teams, n_secrets, overbid, start_coins,
+                                            tuple(args.strategies), settings.day_order)
+                for start_coins, overbid, n_secrets in
+                itertools.product(args.start_coins or [settings.start_coins], overbids,
+                                  args.secrets or [settings.n_secrets])]
+        sys.exit(simulation.main(Chore.load_chores(args.chores), grid, args.runs, args.sim_seed, args.workers,
+                                 args.numpy))
+
+    if args.command == 'serve':
+        sys.exit(server.main(settings, args.seed, args.host, args.port, args.unix, args.viewer_port,
+                             args.viewer_unix))
+
+    if args.command == 'operator':
+        sys.exit(server.client_main(args.host, args.port, args.unix, server.operate))
+
+    if args.command == 'scoreboard':
+        sys.exit(server.client_main(args.host, args.port, args.unix,
+                                    lambda client: server.view(client, settings.rates)))
+
+    ui = None
     try:
-        UI()
+        ui = UI(seed=args.seed, settings=settings, profile=args.profile)
+        ui.event_loop()
+    except StateError as e:
+        print(f'Error: {e}', file=sys.stderr)
+        sys.exit(1)
     except KeyboardInterrupt:
         curses.endwin()
-        curses.reset_shell_mode()
\ No newline at end of file
+        curses.reset_shell_mode()
+    finally:
+        # flush buffered logs, also when interrupted
+        if ui:
+            ui.close()
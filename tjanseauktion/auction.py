@@ -1,16 +1,18 @@
 from . import constants
+from .catalog import day_key
 from .chore import Chore
+from .ledger import BidLedger, LedgerEntry
 from .team import Team
 from .message import Message
-from .config import Config
+from .outcome import Outcome
 
 import random
-import curses
 import math
-from typing import Optional
+from typing import Optional, List, Sequence
 
 
 class Auction:
+    __slots__ = ('chore', 'current_bid', 'current_bid_str', 'bidder', 'is_completed', 'is_secret', 'bids')
 
     def __init__(self, chore: Chore):
         self.chore = chore
@@ -20,6 +22,8 @@ class Auction:
         self.bidder = None  # type: Optional[Team]
         self.is_completed = False
         self.is_secret = False
+        # every bid attempted, created on the first bid, see Auction.ledger
+        self.bids = None  # type: Optional[BidLedger]
 
     def __str__(self) -> str:
         return f'[SECRET] - {self.chore.__str__()}' if self.is_secret else self.chore.__str__()
@@ -55,45 +59,122 @@ class Auction:
             return True
         return False
 
-    def try_bid(self, bid: int, bidder: Team, bid_str: str, overbid_factor: float) -> Message:
+    @staticmethod
+    def min_bid(current_bid: int, overbid_factor: float) -> int:
         """
-        Try placing bid
+        Lowest bid accepted from a team other than the highest bidder when :param current_bid is the highest bid,
+        i.e., the lowest bid which is both valid and high enough
+        """
+        return max(current_bid + 1, int(current_bid + (current_bid * overbid_factor)))
+
+    def ledger(self) -> BidLedger:
+        """
+        Ledger of the bids on the auction, created on the first bid. A highest bid set directly, e.g., by
+        Auction.from_json, is kept as a bid made before all bids entered since
+        """
+        if self.bids is None:
+            self.bids = BidLedger()
+            if self.current_bid or self.bidder:
+                self.bids.record(LedgerEntry(-math.inf, self.current_bid, self.current_bid_str, self.bidder,
+                                             Outcome.OK))
+        return self.bids
+
+    def try_bid(self, bid: int, bidder: Team, bid_str: str, overbid_factor: float,
+                timestamp: Optional[float] = None) -> Message:
+        """
+        Try placing bid, and record it in the ledger along with its outcome
         :param bid: bid being placed
         :param bidder: team placing the bid
         :param bid_str: bid string queried in the ui
+        :param timestamp: time the bid was made, now if not given, see BidLedger.now. A bid made before the
+                          highest bid was made, i.e., entered late, is inserted among the accepted bids
         :return: Message object containing resulting success/error message
         """
-        # workaround for fast-pace bidding where intermediate bid is missed, allowing same team to bid again
+        ledger = self.ledger()
+        if timestamp is None:
+            timestamp = ledger.now()
+
+        i, before, after = ledger.neighbours(timestamp)
+        if after:
+            msg = self._try_late_bid(bid, bidder, bid_str, overbid_factor, before, after)
+            # the late bid is the one which was missed when the team after it bid again
+            if msg.outcome.is_success and after.outcome == Outcome.OVERRIDE:
+                ledger.replace(i, after._replace(outcome=Outcome.OK))
+        else:
+            msg = self._try_bid(bid, bidder, bid_str, overbid_factor)
+        ledger.record(LedgerEntry(timestamp, bid, bid_str, bidder, msg.outcome))
+        if msg.outcome.is_success:
+            msg.bid_time = timestamp
+
+        leader = ledger.leader
+        if leader:
+            self.current_bid, self.current_bid_str, self.bidder = leader.bid, leader.bid_str, leader.bidder
+        return msg
+
+    def _try_bid(self, bid: int, bidder: Team, bid_str: str, overbid_factor: float) -> Message:
+        """
+        Try placing a bid made after the highest bid
+        """
+        # workaround for fast-pace bidding where intermediate bid is missed, allowing same team to bid again.
+        # The missed bid can be entered later, see Auction.try_bid
         if not self.is_bidder_valid(bidder) and bid >= int(self.current_bid):
-            self.current_bid = bid
-            self.current_bid_str = bid_str
-            self.bidder = bidder
             return Message(f'team{bidder.id} bid {bid} coins ({bid_str}) OVERRIDE',
-                           attr=curses.color_pair(constants.COLOUR_WARNING_MSG))
+                           colour=constants.COLOUR_WARNING_MSG,
+                           action='bid', team=bidder.id, bid=bid, outcome=Outcome.OVERRIDE)
 
-        if not self.is_bid_valid(bid):
-            return Message(f'Error: bid is too low ({bid} / {self.current_bid}) ({bid_str})',
-                           attr=curses.color_pair(constants.COLOUR_ERR_MSG))
+        error = self._bid_error(bid, bidder, bid_str, overbid_factor, self.current_bid, self.bidder)
+        if error:
+            return error
+
+        return Message(f'team{bidder.id} bid {bid} coins ({bid_str})',
+                       colour=constants.COLOUR_SUCCESS_MSG,
+                       action='bid', team=bidder.id, bid=bid)
+
+    def _try_late_bid(self, bid: int, bidder: Team, bid_str: str, overbid_factor: float,
+                      before: Optional[LedgerEntry], after: LedgerEntry) -> Message:
+        """
+        Try placing a bid made between the accepted bids :param before and :param after, which it must overbid
+        and be overbid by respectively
+        """
+        error = self._bid_error(bid, bidder, bid_str, overbid_factor, before.bid if before else 0,
+                                before.bidder if before else None)
+        if error:
+            return error
+
+        if bidder == after.bidder or after.bid < self.min_bid(bid, overbid_factor):
+            return Message(f'Error: bid conflicts with the later bid of team{after.bidder.id} '
+                           f'({bid} / {after.bid}) ({bid_str})',
+                           colour=constants.COLOUR_ERR_MSG, outcome=Outcome.CONFLICTS_WITH_LATER_BID)
+
+        return Message(f'team{bidder.id} bid {bid} coins ({bid_str}) before team{after.bidder.id} bid {after.bid}',
+                       colour=constants.COLOUR_SUCCESS_MSG,
+                       action='bid', team=bidder.id, bid=bid)
+
+    @staticmethod
+    def _bid_error(bid: int, bidder: Team, bid_str: str, overbid_factor: float, current_bid: int,
+                   current_bidder: Optional[Team]) -> Optional[Message]:
+        """
+        Check the rules of a bid overbidding :param current_bid of :param current_bidder
+        :return: error message of the first rule broken, None if the bid is valid
+        """
+        if bid <= current_bid:
+            return Message(f'Error: bid is too low ({bid} / {current_bid}) ({bid_str})',
+                           colour=constants.COLOUR_ERR_MSG, outcome=Outcome.BID_TOO_LOW)
 
-        if not self.is_bidder_valid(bidder):
+        if bidder == current_bidder:
             return Message(f'Error: bidder already has the lead (team{bidder.id})',
-                           attr=curses.color_pair(constants.COLOUR_ERR_MSG))
+                           colour=constants.COLOUR_ERR_MSG, outcome=Outcome.BIDDER_HAS_LEAD)
 
         if not bidder.can_afford(bid):
             return Message(f"Error: bidder can't afford ({bidder.coins} / {bid}) ({bid_str})",
-                           attr=curses.color_pair(constants.COLOUR_ERR_MSG))
+                           colour=constants.COLOUR_ERR_MSG, outcome=Outcome.CANT_AFFORD)
 
-        if not self.is_bid_high_enough(bid, overbid_factor):
+        if bid < int(current_bid + (current_bid * overbid_factor)):
             return Message(f"Error: bid is not 10% above current bid ({bid} / "
-                           f"{int(self.current_bid + (self.current_bid * overbid_factor))})",
-                           attr=curses.color_pair(constants.COLOUR_ERR_MSG))
+                           f"{int(current_bid + (current_bid * overbid_factor))})",
+                           colour=constants.COLOUR_ERR_MSG, outcome=Outcome.OVERBID_TOO_LOW)
 
-        self.current_bid = bid
-        self.current_bid_str = bid_str
-        self.bidder = bidder
-
-        return Message(f'team{bidder.id} bid {bid} coins ({bid_str})',
-                       attr=curses.color_pair(constants.COLOUR_SUCCESS_MSG))
+        return None
 
     def instant_win(self, buyer: Team) -> Message:
         """
@@ -107,7 +188,8 @@ class Auction:
         buyer.instant_win(self.chore)
 
         return Message(f"team{buyer.id} used instant win, it's super effective!",
-                       attr=curses.color_pair(constants.COLOUR_SUCCESS_MSG))
+                       colour=constants.COLOUR_SUCCESS_MSG,
+                       action='win', team=buyer.id)
 
     def freebie(self, bidder: Team) -> Message:
         """
@@ -120,7 +202,8 @@ class Auction:
         bidder.add_chore(self.chore)
 
         return Message(f"Chore {self.chore.desc} given to team{self.bidder.id} for free",
-                       attr=curses.color_pair(constants.COLOUR_SUCCESS_MSG))
+                       colour=constants.COLOUR_SUCCESS_MSG,
+                       action='free', team=bidder.id)
 
     def complete_auction(self) -> Message:
         """
@@ -130,26 +213,26 @@ class Auction:
         self.is_completed = True
 
         return Message(f'Chore {self.chore.desc} sold to team{self.bidder.id}',
-                       attr=curses.color_pair(constants.COLOUR_SUCCESS_MSG))
+                       colour=constants.COLOUR_SUCCESS_MSG,
+                       action='sell', team=self.bidder.id, bid=self.current_bid)
 
     @classmethod
-    def create_auctions(cls, chores: list, n_secrets: int, n_teams: int) -> list:
+    def create_auctions(cls, chores: list, n_secrets: int, n_teams: int,
+                        rng: Optional[random.Random] = None, day_order: Sequence[str] = constants.DAY_ORDER) -> list:
         """
         Generate list of auctions from chore list.
         :param chores: list of chores as defined by ./data/chores.json
         :param n_secrets: amount of secret auctions to generate, as defined by ./cfg.ini
         :param n_teams: amount of teams generated, as defined by ./cfg.ini
+        :param rng: random generator deciding secrets and order, e.g., random.Random(seed) to
+                    reproduce an auction
+        :param day_order: days whose chores are auctioned first, in this order, as defined by ./cfg.ini
         """
+        rng = rng or random.Random()
         auctions = [Auction(chore) for chore in chores]
-        random.seed()
 
         # set secrets
-        for i in range(n_secrets):
-            selection = random.choice(auctions)
-
-            while selection.is_secret:
-                selection = random.choice(auctions)
-
+        for selection in rng.sample(auctions, n_secrets):
             selection.is_secret = True
 
         """
@@ -164,16 +247,15 @@ class Auction:
         n_free_chores = (chores_per_team * n_teams) % len(chores)
 
         for i in range(n_free_chores):
-            a = Auction(Chore('Fritjans', '', ''))
+            a = Auction(Chore(constants.FREE_CHORE_DESC, '', ''))
             a.is_secret = True
             auctions.append(a)
 
-        # shuffle auctions and make sure we start with monday chores
-        random.shuffle(auctions)
-        auctions = [
-            *[x for x in auctions if x.chore.day == 'Mandag'],
-            *[x for x in auctions if x.chore.day != 'Mandag']
-        ]
+        # shuffle auctions and make sure we start with the chores of the day order, e.g., monday chores.
+        # The sort is stable, so chores of other days stay shuffled
+        rng.shuffle(auctions)
+        by_day = day_key(day_order)
+        auctions.sort(key=lambda x: by_day(x.chore.day))
 
         return auctions
 
@@ -184,24 +266,54 @@ class Auction:
         self.bidder = None
         self.current_bid = 0
         self.current_bid_str = ''
+        self.bids = None
+
+    def memento(self) -> tuple:
+        """
+        State changed by bids, see History
+        """
+        return (self.current_bid, self.current_bid_str, self.bidder, self.is_completed,
+                self.bids, self.bids.memento() if self.bids else None)
+
+    def restore(self, memento: tuple):
+        self.current_bid, self.current_bid_str, self.bidder, self.is_completed, self.bids, version = memento
+        if self.bids:
+            self.bids.restore(version)
 
     def to_json(self):
-        return {
+        """
+        The bidder is stored by team ID, see Auction.from_json. The accepted bids of an auction still being bid on
+        are stored too, such that late bids entered after resuming are checked against the bids made before them
+        """
+        j = {
             'chore': self.chore.to_json(),
             'current_bid': self.current_bid,
             'current_bid_str': self.current_bid_str,
-            'bidder': self.bidder.to_json() if self.bidder else None,
+            'bidder': self.bidder.id if self.bidder else None,
             'is_completed': self.is_completed,
             'is_secret': self.is_secret
         }
+        if self.bids and not self.is_completed:
+            j['bids'] = [x.to_json() for x in self.bids.accepted]
+
+        return j
 
     @classmethod
-    def from_json(cls, row: dict):
-        a = Auction(Chore.from_json(row['chore']))
+    def from_json(cls, row: dict, teams: Optional[List[Team]] = None, chore: Optional[Chore] = None):
+        """
+        :param teams: teams of the persisted state, used to resolve the bidder ID to a shared Team object
+        :param chore: already loaded chore of the auction, shared with the team owning it
+        """
+        a = Auction(chore or Chore.from_json(row['chore']))
         a.current_bid = row['current_bid']
         a.current_bid_str = row['current_bid_str']
-        a.bidder = Team.from_json(row['bidder']) if row['bidder'] else None
+        a.bidder = teams[row['bidder']] if row['bidder'] is not None else None
         a.is_completed = row['is_completed']
         a.is_secret = row['is_secret']
+        if row.get('bids'):
+            # only accepted bids are persisted, so they make up the attempts too
+            a.bids = BidLedger()
+            for x in row['bids']:
+                a.bids.record(LedgerEntry.from_json(x, teams))
 
         return a
@@ -0,0 +1,91 @@
+from .auction import Auction
+
+from typing import Iterator, List, Optional
+
+
+class AuctionQueue:
+    """
+    All auctions of the tjanseauktion in order, and a cursor at the index of the current auction.
+    Auctions before the cursor are completed and auctions after it are pending, so moving on to the
+    next auction, or reverting to the previous one, only moves the cursor.
+    """
+
+    def __init__(self, auctions: List[Auction], cursor: int = 0, seed: Optional[int] = None):
+        """
+        :param auctions: auctions in order: completed, current and pending
+        :param cursor: index of the current auction, len(auctions) once all auctions are completed
+        :param seed: seed the auctions were generated with, see Auction.create_auctions
+        """
+        if not 0 <= cursor <= len(auctions):
+            raise ValueError(f'cursor {cursor} is out of range for {len(auctions)} auctions')
+
+        self.auctions = auctions
+        self.cursor = cursor
+        self.seed = seed
+
+    def __len__(self) -> int:
+        return len(self.auctions)
+
+    def __iter__(self) -> Iterator[Auction]:
+        return iter(self.auctions)
+
+    @property
+    def current(self) -> Optional[Auction]:
+        return self.auctions[self.cursor] if self.cursor < len(self.auctions) else None
+
+    @property
+    def n_completed(self) -> int:
+        return self.cursor
+
+    @property
+    def n_left(self) -> int:
+        """
+        Amount of auctions not yet completed, including the current auction
+        """
+        return len(self.auctions) - self.cursor
+
+    def is_done(self) -> bool:
+        return self.cursor == len(self.auctions)
+
+    def completed(self) -> List[Auction]:
+        """
+        Completed auctions in order of completion
+        """
+        return self.auctions[:self.cursor]
+
+    def pending(self) -> List[Auction]:
+        """
+        Auctions after the current auction
+        """
+        return self.auctions[self.cursor + 1:]
+
+    def last_completed(self) -> Optional[Auction]:
+        return self.auctions[self.cursor - 1] if self.cursor else None
+
+    def memento(self) -> int:
+        return self.cursor
+
+    def restore(self, memento: int):
+        self.cursor = memento
+
+    def advance(self) -> Optional[Auction]:
+        """
+        Move on to the next auction
+        :return: the new current auction, None if all auctions are completed
+        """
+        if self.is_done():
+            raise IndexError('all auctions are completed')
+
+        self.cursor += 1
+        return self.current
+
+    def revert(self) -> Auction:
+        """
+        Move back to the last completed auction
+        :return: the new current auction
+        """
+        if not self.cursor:
+            raise IndexError('no auctions have been completed')
+
+        self.cursor -= 1
+        return self.current
@@ -0,0 +1,95 @@
+from . import constants
+from .chore import Chore
+
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+CLOCK_PATTERN = re.compile(r'^(\d{1,2})[:.](\d{2})$')
+
+
+def day_key(day_order: Sequence[str]) -> Callable[[str], int]:
+    """
+    Sort key of days: days in :param day_order come first, in that order, followed by all other days
+    """
+    ranks = {day: i for i, day in enumerate(day_order)}
+    return lambda day: ranks.get(day, len(ranks))
+
+
+def time_key(time: str) -> Tuple[int, int]:
+    """
+    Sort key of time slots: clock times such as "8:00" by time of day, followed by all other times such as
+    "Hele dagen"
+    """
+    match = CLOCK_PATTERN.match(time)
+    return (0, int(match.group(1)) * 60 + int(match.group(2))) if match else (1, 0)
+
+
+class ChoreCatalog:
+    """
+    Chores indexed by day, time slot and description, built in a single pass over the chores. Lookups return
+    the chores in the order they were loaded in, and must not be modified.
+    """
+    EMPTY = ()  # type: Tuple[Chore, ...]
+
+    def __init__(self, chores: Iterable[Chore], day_order: Sequence[str] = constants.DAY_ORDER):
+        """
+        :param day_order: days which come first when iterating in order, see ChoreCatalog.ordered
+        """
+        self.chores = list(chores)
+        self.day_order = tuple(day_order)
+        self.by_day = {}  # type: Dict[str, List[Chore]]
+        self.by_time = {}  # type: Dict[str, List[Chore]]
+        self.by_desc = {}  # type: Dict[str, List[Chore]]
+        self.by_slot = {}  # type: Dict[Tuple[str, str], List[Chore]]
+
+        for chore in self.chores:
+            for index, key in ((self.by_day, chore.day), (self.by_time, chore.time), (self.by_desc, chore.desc),
+                               (self.by_slot, (chore.day, chore.time))):
+                bucket = index.get(key)
+                if bucket is None:
+                    index[key] = [chore]
+                else:
+                    bucket.append(chore)
+
+    @classmethod
+    def load(cls, path: str = 'data/chores.json', day_order: Sequence[str] = constants.DAY_ORDER):
+        return cls(Chore.iter_chores(path), day_order)
+
+    def __len__(self) -> int:
+        return len(self.chores)
+
+    def __iter__(self) -> Iterator[Chore]:
+        return iter(self.chores)
+
+    def on_day(self, day: str) -> Sequence[Chore]:
+        return self.by_day.get(day, self.EMPTY)
+
+    def at_time(self, time: str) -> Sequence[Chore]:
+        return self.by_time.get(time, self.EMPTY)
+
+    def with_desc(self, desc: str) -> Sequence[Chore]:
+        return self.by_desc.get(desc, self.EMPTY)
+
+    def in_slot(self, day: str, time: str) -> Sequence[Chore]:
+        return self.by_slot.get((day, time), self.EMPTY)
+
+    def days(self) -> List[str]:
+        """
+        Days of the chores in order: days of the day order first, then other days in the order they were loaded in
+        """
+        # days are indexed in the order they were loaded in, and sorting is stable
+        return sorted(self.by_day, key=day_key(self.day_order))
+
+    def times(self) -> List[str]:
+        """
+        Time slots of the chores in order, see time_key
+        """
+        return sorted(self.by_time, key=time_key)
+
+    def ordered(self) -> Iterator[Chore]:
+        """
+        Iterate chores by day, then by time slot. Chores of the same slot keep the order they were loaded in
+        """
+        day_ranks = {day: i for i, day in enumerate(self.days())}
+        for slot in sorted(self.by_slot, key=lambda x: (day_ranks[x[0]], time_key(x[1]))):
+            yield from self.by_slot[slot]
@@ -1,12 +1,24 @@
 import json
+import re
+import sys
+from typing import Iterator, TextIO
+
+# characters read at a time when streaming chores, and the longest chore accepted in a JSON array
+CHUNK_SIZE = 1 << 16
+MAX_ROW_SIZE = 1 << 20
+WHITESPACE = re.compile(r'[ \t\r\n]*')
+SEPARATOR = re.compile(r'[ \t\r\n]*,[ \t\r\n]*')
 
 
 class Chore:
+    # chores are created in bulk by simulations and replays, and share few distinct days and times, which are
+    # interned such that equal values are stored once
+    __slots__ = ('desc', 'day', 'time')
 
     def __init__(self, desc: str, day: str, time: str):
         self.desc = desc
-        self.day = day
-        self.time = time
+        self.day = sys.intern(day)
+        self.time = sys.intern(time)
 
     def __str__(self) -> str:
         return f'{self.desc} - {self.day} at {self.time}'
@@ -21,10 +33,112 @@ class Chore:
         """
         Load all chores from ./data/chores.json and return them as a list of Chore objects
         """
-        with open(path, 'r') as f:
-            data = json.loads(f.read())
+        return list(cls.iter_chores(path))
+
+    @classmethod
+    def iter_chores(cls, path: str = 'data/chores.json') -> Iterator['Chore']:
+        """
+        Read chores one by one from a JSON array of chores, or from JSON Lines holding one chore per line
+        (.jsonl files, or files starting with an object), without holding the whole file in memory.
+        Rows are validated as they are read.
+        :raises ValueError: on malformed JSON or invalid rows, with the line number of the row
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            buffer = f.read(CHUNK_SIZE)
+            start = len(buffer) - len(buffer.lstrip())
+            if path.endswith(('.jsonl', '.ndjson')) or buffer[start:start + 1] != '[':
+                f.seek(0)
+                yield from cls._iter_json_lines(f, path)
+            else:
+                yield from cls._iter_json_array(f, path, buffer, start + 1)
+
+    @classmethod
+    def _iter_json_lines(cls, f: TextIO, path: str) -> Iterator['Chore']:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f'{path}:{line_no}: invalid JSON: {e.msg}')
+            yield cls._from_row(row, path, line_no)
+
+    @classmethod
+    def _iter_json_array(cls, f: TextIO, path: str, buffer: str, pos: int) -> Iterator['Chore']:
+        """
+        Decode the rows of a JSON array one by one from :param buffer, which is refilled from :param f whenever it
+        runs out or a row is cut off at its end
+        :param pos: position in :param buffer just after the opening bracket of the array
+        """
+        decode = json.JSONDecoder().raw_decode
+        # line number at position mark of the buffer, counted up to the current position when needed
+        line_no, mark = 1, 0
+        n_rows = 0
+        expect_row = True
+
+        while True:
+            pos = WHITESPACE.match(buffer, pos).end()
+            line_no, mark = line_no + buffer.count('\n', mark, pos), pos
+            if pos == len(buffer):
+                buffer, pos, mark = f.read(CHUNK_SIZE), 0, 0
+                if not buffer:
+                    raise ValueError(f'{path}:{line_no}: unexpected end of file, the array of chores is not closed')
+                continue
+
+            char = buffer[pos]
+            if char == ']' and (not expect_row or not n_rows):
+                return
+            if char == ',' and not expect_row:
+                pos += 1
+                expect_row = True
+                continue
+            if not expect_row:
+                raise ValueError(f'{path}:{line_no}: expected "," or "]" after a chore, found {char!r}')
+
+            try:
+                row, pos = decode(buffer, pos)
+            except ValueError as e:
+                # the row may be cut off at the end of the buffer: drop what has been decoded, and retry with more
+                chunk = f.read(CHUNK_SIZE) if len(buffer) - pos < MAX_ROW_SIZE else ''
+                if not chunk:
+                    error_line_no = line_no + buffer.count('\n', pos, e.pos)
+                    raise ValueError(f'{path}:{error_line_no}: invalid JSON: {e.msg}')
+                buffer, pos, mark = buffer[pos:] + chunk, 0, 0
+                continue
+
+            yield cls._from_row(row, path, line_no)
+            n_rows += 1
+            expect_row = False
+
+            # fast path: decode the rows following in the buffer directly, as long as they are complete
+            separator = SEPARATOR.match(buffer, pos)
+            while separator and separator.end() < len(buffer):
+                try:
+                    row, end = decode(buffer, separator.end())
+                except ValueError:
+                    break
+                line_no, mark = line_no + buffer.count('\n', mark, separator.end()), separator.end()
+                yield cls._from_row(row, path, line_no)
+                n_rows += 1
+                pos = end
+                separator = SEPARATOR.match(buffer, pos)
+
+    @classmethod
+    def _from_row(cls, row, path: str, line_no: int):
+        """
+        Validate a row read from :param path and convert it to a Chore object
+        """
+        if type(row) is dict:
+            desc, day, time = row.get('desc'), row.get('day'), row.get('time')
+            if type(desc) is str and type(day) is str and type(time) is str:
+                return cls(desc, day, time)
 
-        return [cls.from_json(row) for row in data]
+        if not isinstance(row, dict):
+            raise ValueError(f'{path}:{line_no}: expected a chore object, found {type(row).__name__}')
+        for key in ('desc', 'day', 'time'):
+            if not isinstance(row.get(key), str):
+                raise ValueError(f'{path}:{line_no}: chore is missing the text field "{key}"')
+        return cls(row['desc'], row['day'], row['time'])
 
     @classmethod
     def from_json(cls, row: dict):
@@ -0,0 +1,177 @@
+from .currency import Rates, DEFAULT_RATES
+
+import re
+from typing import NamedTuple, Optional, Tuple, Union
+
+Amounts = Tuple[Optional[int], Optional[int], Optional[int]]
+
+
+def format_amounts(amounts: Amounts) -> str:
+    """
+    Amounts as entered, with empty amounts as 0, e.g., "1,0,7"
+    """
+    high, mid, low = amounts
+    return f'{high or 0},{mid or 0},{low or 0}'
+
+
+class Bid(NamedTuple):
+    team: int
+    # high, mid and low currency, None if left empty
+    amounts: Amounts
+    # seconds before it was entered the bid was made, None if it was made as it was entered
+    ago: Optional[float] = None
+
+    def value(self, rates: Rates = DEFAULT_RATES) -> int:
+        return rates.value(self.amounts)
+
+    def timestamp(self, entered: float) -> Optional[float]:
+        """
+        Time the bid was made if it is entered late at :param entered, None if it was made as it was entered,
+        see AuctionEngine.bid
+        """
+        return None if self.ago is None else entered - self.ago
+
+    @property
+    def bid_str(self) -> str:
+        return format_amounts(self.amounts)
+
+
+class InstantWin(NamedTuple):
+    team: int
+
+
+class Freebie(NamedTuple):
+    team: int
+
+
+class Convert(NamedTuple):
+    amounts: Amounts
+
+    def value(self, rates: Rates = DEFAULT_RATES) -> int:
+        return rates.value(self.amounts)
+
+    @property
+    def conversion_str(self) -> str:
+        return format_amounts(self.amounts)
+
+
+class ParseError(NamedTuple):
+    text: str
+    # index into text of the first character which could not be parsed
+    position: int
+    reason: str
+
+    def __str__(self):
+        return f'{self.reason} at column {self.position + 1}'
+
+
+BidCommand = Union[Bid, InstantWin, Freebie, ParseError]
+
+# valid input is parsed by a single match, and only invalid input is scanned to locate the error
+BID_COMMAND_PATTERN = re.compile(
+    r'\s*([0-9]+) (?:(win)|(free)|([0-9]*),([0-9]*),([0-9]*)(?:\s*@([0-9]+(?:\.[0-9]*)?))?)\s*')
+CONVERT_COMMAND_PATTERN = re.compile(r'\s*([0-9]*),([0-9]*),([0-9]*)\s*')
+
+
+def _scan_digits(text: str, i: int, end: int) -> int:
+    """
+    :return: index of the first character from :param i which is not an ASCII digit
+    """
+    while i < end and '0' <= text[i] <= '9':
+        i += 1
+    return i
+
+
+def _bounds(text: str) -> Tuple[int, int]:
+    """
+    :return: start and end of :param text without leading and trailing whitespace
+    """
+    end = len(text.rstrip())
+    return end - len(text.strip()), end
+
+
+def _amounts_error(text: str, i: int, end: int) -> Optional[ParseError]:
+    """
+    Locate the first error in "HIGH,MID,LOW" from :param i to :param end, each amount being optional
+    """
+    for separator in ',,':
+        i = _scan_digits(text, i, end)
+        if i == end or text[i] != separator:
+            return ParseError(text, i, "expected a digit or ','")
+        i += 1
+
+    i = _scan_digits(text, i, end)
+    if i != end:
+        return ParseError(text, i, 'expected a digit or end of input')
+    return None
+
+
+def _bid_error(text: str) -> ParseError:
+    """
+    Locate the first error in bid Textbox input which does not match BID_COMMAND_PATTERN
+    """
+    start, end = _bounds(text)
+    i = _scan_digits(text, start, end)
+    if i == start:
+        return ParseError(text, i, 'expected a team number')
+    if i == end or text[i] != ' ':
+        return ParseError(text, i, "expected ' ' after the team number")
+
+    i += 1
+    at = text.find('@', i, end)
+    amounts_end = max(len(text[:at].rstrip()), i) if at != -1 else end
+    error = _amounts_error(text, i, amounts_end)
+    if error and error.position == i:
+        return error._replace(reason="expected an amount, 'win' or 'free'")
+    if error:
+        return error
+    if at != -1:
+        return _ago_error(text, at + 1, end)
+    return ParseError(text, end, 'invalid command')
+
+
+def _ago_error(text: str, i: int, end: int) -> ParseError:
+    """
+    Locate the first error in the seconds following '@' from :param i to :param end, e.g., "5" or "2.5"
+    """
+    j = _scan_digits(text, i, end)
+    if j == i:
+        return ParseError(text, i, "expected seconds after '@'")
+    if j < end and text[j] == '.':
+        j = _scan_digits(text, j + 1, end)
+    return ParseError(text, j, 'expected a digit or end of input')
+
+
+def _amounts(high: str, mid: str, low: str) -> Amounts:
+    return int(high) if high else None, int(mid) if mid else None, int(low) if low else None
+
+
+def parse_bid_command(text: str) -> BidCommand:
+    """
+    Parse bid Textbox input, ignoring leading and trailing whitespace: "TEAM HIGH,MID,LOW" (e.g., "2 3,,10"),
+    "TEAM win" or "TEAM free". A bid entered late is followed by "@" and the seconds ago it was made, e.g.,
+    "2 3,,10 @5"
+    :return: the command, or a ParseError locating the first invalid character
+    """
+    match = BID_COMMAND_PATTERN.fullmatch(text)
+    if not match:
+        return _bid_error(text)
+
+    team, win, free, high, mid, low, ago = match.groups()
+    if win:
+        return InstantWin(int(team))
+    if free:
+        return Freebie(int(team))
+    return Bid(int(team), _amounts(high, mid, low), float(ago) if ago else None)
+
+
+def parse_convert_command(text: str) -> Union[Convert, ParseError]:
+    """
+    Parse conversion Textbox input, ignoring leading and trailing whitespace: "HIGH,MID,LOW", e.g., "4,20,"
+    :return: the command, or a ParseError locating the first invalid character
+    """
+    match = CONVERT_COMMAND_PATTERN.fullmatch(text)
+    if not match:
+        start, end = _bounds(text)
+        return _amounts_error(text, start, end) or ParseError(text, end, 'invalid command')
+    return Convert(_amounts(*match.groups()))
@@ -1,27 +1,150 @@
+from . import constants
+from .currency import Rates
+from .logger import FsyncPolicy
+from .serializer import SERIALIZERS
+
 import os
-from configparser import ConfigParser
+from configparser import ConfigParser, Error
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+# prefix of environment variables overriding options, e.g., TJANSEAUKTION_AUCTION_N_TEAMS=12
+ENV_PREFIX = 'TJANSEAUKTION_'
+
+
+class ConfigError(ValueError):
+    """
+    Raised when the config file is missing, or an option is missing or invalid
+    """
+
+
+class Settings(NamedTuple):
+    """
+    All options of ./cfg.ini, parsed and validated once, see Config.settings
+    """
+    n_teams: int
+    n_secrets: int
+    min_overbid_factor: float
+    seed: Optional[int]
+    undo_limit: int
+    day_order: Tuple[str, ...]
+    start_coins: int
+    high_name: str
+    mid_name: str
+    low_name: str
+    instant_win_name: str
+    high_value: int
+    mid_value: int
+    low_value: int
+    journal: bool
+    snapshot_interval: int
+    fsync: str
+    format: str
+
+    @property
+    def rates(self) -> Rates:
+        return Rates(self.high_value, self.mid_value, self.low_value)
 
 
 class Config:
     FILE_NAME = 'cfg.ini'
+    # Settings field: (section, option, getter) of the option it is parsed from
+    OPTIONS = {
+        'n_teams': ('auction', 'n_teams', 'auction_n_teams'),
+        'n_secrets': ('auction', 'n_secrets', 'auction_n_secrets'),
+        'min_overbid_factor': ('auction', 'min_overbid_percent', 'auction_min_overbid_factor'),
+        'seed': ('auction', 'seed', 'auction_seed'),
+        'undo_limit': ('auction', 'undo_limit', 'auction_undo_limit'),
+        'day_order': ('auction', 'day_order', 'auction_day_order'),
+        'start_coins': ('auction', 'start_coins', 'auction_start_coins'),
+        'high_name': ('currency', 'high_name', 'currency_high_name'),
+        'mid_name': ('currency', 'mid_name', 'currency_mid_name'),
+        'low_name': ('currency', 'low_name', 'currency_low_name'),
+        'instant_win_name': ('currency', 'instant_win_name', 'currency_instant_win_name'),
+        'high_value': ('currency', 'high_value', 'currency_high_value'),
+        'mid_value': ('currency', 'mid_value', 'currency_mid_value'),
+        'low_value': ('currency', 'low_value', 'currency_low_value'),
+        'journal': ('state', 'journal', 'state_journal'),
+        'snapshot_interval': ('state', 'snapshot_interval', 'state_snapshot_interval'),
+        'fsync': ('state', 'fsync', 'state_fsync'),
+        'format': ('state', 'format', 'state_format'),
+    }
 
-    def __init__(self):
+    def __init__(self, path: Optional[str] = None):
+        """
+        :param path: config file, ./cfg.ini by default
+        :raises ConfigError: if the config file doesn't exist or can't be parsed
+        """
+        self.path = path or self.FILE_NAME
         self.cfg = self._open_config()
 
     def _open_config(self) -> ConfigParser:
         """
         Open config file as ConfigParser object
         """
-        if not os.path.isfile(self.FILE_NAME):
-            print(f'Error: could not find config file, please ensure that {self.FILE_NAME} exists '
-                  f'in run directory')
-            exit(1)
+        if not os.path.isfile(self.path):
+            raise ConfigError(f'could not find config file, please ensure that {self.path} exists in run directory')
 
         cfg = ConfigParser()
-        cfg.read(self.FILE_NAME)
+        try:
+            cfg.read(self.path, encoding='utf-8')
+        except Error as e:
+            raise ConfigError(f'{self.path} is not a valid config file: {e}')
 
         return cfg
 
+    def settings(self, env: Optional[Mapping[str, str]] = None,
+                 overrides: Optional[Dict[str, str]] = None) -> Settings:
+        """
+        Parse and validate all options at once. Options of the config file are overridden by environment
+        variables, e.g., TJANSEAUKTION_AUCTION_N_TEAMS=12, which are overridden by :param overrides
+        :param env: environment variables, os.environ by default
+        :param overrides: option values by "section.option", e.g., {'auction.n_teams': '12'}
+        :raises ConfigError: if an option is missing or invalid
+        """
+        env = os.environ if env is None else env
+        options = {f'{section}.{option}': (section, option) for section, option, _ in self.OPTIONS.values()}
+        for key in overrides or {}:
+            if key not in options:
+                raise ConfigError(f'unknown option "{key}", expected one of {", ".join(options)}')
+
+        for key, (section, option) in options.items():
+            value = (overrides or {}).get(key, env.get(f'{ENV_PREFIX}{section}_{option}'.upper()))
+            if value is not None:
+                if not self.cfg.has_section(section):
+                    self.cfg.add_section(section)
+                self.cfg.set(section, option, value)
+
+        values = {}
+        for field, (section, option, getter) in self.OPTIONS.items():
+            try:
+                values[field] = getattr(self, getter)()
+            except (Error, ValueError) as e:
+                raise ConfigError(f'{self.path}: [{section}] {option}: {e}')
+
+        settings = Settings(**values)
+        self._validate(settings)
+        return settings
+
+    def _validate(self, settings: Settings):
+        errors = []
+        for field in ('n_teams', 'snapshot_interval', 'low_value'):
+            if getattr(settings, field) < 1:
+                errors.append(f'{field} must be at least 1')
+        for field in ('n_secrets', 'min_overbid_factor', 'undo_limit', 'start_coins'):
+            if getattr(settings, field) < 0:
+                errors.append(f'{field} must not be negative')
+        if not settings.high_value > settings.mid_value > settings.low_value:
+            errors.append('currency values must decrease from high_value to mid_value to low_value')
+        if settings.format not in SERIALIZERS:
+            errors.append(f'unknown state format "{settings.format}", expected one of {", ".join(SERIALIZERS)}')
+        try:
+            FsyncPolicy.from_str(settings.fsync)
+        except ValueError:
+            errors.append(f'invalid fsync policy "{settings.fsync}"')
+
+        if errors:
+            raise ConfigError(f'{self.path}: {"; ".join(errors)}')
+
     def auction_n_teams(self) -> int:
         """
         Retrieve how many teams we need to generate
@@ -40,6 +163,52 @@ class Config:
         """
         return int(self.cfg.get('auction', 'min_overbid_percent')) / 100
 
+    def auction_seed(self) -> Optional[int]:
+        """
+        Retrieve seed of secrets and auction order, None if it should be random
+        """
+        seed = self.cfg.get('auction', 'seed', fallback='')
+        return int(seed) if seed else None
+
+    def auction_day_order(self) -> Tuple[str, ...]:
+        """
+        Retrieve days whose chores are auctioned first, in order, e.g., "Mandag" or "Fredag, Lørdag, Søndag"
+        """
+        day_order = self.cfg.get('auction', 'day_order', fallback=None)
+        if day_order is None:
+            return constants.DAY_ORDER
+        return tuple(x.strip() for x in day_order.split(',') if x.strip())
+
+    def auction_undo_limit(self) -> int:
+        """
+        Retrieve how many actions can be undone
+        """
+        return int(self.cfg.get('auction', 'undo_limit', fallback='1000'))
+
+    def auction_start_coins(self) -> int:
+        """
+        Retrieve coins each team starts with
+        """
+        return int(self.cfg.get('auction', 'start_coins', fallback=str(constants.START_COINS)))
+
+    def currency_high_value(self) -> int:
+        """
+        Retrieve coins per unit of high currency
+        """
+        return int(self.cfg.get('currency', 'high_value', fallback=str(constants.HIGH_VALUE)))
+
+    def currency_mid_value(self) -> int:
+        """
+        Retrieve coins per unit of mid currency
+        """
+        return int(self.cfg.get('currency', 'mid_value', fallback=str(constants.MID_VALUE)))
+
+    def currency_low_value(self) -> int:
+        """
+        Retrieve coins per unit of low currency
+        """
+        return int(self.cfg.get('currency', 'low_value', fallback=str(constants.LOW_VALUE)))
+
     def currency_high_name(self) -> str:
         """
         Retrieve high currency name
@@ -62,4 +231,28 @@ class Config:
         """
         Retrieve instant win name
         """
-        return self.cfg.get('currency', 'instant_win_name')
\ No newline at end of file
+        return self.cfg.get('currency', 'instant_win_name')
+
+    def state_journal(self) -> bool:
+        """
+        Retrieve whether state should be persisted as an append-only journal
+        """
+        return self.cfg.getboolean('state', 'journal', fallback=False)
+
+    def state_snapshot_interval(self) -> int:
+        """
+        Retrieve how many journal records to append before compacting them into a snapshot
+        """
+        return int(self.cfg.get('state', 'snapshot_interval', fallback='200'))
+
+    def state_fsync(self) -> str:
+        """
+        Retrieve fsync policy for state logs: always, never, every N actions ("10") or every T ms ("250ms")
+        """
+        return self.cfg.get('state', 'fsync', fallback='always')
+
+    def state_format(self) -> str:
+        """
+        Retrieve serialization format of state snapshots: json, compact or binary
+        """
+        return self.cfg.get('state', 'format', fallback='json')
@@ -1,5 +1,11 @@
 START_COINS = 5000
 
+# days whose chores are auctioned first, in this order
+DAY_ORDER = ('Mandag',)
+
+# description of the free chores added to even out chores per team
+FREE_CHORE_DESC = 'Fritjans'
+
 # currency conversion rates
 LOW_VALUE = 1
 MID_VALUE = 29
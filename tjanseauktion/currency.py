@@ -0,0 +1,31 @@
+from . import constants
+
+from typing import Iterable, NamedTuple, Optional, Tuple
+
+
+class Rates(NamedTuple):
+    """
+    Coins per unit of the high, mid and low currencies, as defined by ./cfg.ini
+    """
+    high: int = constants.HIGH_VALUE
+    mid: int = constants.MID_VALUE
+    low: int = constants.LOW_VALUE
+
+    def split(self, coins: int) -> Tuple[int, int, int]:
+        """
+        Express :param coins in as many high, then mid, then low currency units as possible
+        """
+        high, rest = divmod(coins, self.high)
+        mid, rest = divmod(rest, self.mid)
+        return high, mid, rest // self.low
+
+    def value(self, amounts: Iterable[Optional[int]]) -> int:
+        """
+        Coins worth the given amounts of high, mid and low currency, None counting as 0. Unrolled, as bids and
+        conversions are valued on every command
+        """
+        high, mid, low = amounts
+        return (high or 0) * self.high + (mid or 0) * self.mid + (low or 0) * self.low
+
+
+DEFAULT_RATES = Rates()
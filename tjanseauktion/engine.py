@@ -0,0 +1,311 @@
+from . import constants
+from .auction import Auction
+from .auction_queue import AuctionQueue
+from .chore import Chore
+from .history import History
+from .message import Message
+from .outcome import Outcome
+from .stats import AuctionStats
+from .team import Team
+
+import math
+import random
+from typing import Callable, List, Optional, Sequence
+
+
+class AuctionEngine:
+    """
+    The rules of the tjanseauktion, independent of the terminal UI.
+
+    State is changed through the command methods (bid, instant_win, freebie, sell, reset, revert,
+    undo, redo), each returning a Message whose outcome tells whether the command succeeded. Every
+    successful command is also described by a record, e.g., {'op': 'bid', 'team': 2, 'bid': 500,
+    'bid_str': '1,0,7', 'timestamp': 1700000000.1}, which is passed to subscribed listeners and can be
+    re-executed with AuctionEngine.apply.
+
+    Commands other than undo and redo record the objects they changed in the History, so any amount of
+    steps can be undone. The history is cleared by checkpoint, e.g., once the state is compacted into a
+    snapshot which does not include the history.
+    """
+
+    def __init__(self, teams: List[Team], queue: AuctionQueue, overbid_factor: float, undo_limit: int = 1000):
+        """
+        :param teams: teams, indexed by team ID
+        :param queue: all auctions, with the cursor at the auction currently being bid on
+        :param overbid_factor: minimum overbid factor, see Auction.is_bid_high_enough
+        :param undo_limit: maximum amount of commands that can be undone
+        """
+        self.teams = teams
+        self.queue = queue
+        self.overbid_factor = overbid_factor
+        self.history = History(undo_limit)
+        self.listeners = []  # type: List[Callable[[dict, Message], None]]
+
+        # free chores are not part of the chore list
+        n_chores = sum(1 for x in self.queue if x.chore.desc != constants.FREE_CHORE_DESC)
+        self.n_chores_per_team = math.ceil(n_chores / len(self.teams))
+        self.stats = AuctionStats.from_state(self.teams, self.queue, self.n_chores_per_team)
+
+    @classmethod
+    def create(cls, chores: List[Chore], n_teams: int, n_secrets: int, overbid_factor: float,
+               undo_limit: int = 1000, seed: Optional[int] = None, day_order: Sequence[str] = constants.DAY_ORDER,
+               start_coins: int = constants.START_COINS):
+        """
+        Set up a new auction of :param chores
+        :param seed: seed of secrets and auction order; a random seed is chosen if not given
+        :param day_order: days whose chores are auctioned first, see Auction.create_auctions
+        :param start_coins: coins each team starts with
+        """
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        teams = [Team(i, start_coins) for i in range(n_teams)]
+        auctions = Auction.create_auctions(chores, n_secrets, n_teams, random.Random(seed), day_order)
+
+        return cls(teams, AuctionQueue(auctions, seed=seed), overbid_factor, undo_limit)
+
+    def state(self) -> tuple:
+        """
+        State on the form expected by StateLogger
+        """
+        return self.teams, self.queue
+
+    @property
+    def cur_auction(self) -> Optional[Auction]:
+        """
+        Auction currently being bid on, None once all chores are sold
+        """
+        return self.queue.current
+
+    def is_done(self) -> bool:
+        return self.queue.is_done()
+
+    def subscribe(self, listener: Callable[[dict, Message], None]):
+        """
+        Call :param listener with the record and message of every successful command
+        """
+        self.listeners.append(listener)
+
+    def _notify(self, record: dict, msg: Message) -> Message:
+        if msg.outcome.is_success:
+            for listener in self.listeners:
+                listener(record, msg)
+        return msg
+
+    def _commit(self, record: dict, objs: tuple, before: tuple, msg: Message) -> Message:
+        """
+        Record the change of a successful command in the history, and notify listeners
+        :param objs: objects the command may have changed
+        :param before: mementos of :param objs before the command was executed
+        """
+        if msg.outcome.is_success:
+            self.history.record(record, objs, before)
+        return self._notify(record, msg)
+
+    def _find_team(self, team_id: int) -> Optional[Team]:
+        return self.teams[team_id] if 0 <= team_id < len(self.teams) else None
+
+    @staticmethod
+    def _error(txt: str, outcome: Outcome) -> Message:
+        return Message(f'Error: {txt}', colour=constants.COLOUR_ERR_MSG, outcome=outcome)
+
+    def _no_auction_error(self) -> Message:
+        return self._error('all chores have been sold', Outcome.NO_AUCTION)
+
+    def _unknown_team_error(self, team_id: int) -> Message:
+        return self._error(f'team{team_id} does not exist', Outcome.UNKNOWN_TEAM)
+
+    def bid(self, team_id: int, bid: int, bid_str: str, timestamp: Optional[float] = None) -> Message:
+        """
+        Place a bid on the current auction
+        :param bid_str: bid as entered, e.g., "1,0,7"
+        :param timestamp: time the bid was made, now if not given, see Auction.try_bid
+        """
+        if not self.cur_auction:
+            return self._no_auction_error()
+        team = self._find_team(team_id)
+        if not team:
+            return self._unknown_team_error(team_id)
+
+        objs = (self.cur_auction,)
+        before = History.capture(objs)
+        # the timestamp is recorded, such that late bids are inserted in the same place when the record is applied
+        if timestamp is None:
+            timestamp = self.cur_auction.ledger().now()
+        msg = self.cur_auction.try_bid(bid, team, bid_str, self.overbid_factor, timestamp)
+        return self._commit({'op': 'bid', 'team': team_id, 'bid': bid, 'bid_str': bid_str, 'timestamp': timestamp},
+                            objs, before, msg)
+
+    def instant_win(self, team_id: int) -> Message:
+        """
+        Win the current auction using the instant win of a team
+        """
+        if not self.cur_auction:
+            return self._no_auction_error()
+        team = self._find_team(team_id)
+        if not team:
+            return self._unknown_team_error(team_id)
+        if not team.has_free_win:
+            return self._error(f'team{team.id} has already used their instant win', Outcome.INSTANT_WIN_USED)
+
+        objs = self._completion_objs(team)
+        before = History.capture(objs)
+        msg = self.cur_auction.instant_win(team)
+        self._advance()
+        return self._commit({'op': 'win', 'team': team_id}, objs, before, msg)
+
+    def freebie(self, team_id: int) -> Message:
+        """
+        Give the current auction to a team for free - only allowed once a single team still needs chores
+        """
+        if not self.cur_auction:
+            return self._no_auction_error()
+        if len(self.teams) - self.stats.teams_satisfied > 1:
+            return self._error("more than 1 team still needs chores - freebie can't be used yet",
+                               Outcome.FREEBIE_NOT_ALLOWED)
+        team = self._find_team(team_id)
+        if not team:
+            return self._unknown_team_error(team_id)
+
+        objs = self._completion_objs(team)
+        before = History.capture(objs)
+        msg = self.cur_auction.freebie(team)
+        self._advance()
+        return self._commit({'op': 'free', 'team': team_id}, objs, before, msg)
+
+    def sell(self) -> Message:
+        """
+        Sell the current auction to the highest bidder
+        """
+        if not self.cur_auction:
+            return self._no_auction_error()
+        if not self.cur_auction.bidder:
+            return self._error('no bids have been made on auction', Outcome.NO_BIDS)
+
+        team_id = self.cur_auction.bidder.id
+        objs = self._completion_objs(self.cur_auction.bidder)
+        before = History.capture(objs)
+        msg = self.cur_auction.complete_auction()
+        self._advance()
+        return self._commit({'op': 'sell', 'team': team_id}, objs, before, msg)
+
+    def reset(self) -> Message:
+        """
+        Reset bids of the current auction
+        """
+        if not self.cur_auction:
+            return self._no_auction_error()
+
+        objs = (self.cur_auction,)
+        before = History.capture(objs)
+        self.cur_auction.reset_bids()
+        msg = Message('Reset current auction state', colour=constants.COLOUR_SUCCESS_MSG, action='reset')
+        return self._commit({'op': 'reset'}, objs, before, msg)
+
+    def revert(self) -> Message:
+        """
+        Revert the last completed auction, refunding its buyer, and make it the current auction
+        """
+        if not self.queue.n_completed:
+            return self._error('no auctions have been completed', Outcome.NOTHING_TO_REVERT)
+
+        auction = self.queue.last_completed()
+        bidder = auction.bidder
+        objs = (auction, bidder, self.queue, self.stats)
+        before = History.capture(objs)
+
+        self.queue.revert()
+        # if bid is not present, instant win (-1) or freebie (-2) was used
+        if auction.current_bid == -1:
+            bidder.has_free_win = True
+        elif auction.current_bid > 0:
+            bidder.coins += auction.current_bid
+        bidder.chores.pop()
+        self.stats.auction_reverted(auction)
+        auction.reset_bids()
+        auction.is_completed = False
+
+        msg = Message('Reverted last auction', colour=constants.COLOUR_SUCCESS_MSG, action='revert', team=bidder.id)
+        return self._commit({'op': 'revert', 'team': bidder.id}, objs, before, msg)
+
+    def undo(self) -> Message:
+        """
+        Undo the last command, e.g., a single bid
+        """
+        if not self.history.can_undo():
+            return self._error('nothing to undo', Outcome.NOTHING_TO_UNDO)
+
+        record = self.history.undo().record
+        msg = Message(f'Undid {self._describe(record)}', colour=constants.COLOUR_SUCCESS_MSG,
+                      action='undo', team=record.get('team'))
+        return self._notify({'op': 'undo', 'team': record.get('team')}, msg)
+
+    def redo(self) -> Message:
+        """
+        Redo the last undone command
+        """
+        if not self.history.can_redo():
+            return self._error('nothing to redo', Outcome.NOTHING_TO_REDO)
+
+        record = self.history.redo().record
+        msg = Message(f'Redid {self._describe(record)}', colour=constants.COLOUR_SUCCESS_MSG,
+                      action='redo', team=record.get('team'))
+        return self._notify({'op': 'redo', 'team': record.get('team')}, msg)
+
+    def checkpoint(self):
+        """
+        Clear the undo/redo history. Listeners are not notified, as checkpoints are made by the listeners
+        persisting the state, see StateLogger.log_action
+        """
+        self.history.clear()
+
+    @staticmethod
+    def _describe(record: dict) -> str:
+        if record['op'] == 'bid':
+            return f'bid of team{record["team"]} ({record["bid"]})'
+        if 'team' in record:
+            return f'{record["op"]} (team{record["team"]})'
+        return record['op']
+
+    def apply(self, record: dict) -> Message:
+        """
+        Re-execute a command from its record
+        """
+        op = record['op']
+
+        if op == 'bid':
+            return self.bid(record['team'], record['bid'], record['bid_str'], record.get('timestamp'))
+        if op == 'win':
+            return self.instant_win(record['team'])
+        if op == 'free':
+            return self.freebie(record['team'])
+        if op == 'sell':
+            if self.cur_auction and self.cur_auction.bidder and self.cur_auction.bidder.id != record['team']:
+                return self._error(f'highest bidder is team{self.cur_auction.bidder.id}, not team{record["team"]}',
+                                   Outcome.NO_BIDS)
+            return self.sell()
+        if op == 'reset':
+            return self.reset()
+        if op == 'revert':
+            return self.revert()
+        if op == 'undo':
+            return self.undo()
+        if op == 'redo':
+            return self.redo()
+        if op == 'checkpoint':
+            self.checkpoint()
+            return Message('Checkpoint', action='checkpoint')
+
+        raise ValueError(f'unknown record: {op}')
+
+    def _completion_objs(self, team: Team) -> tuple:
+        """
+        Objects changed when the current auction is completed and bought by :param team
+        """
+        return self.cur_auction, team, self.queue, self.stats
+
+    def _advance(self):
+        """
+        Complete current auction and start the next
+        """
+        self.stats.auction_completed(self.cur_auction)
+        self.queue.advance()
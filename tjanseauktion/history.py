@@ -0,0 +1,65 @@
+from collections import deque
+from typing import Any, List, NamedTuple, Tuple
+
+
+class Change(NamedTuple):
+    """
+    State of the objects touched by a single command, before and after it was executed.
+    Objects provide their state with memento() and restore it with restore(memento).
+    """
+    # record of the command, see AuctionEngine
+    record: dict
+    objs: Tuple[Any, ...]
+    before: Tuple[Any, ...]
+    after: Tuple[Any, ...]
+
+
+class History:
+    """
+    Undo/redo history of the AuctionEngine. Every command records a Change holding only the objects it
+    touched, so undoing and redoing is proportional to the size of the change rather than the size of
+    the auction. At most `limit` changes are kept; the oldest are dropped first.
+    """
+
+    def __init__(self, limit: int = 1000):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []  # type: List[Change]
+
+    def __len__(self) -> int:
+        return len(self.undo_stack)
+
+    @staticmethod
+    def capture(objs: tuple) -> tuple:
+        return tuple(x.memento() for x in objs)
+
+    def record(self, record: dict, objs: tuple, before: tuple):
+        """
+        Record a command which changed :param objs from the mementos :param before to their current state.
+        Any undone changes can no longer be redone.
+        """
+        self.undo_stack.append(Change(record, objs, before, self.capture(objs)))
+        self.redo_stack.clear()
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_stack)
+
+    def undo(self) -> Change:
+        change = self.undo_stack.pop()
+        for obj, memento in zip(change.objs, change.before):
+            obj.restore(memento)
+        self.redo_stack.append(change)
+        return change
+
+    def redo(self) -> Change:
+        change = self.redo_stack.pop()
+        for obj, memento in zip(change.objs, change.after):
+            obj.restore(memento)
+        self.undo_stack.append(change)
+        return change
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
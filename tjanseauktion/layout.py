@@ -0,0 +1,72 @@
+from typing import NamedTuple
+
+
+class Box(NamedTuple):
+    """
+    Position and size of a textbox, excluding its border
+    """
+    y: int
+    x: int
+    h: int
+    w: int
+
+
+class Layout(NamedTuple):
+    """
+    Rows and columns of the UI elements. The layout only depends on the terminal width and the amount
+    of rows in the menus, and is computed at startup and whenever the terminal is resized.
+    """
+    cols: int
+    # first row of header, followed by the team table
+    header_row: int
+    team_table_row: int
+    # row of the "Place bid" and "Convert" texts above the input textboxes
+    textbox_text_row: int
+    bid_box: Box
+    convert_box: Box
+    msg_output_row: int
+    log_text_row: int
+    log_box: Box
+    stat_menu_row: int
+    legend_menu_row: int
+
+    TOP_MARGIN = 1
+    INPUT_BOX_COLS = 20
+    # max amount of messages to keep in UI log
+    LOG_BOX_ROWS = 10
+    LOG_BOX_COLS = 60
+
+    @classmethod
+    def compute(cls, cols: int, n_header_rows: int, n_teams: int, n_help_rows: int, n_stat_rows: int) -> 'Layout':
+        """
+        :param cols: width of the terminal
+        :param n_header_rows: rows above the team table
+        :param n_teams: rows of the team table
+        :param n_help_rows: rows of the command menu, excluding its title
+        :param n_stat_rows: rows of the statistics menu, excluding its title
+        """
+        header_row = cls.TOP_MARGIN
+        team_table_row = header_row + n_header_rows
+        # separated from team table by a horizontal rule
+        textbox_text_row = team_table_row + n_teams + 1
+        # textboxes are thicc, so add plenty spacing
+        input_box_row = textbox_text_row + 2
+        log_text_row = textbox_text_row + 7
+
+        # menus have a title and a horizontal rule, and are spaced by 3 rows
+        stat_menu_row = cls.TOP_MARGIN + 2 + n_help_rows + 3
+        legend_menu_row = stat_menu_row + 2 + n_stat_rows + 3
+
+        return cls(
+            cols=cols,
+            header_row=header_row,
+            team_table_row=team_table_row,
+            textbox_text_row=textbox_text_row,
+            bid_box=Box(input_box_row, cols // 2 - int(cls.INPUT_BOX_COLS * 1.5), 1, cls.INPUT_BOX_COLS),
+            convert_box=Box(input_box_row, cols // 2 + cls.INPUT_BOX_COLS // 2, 1, cls.INPUT_BOX_COLS),
+            msg_output_row=textbox_text_row + 5,
+            log_text_row=log_text_row,
+            log_box=Box(log_text_row + 3, cols // 2 - cls.LOG_BOX_COLS // 2, cls.LOG_BOX_ROWS, cls.LOG_BOX_COLS),
+            stat_menu_row=stat_menu_row,
+            legend_menu_row=legend_menu_row
+        )
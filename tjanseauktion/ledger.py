@@ -0,0 +1,146 @@
+from .outcome import Outcome
+from .team import Team
+
+from bisect import bisect_right
+import math
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+
+class LedgerEntry(NamedTuple):
+    # seconds since the epoch the bid was made, see BidLedger.now
+    timestamp: float
+    bid: int
+    bid_str: str
+    bidder: Optional[Team]
+    outcome: Outcome
+
+    def to_json(self) -> list:
+        """
+        The bidder is stored by team ID, and a timestamp of -inf, i.e., a bid made before all others, as None,
+        which isn't valid JSON otherwise
+        """
+        return [None if self.timestamp == -math.inf else self.timestamp, self.bid, self.bid_str,
+                self.bidder.id if self.bidder else None, self.outcome.value]
+
+    @classmethod
+    def from_json(cls, row: list, teams: List[Team]) -> 'LedgerEntry':
+        timestamp, bid, bid_str, bidder, outcome = row
+        return cls(-math.inf if timestamp is None else timestamp, bid, bid_str,
+                   teams[bidder] if bidder is not None else None, Outcome(outcome))
+
+
+class LedgerChange(NamedTuple):
+    """
+    An accepted bid inserted at, or replaced at, an index of the accepted bids of a BidLedger
+    """
+    index: int
+    # replaced bid, None if the bid was inserted
+    old: Optional[LedgerEntry]
+    new: LedgerEntry
+
+
+class BidLedger:
+    """
+    Every bid attempted on an Auction along with its outcome, and the accepted bids in the order they were made.
+
+    Bids are usually entered as they are made, but in fast-paced bidding the operator may enter a bid after the
+    bids which followed it. Such a late bid is inserted by its timestamp among the accepted bids, found by
+    bisection, and the highest bidder is the last accepted bid, so the leader is known in O(log n) per bid.
+    Every accepted bid is made by another team than the bid before it and is high enough over it, see
+    Auction.try_bid, except for OVERRIDE bids, which are resolved once the bid missed before them is entered.
+
+    Undoing a bid removes it from the accepted bids, but not from the attempts, which are a log of what was entered.
+    """
+    __slots__ = ('attempts', 'timestamps', 'accepted', 'changes', 'version')
+
+    def __init__(self):
+        # all bids in the order they were entered
+        self.attempts = []  # type: List[LedgerEntry]
+        # accepted bids sorted by timestamp, and their timestamps for bisection
+        self.accepted = []  # type: List[LedgerEntry]
+        self.timestamps = []  # type: List[float]
+        # every change of the accepted bids, of which the first `version` are applied, see BidLedger.restore
+        self.changes = []  # type: List[LedgerChange]
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.accepted)
+
+    @property
+    def leader(self) -> Optional[LedgerEntry]:
+        """
+        Last accepted bid, None if no bids have been accepted
+        """
+        return self.accepted[-1] if self.accepted else None
+
+    def now(self) -> float:
+        """
+        Timestamp of a bid made now: the current time, but never earlier than an accepted bid, such that bids
+        entered as they are made stay in order even if the clock is set back, e.g., when resuming on another machine
+        """
+        now = time.time()
+        return max(now, self.timestamps[-1]) if self.timestamps else now
+
+    def neighbours(self, timestamp: float) -> Tuple[int, Optional[LedgerEntry], Optional[LedgerEntry]]:
+        """
+        :return: index a bid made at :param timestamp is accepted at, and the accepted bids made before and after
+                 it, if any. Bids made at the same time as an accepted bid are placed after it
+        """
+        i = bisect_right(self.timestamps, timestamp)
+        before = self.accepted[i - 1] if i else None
+        after = self.accepted[i] if i < len(self.accepted) else None
+        return i, before, after
+
+    def record(self, entry: LedgerEntry):
+        """
+        Record an attempted bid, and insert it among the accepted bids if its outcome is a success
+        """
+        self.attempts.append(entry)
+        if entry.outcome.is_success:
+            self._change(LedgerChange(bisect_right(self.timestamps, entry.timestamp), None, entry))
+
+    def replace(self, i: int, entry: LedgerEntry):
+        """
+        Replace the accepted bid at index :param i by :param entry made at the same time, e.g., with a new outcome
+        """
+        self._change(LedgerChange(i, self.accepted[i], entry))
+
+    def _change(self, change: LedgerChange):
+        # changes which were undone can no longer be redone
+        del self.changes[self.version:]
+        self.changes.append(change)
+        self._apply(change)
+        self.version += 1
+
+    def _apply(self, change: LedgerChange):
+        if change.old is None:
+            self.accepted.insert(change.index, change.new)
+            self.timestamps.insert(change.index, change.new.timestamp)
+        else:
+            self.accepted[change.index] = change.new
+
+    def _revert(self, change: LedgerChange):
+        if change.old is None:
+            del self.accepted[change.index]
+            del self.timestamps[change.index]
+        else:
+            self.accepted[change.index] = change.old
+
+    def memento(self) -> int:
+        """
+        State changed by bids, see History. Only the version is captured, as the changes are kept by the ledger
+        """
+        return self.version
+
+    def restore(self, memento: int):
+        """
+        Undo or redo changes until :param memento, proportional to the amount of changes rather than the bids
+        """
+        while self.version > memento:
+            self.version -= 1
+            self._revert(self.changes[self.version])
+        while self.version < memento:
+            self._apply(self.changes[self.version])
+            self.version += 1
+
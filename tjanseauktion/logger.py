@@ -1,72 +1,575 @@
 from .message import Message
 from .team import Team
 from .auction import Auction
+from .auction_queue import AuctionQueue
+from .chore import Chore
+from .serializer import SERIALIZERS, Serializer, JsonSerializer
+from .engine import AuctionEngine
 
 import os
 import json
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    # config imports this module
+    from .config import Settings
 
 LOG_DIR = 'logs'
 TIMESTAMP = datetime.now().strftime('%d-%m-%Y')
+# bumped whenever the layout of persisted state changes
+STATE_VERSION = 4
+
+
+class StateError(ValueError):
+    """
+    Persisted state which can't be resumed, e.g., as it is corrupt or of an unsupported version
+    """
 
 
 class MessageLogger:
+    """
+    Appends messages to logs/message-log-DATE.txt, one tab separated line per message:
+
+        timestamp   action  team    bid     bid_time    text
+
+    with '-' for empty fields. bid_time is the time an accepted bid was made in seconds since the epoch, such that
+    late bids are replayed in the order they were made, see Auction.try_bid.
+
+    Lines are handed to a background thread which keeps the file open and writes in batches, once
+    `flush_size` lines are queued or `flush_interval` seconds have passed. close() must be called on
+    shutdown to write what is still buffered.
+    """
     LOG_NAME = 'message-log'
+    EMPTY_FIELD = '-'
+    # seconds between checks that the writer thread is still alive while waiting for it
+    WAIT_INTERVAL = .1
 
-    def __init__(self):
+    def __init__(self, flush_size: int = 20, flush_interval: float = 1.0):
         self.path = f'{LOG_DIR}/{self.LOG_NAME}-{TIMESTAMP}.txt'
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
 
         if not os.path.isfile(self.path):
             Path(self.path).touch(0o666, exist_ok=True)
 
+        self._queue = queue.Queue()
+        # error which stopped the writer thread, raised by flush
+        self._error = None  # type: Optional[Exception]
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._write_loop, name='message-logger', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def format_msg(cls, msg: Message, timestamp: datetime) -> str:
+        fields = [timestamp.isoformat(timespec='milliseconds'), msg.action, msg.team, msg.bid, msg.bid_time, msg.txt]
+        return '\t'.join(cls.EMPTY_FIELD if x is None or x == '' else str(x) for x in fields) + '\n'
+
+    @classmethod
+    def parse_line(cls, line: str) -> dict:
+        """
+        Parse a line of the message log back into its fields. Lines written before bid_time was logged have no
+        bid_time, which is then None
+        """
+        fields = line.rstrip('\n').split('\t', 5)
+        if len(fields) == 5:
+            fields.insert(4, cls.EMPTY_FIELD)
+        timestamp, action, team, bid, bid_time, txt = fields
+        return {
+            'timestamp': datetime.strptime(timestamp, '%Y-%m-%dT%H:%M:%S.%f'),
+            'action': '' if action == cls.EMPTY_FIELD else action,
+            'team': None if team == cls.EMPTY_FIELD else int(team),
+            'bid': None if bid == cls.EMPTY_FIELD else int(bid),
+            'bid_time': None if bid_time == cls.EMPTY_FIELD else float(bid_time),
+            'txt': txt
+        }
+
     def log_msg(self, msg: Message):
-        with open(self.path, 'a') as f:
-            f.write(msg.txt + '\n')
+        self._queue.put(self.format_msg(msg, datetime.now()))
+
+    def flush(self):
+        """
+        Block until all queued messages have been written
+        :raises Exception: error which stopped the writer thread, e.g., an OSError when the disk is full, as the
+        messages will never be written
+        """
+        done = threading.Event()
+        self._queue.put(done)
+        while self._thread.is_alive() and not done.wait(self.WAIT_INTERVAL):
+            pass
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """
+        Write remaining messages and stop the writer thread
+        :raises Exception: error which stopped the writer thread, see flush
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _write_loop(self):
+        try:
+            self._write_batches()
+        except Exception as e:
+            self._error = e
+
+    def _write_batches(self):
+        buffer = []
+        last_write = time.monotonic()
+
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0., self.flush_interval - (time.monotonic() - last_write)))
+            except queue.Empty:
+                item = ''
+
+            if isinstance(item, str) and item:
+                buffer.append(item)
+
+            if item is None or isinstance(item, threading.Event) or len(buffer) >= self.flush_size \
+                    or time.monotonic() - last_write >= self.flush_interval:
+                if buffer:
+                    self._file.write(''.join(buffer))
+                    self._file.flush()
+                    buffer = []
+                last_write = time.monotonic()
+
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                self._file.close()
+                return
+
+
+class FsyncPolicy:
+    """
+    Decides when written state is flushed to disk with fsync, trading durability for latency.
+
+    Policies are given as strings, e.g., in cfg.ini:
+        always  - fsync after every action
+        never   - leave it to the OS
+        10      - fsync every 10 actions
+        250ms   - fsync on the first action at least 250 ms after the previous fsync
+    """
+
+    def __init__(self, every_n_actions: int = 1, every_ms: int = 0):
+        self.every_n_actions = every_n_actions
+        self.every_ms = every_ms
+        self.n_unsynced = 0
+        self.last_sync = time.monotonic()
+
+    @classmethod
+    def from_str(cls, policy: str):
+        policy = policy.strip().lower()
+        if policy == 'always':
+            return cls(every_n_actions=1)
+        if policy == 'never':
+            return cls(every_n_actions=0)
+        if policy.endswith('ms'):
+            return cls(every_n_actions=0, every_ms=int(policy[:-2]))
+        return cls(every_n_actions=int(policy))
+
+    def should_sync(self) -> bool:
+        """
+        Register a write and check whether it should be synced
+        """
+        self.n_unsynced += 1
+
+        if self.every_n_actions and self.n_unsynced >= self.every_n_actions:
+            return True
+        if self.every_ms and (time.monotonic() - self.last_sync) * 1000 >= self.every_ms:
+            return True
+        return False
+
+    def synced(self):
+        self.n_unsynced = 0
+        self.last_sync = time.monotonic()
 
 
 class StateLogger:
+    """
+    Persists auction state to logs/state-log-DATE.json, or another extension depending on the
+    Serializer used for snapshots.
+
+    In snapshot mode the full state is rewritten on every action. In journal mode every action is
+    appended as one compact record to logs/state-log-DATE.journal, and the full state is only
+    rewritten every `snapshot_interval` actions. The snapshot stores the journal offset it covers,
+    so loading consists of reading the snapshot with read_state or load_state, and re-executing the
+    journal tail with replay_journal.
+
+    The journal is never truncated - it starts with an 'init' record holding the initial state,
+    making it a complete history of the auction. Starting a new auction moves the logs of the
+    previous one aside, see StateLogger.archive.
+
+    Snapshots are written to a temporary file which is atomically renamed over the previous
+    snapshot, so a crash never leaves a truncated snapshot behind. How often writes are fsync'ed
+    is decided by the FsyncPolicy. Snapshots in journal mode are always fsync'ed, as the journal
+    offset they store must never point past what is on disk.
+    """
     LOG_NAME = 'state-log'
 
-    def __init__(self):
-        self.path = f'{LOG_DIR}/{self.LOG_NAME}-{TIMESTAMP}.json'
+    def __init__(self, journal: bool = False, snapshot_interval: int = 200,
+                 fsync_policy: Optional[FsyncPolicy] = None, serializer: Optional[Serializer] = None):
+        self.serializer = serializer or JsonSerializer()
+        self.path = f'{LOG_DIR}/{self.LOG_NAME}-{TIMESTAMP}.{self.serializer.EXTENSION}'
+        self.journal_path = f'{LOG_DIR}/{self.LOG_NAME}-{TIMESTAMP}.journal'
+        self.journal = journal
+        self.snapshot_interval = snapshot_interval
+        self.fsync_policy = fsync_policy or FsyncPolicy()
+        # amount of journal records appended since last snapshot
+        self.n_journal_records = 0
+        # journal is kept open in append mode while logging
+        self._journal_file = None
+        # last parsed snapshot, keyed by the stat of the file it was parsed from
+        self._snapshot_cache = None
+        # journal offset covered by the last loaded snapshot
+        self._snapshot_journal_offset = None
 
         if not os.path.isfile(self.path):
-            with open(self.path, 'w', encoding='utf-8') as f:
-                f.write(json.dumps({
-                    'teams': [],
-                    'auctions': [],
-                    'completed_auctions': [],
-                    'cur_auction': None
-                }))
-
-    def log_state(self, teams: List[Team], auctions: List[Auction],
-                  completed_auctions: List[Auction], cur_auction: Auction):
-        log = {
-            'teams': [x.to_json() for x in teams],
-            'auctions': [x.to_json() for x in auctions],
-            'completed_auctions': [x.to_json() for x in completed_auctions],
-            'cur_auction': cur_auction.to_json() if cur_auction else {}
+            self._write_snapshot({
+                'teams': [],
+                'auctions': [],
+                'cursor': 0
+            }, sync=False)
+
+    @staticmethod
+    def _state_json(teams: List[Team], auction_queue: AuctionQueue) -> dict:
+        """
+        Normalised state: every chore is stored once, in its auction. Auctions are stored in order
+        along with the cursor of the queue, teams refer to their chores by auction index, and
+        auctions refer to their bidder by team ID.
+        """
+        chore_index = {id(x.chore): i for i, x in enumerate(auction_queue)}
+
+        return {
+            'version': STATE_VERSION,
+            'teams': [x.to_json(chore_index) for x in teams],
+            'auctions': [x.to_json() for x in auction_queue],
+            'cursor': auction_queue.cursor,
+            'seed': auction_queue.seed
         }
 
-        with open(self.path, 'w', encoding='utf-8') as f:
-            f.write(json.dumps(log, indent=4, ensure_ascii=False))
+    def init_state(self, teams: List[Team], auction_queue: AuctionQueue):
+        """
+        Persist the initial state of a new auction. In journal mode this starts a new journal.
+        Logs of a previous auction are moved aside first, see StateLogger.archive
+        """
+        self.archive()
+        if self.journal:
+            state = self._state_json(teams, auction_queue)
+            self.close()
+            with open(self.journal_path, 'xb') as f:
+                f.write(self._encode_record({'op': 'init', 'state': state}))
+                f.flush()
+                os.fsync(f.fileno())
+
+        self.log_state(teams, auction_queue)
+
+    def log_state(self, teams: List[Team], auction_queue: AuctionQueue):
+        log = self._state_json(teams, auction_queue)
+
+        if self.journal:
+            # the snapshot must not cover journal records which may be lost
+            self._sync_journal()
+            log['journal_offset'] = os.path.getsize(self.journal_path) if os.path.isfile(self.journal_path) else 0
+            self.n_journal_records = 0
+            sync = True
+        else:
+            sync = self.fsync_policy.should_sync()
+
+        self._write_snapshot(log, sync=sync)
+        if sync and not self.journal:
+            self.fsync_policy.synced()
+
+    def _write_snapshot(self, data: dict, sync: bool):
+        """
+        Atomically replace the snapshot by writing to a temporary file and renaming it
+        """
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.serializer.dumps(data))
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+        os.replace(tmp_path, self.path)
+
+        # persist the rename itself, not supported on all platforms
+        if sync and hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(os.path.dirname(self.path) or '.', os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def log_action(self, action: dict, teams: List[Team], auction_queue: AuctionQueue) -> bool:
+        """
+        Persist a single action, i.e., an AuctionEngine record such as
+        {'op': 'bid', 'team': 2, 'bid': 500, 'bid_str': '1,0,7'}.
+        Outside of journal mode this falls back to writing a full snapshot.
+
+        Snapshots don't include the undo history, so when the journal is compacted a 'checkpoint' record
+        is appended, after which earlier actions can't be undone.
+        :return: whether the journal was compacted, in which case AuctionEngine.checkpoint must be called
+        """
+        if not self.journal:
+            self.log_state(teams, auction_queue)
+            return False
+
+        self._append_record(action)
+
+        # compact journal into a new snapshot
+        if self.n_journal_records >= self.snapshot_interval:
+            self._append_record({'op': 'checkpoint'})
+            self.log_state(teams, auction_queue)
+            return True
+
+        return False
+
+    def _append_record(self, record: dict):
+        if not self._journal_file:
+            self._journal_file = open(self.journal_path, 'ab')
+
+        self._journal_file.write(self._encode_record(record))
+        self._journal_file.flush()
+        if self.fsync_policy.should_sync():
+            self._sync_journal()
+        self.n_journal_records += 1
+
+    def _read_snapshot(self) -> Optional[dict]:
+        """
+        Parse the snapshot, reusing the previously parsed document as long as the file is unchanged
+        :return: parsed snapshot, or None if it is missing or not valid JSON
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if self._snapshot_cache and self._snapshot_cache[0] == key:
+            return self._snapshot_cache[1]
+
+        with open(self.path, 'rb') as f:
+            try:
+                data = self.serializer.loads(f.read())
+            except ValueError:
+                data = None
+
+        self._snapshot_cache = (key, data)
+        return data
+
+    def archive(self) -> Optional[int]:
+        """
+        Move the snapshot and journal aside by appending the first suffix, e.g., '.1', not used by either
+        :return: the suffix, or None if there was nothing to move
+        """
+        self.close()
+        paths = [x for x in [self.path, self.journal_path] if os.path.isfile(x)]
+        if self._is_empty(self._read_snapshot()):
+            # the placeholder written on construction holds no state
+            paths = [x for x in paths if x != self.path]
+        if not paths:
+            return None
+
+        n = 1
+        while any(os.path.exists(f'{x}.{n}') for x in [self.path, self.journal_path]):
+            n += 1
+        for path in paths:
+            os.rename(path, f'{path}.{n}')
+        self._snapshot_cache = None
+        return n
+
+    @staticmethod
+    def _is_empty(data: Optional[dict]) -> bool:
+        # the snapshot written when no state log is present
+        return isinstance(data, dict) and not data.get('teams') and not data.get('auctions')
+
+    @staticmethod
+    def _is_snapshot_present(data: Optional[dict]) -> bool:
+        # state is only present while auctions are left
+        return isinstance(data, dict) and bool(data.get('teams')) and isinstance(data.get('auctions'), list) \
+            and isinstance(data.get('cursor'), int) and data['cursor'] < len(data['auctions'])
+
+    def read_state(self):
+        """
+        Read, validate and build the persisted snapshot in a single pass
+        :return: (teams, auction_queue), or None if there is no auction to resume, i.e., no state is present
+        or all chores have been sold
+        :raises StateError: if the state can't be resumed, in which case it must not be overwritten
+        """
+        data = self._read_snapshot()
+        if not isinstance(data, dict):
+            raise StateError(f'state log {self.path} is not valid')
+        if self._is_empty(data):
+            self._check_orphans()
+            return None
+        if isinstance(data.get('auctions'), list) and isinstance(data.get('cursor'), int) \
+                and data['cursor'] >= len(data['auctions']):
+            return None
+
+        try:
+            return self._build_state(data)
+        except (KeyError, TypeError, ValueError, IndexError, AttributeError) as e:
+            raise StateError(f'state log {self.path} can\'t be resumed, {type(e).__name__}: {e}') from e
+
+    def _check_orphans(self):
+        """
+        Raise StateError if state is persisted which isn't read as configured, i.e., a snapshot of another
+        format, or a journal without a snapshot
+        """
+        for ext in {x.EXTENSION for x in SERIALIZERS.values()} - {self.serializer.EXTENSION}:
+            path = f'{LOG_DIR}/{self.LOG_NAME}-{TIMESTAMP}.{ext}'
+            if not os.path.isfile(path):
+                continue
+            formats = [k for k, v in SERIALIZERS.items() if v.EXTENSION == ext]
+            with open(path, 'rb') as f:
+                try:
+                    data = SERIALIZERS[formats[0]]().loads(f.read())
+                except ValueError:
+                    data = None
+            if not self._is_empty(data):
+                raise StateError(f'state is saved as {path}, set format = {" or ".join(formats)} in the [state] '
+                                 f'section of cfg.ini to resume it')
+
+        if os.path.isfile(self.journal_path) and os.path.getsize(self.journal_path):
+            raise StateError(f'journal {self.journal_path} has no snapshot at {self.path}')
 
     def load_state(self):
-        with open(self.path, 'r', encoding='utf-8') as f:
-            data = json.loads(f.read())
+        data = self._read_snapshot()
+        if data is None:
+            raise ValueError(f'state log {self.path} is missing or not valid')
 
-        teams = [Team.from_json(x) for x in data['teams']]
-        auctions = [Auction.from_json(x) for x in data['auctions']]
-        completed_auctions = [Auction.from_json(x) for x in data['completed_auctions']]
-        cur_auction = Auction.from_json(data['cur_auction'])
+        return self._build_state(data)
 
-        return teams, auctions, completed_auctions, cur_auction
+    def _build_state(self, data: dict):
+        state = self.build_state(data)
+        self._snapshot_journal_offset = data.get('journal_offset')
+
+        return state
+
+    @staticmethod
+    def build_state(data: dict):
+        """
+        Build state from a snapshot, or the state of an 'init' record, resolving chore indexes and
+        bidder IDs to shared objects. See StateLogger._state_json
+        :return: (teams, auction_queue)
+        """
+        if data.get('version') != STATE_VERSION:
+            raise ValueError(f'unsupported state log version {data.get("version")} (expected {STATE_VERSION})')
+
+        chores = [Chore.from_json(x['chore']) for x in data['auctions']]
+        teams = [Team.from_json(x, chores) for x in data['teams']]
+        auctions = [Auction.from_json(x, teams, chore) for x, chore in zip(data['auctions'], chores)]
+
+        return teams, AuctionQueue(auctions, data['cursor'], data.get('seed'))
+
+    def replay_journal(self, engine: AuctionEngine) -> int:
+        """
+        Re-execute the journal records written after the last loaded snapshot
+        :param engine: engine holding the state of the loaded snapshot
+        :return: amount of records replayed
+        :raises StateError: if the journal is corrupt or a record is rejected
+        """
+        if not self.journal or self._snapshot_journal_offset is None:
+            return 0
+
+        try:
+            records = [x for x in self.read_journal(self._snapshot_journal_offset) if x['op'] != 'init']
+        except ValueError as e:
+            raise StateError(f'journal {self.journal_path} is not valid: {e}') from e
+        for i, record in enumerate(records):
+            msg = engine.apply(record)
+            if not msg.outcome.is_success:
+                raise StateError(f'journal record {i} after snapshot was rejected: {msg.txt}')
+
+        self.n_journal_records += len(records)
+        return len(records)
+
+    def read_journal(self, offset: int = 0) -> List[dict]:
+        """
+        Read journal records starting at byte :param offset, see StateLogger.parse_journal
+        """
+        return self.parse_journal(self.journal_path, offset)
+
+    @staticmethod
+    def parse_journal(path: str, offset: int = 0) -> List[dict]:
+        """
+        Read records of the journal at :param path starting at byte :param offset. A torn final
+        record, i.e., one that was being written when the process died, is ignored.
+        """
+        if not os.path.isfile(path):
+            return []
+
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            lines = f.read().split(b'\n')
+
+        records = []
+        for i, line in enumerate(lines):
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line.decode('utf-8')))
+            except ValueError:
+                if i == len(lines) - 1:
+                    break
+                raise
+
+        return records
+
+    def _sync_journal(self):
+        if self._journal_file:
+            self._journal_file.flush()
+            os.fsync(self._journal_file.fileno())
+        self.fsync_policy.synced()
+
+    def close(self):
+        """
+        Sync and close the journal
+        """
+        if self._journal_file:
+            self._sync_journal()
+            self._journal_file.close()
+            self._journal_file = None
+
+    @staticmethod
+    def _encode_record(record: dict) -> bytes:
+        return (json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n').encode('utf-8')
 
     def is_state_log_present(self) -> bool:
-        with open(self.path, 'r') as f:
-            data = json.loads(f.read())
+        return self._is_snapshot_present(self._read_snapshot())
+
+
+def open_engine(settings: 'Settings', seed: Optional[int], state_logger: StateLogger,
+                msg_logger: MessageLogger) -> AuctionEngine:
+    """
+    Resume the persisted auction, or start a new one, and persist every action of the engine
+    :param seed: seed of a new auction, overriding the seed of :param settings. Ignored when resuming an auction
+    """
+    state = state_logger.read_state()
+    if state:
+        engine = AuctionEngine(*state, overbid_factor=settings.min_overbid_factor, undo_limit=settings.undo_limit)
+        state_logger.replay_journal(engine)
+    else:
+        engine = AuctionEngine.create(Chore.load_chores(), settings.n_teams, settings.n_secrets,
+                                      settings.min_overbid_factor, settings.undo_limit,
+                                      seed if seed is not None else settings.seed, settings.day_order,
+                                      settings.start_coins)
+        state_logger.init_state(*engine.state())
+        msg_logger.log_msg(Message(f'Generated auctions with seed {engine.queue.seed}', action='seed'))
+
+    def persist(record: dict, _: Message):
+        if state_logger.log_action(record, *engine.state()):
+            engine.checkpoint()
 
-        # allow completed auctions to be empty
-        return all(bool(data[key]) for key in ['teams', 'auctions', 'cur_auction']) and 'completed_auctions' in data.keys()
\ No newline at end of file
+    engine.subscribe(persist)
+    return engine
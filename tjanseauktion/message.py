@@ -1,12 +1,41 @@
+from .outcome import Outcome
+
+import curses
+from typing import Optional
 
 
 class Message:
+    __slots__ = ('txt', 'colour', 'action', 'team', 'bid', 'outcome', 'bid_time')
 
-    def __init__(self, txt: str, attr: int = 0):
+    def __init__(self, txt: str, colour: int = 0, action: str = '', team: Optional[int] = None,
+                 bid: Optional[int] = None, outcome: Outcome = Outcome.OK, bid_time: Optional[float] = None):
+        """
+        :param txt: text shown in the UI and written to the message log
+        :param colour: colour pair ID of the text, see constants.py
+        :param action: type of state changing action the message reports, e.g., 'bid' or 'sell'.
+                       Empty for errors and informational messages
+        :param team: ID of the team the action was performed by, if any
+        :param bid: coins involved in the action, if any
+        :param outcome: outcome of the command the message reports
+        :param bid_time: time an accepted bid was made, see BidLedger.now
+        """
         self.txt = txt
-        self.attr = attr
+        self.colour = colour
+        self.action = action
+        self.team = team
+        self.bid = bid
+        self.outcome = outcome
+        self.bid_time = bid_time
 
     def __eq__(self, other):
         if not other:
             return False
         return self.txt == other.txt
+
+    @property
+    def attr(self) -> int:
+        """
+        curses attribute of the text. Resolved on access, such that messages can be created without
+        a terminal
+        """
+        return curses.color_pair(self.colour) if self.colour else 0
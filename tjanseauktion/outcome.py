@@ -0,0 +1,30 @@
+from enum import Enum
+
+
+class Outcome(Enum):
+    """
+    Outcome of an auction command, see AuctionEngine
+    """
+    OK = 'ok'
+    # same team bid again, see Auction.try_bid
+    OVERRIDE = 'override'
+    BID_TOO_LOW = 'bid_too_low'
+    BIDDER_HAS_LEAD = 'bidder_has_lead'
+    CANT_AFFORD = 'cant_afford'
+    OVERBID_TOO_LOW = 'overbid_too_low'
+    # late bid which the bid made after it is not a valid overbid of, see Auction.try_bid
+    CONFLICTS_WITH_LATER_BID = 'conflicts_with_later_bid'
+    UNKNOWN_TEAM = 'unknown_team'
+    INSTANT_WIN_USED = 'instant_win_used'
+    FREEBIE_NOT_ALLOWED = 'freebie_not_allowed'
+    NO_BIDS = 'no_bids'
+    NOTHING_TO_REVERT = 'nothing_to_revert'
+    NOTHING_TO_UNDO = 'nothing_to_undo'
+    NOTHING_TO_REDO = 'nothing_to_redo'
+    NO_AUCTION = 'no_auction'
+    # command could not be parsed, see AuctionServer
+    INVALID_COMMAND = 'invalid_command'
+
+    @property
+    def is_success(self) -> bool:
+        return self in (Outcome.OK, Outcome.OVERRIDE)
@@ -1,7 +1,8 @@
+from .stats import AuctionStats
 from .team import Team
 
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 DATE = datetime.now()
 TIMESTAMP = DATE.strftime('%d-%m-%Y')
@@ -10,7 +11,7 @@ TIMESTAMP = DATE.strftime('%d-%m-%Y')
 class OutputWriter:
 
     @classmethod
-    def write_to_pdf(cls, teams: List[Team]):
+    def write_to_pdf(cls, teams: List[Team], stats: Optional[AuctionStats] = None):
         file_name = f'tjanseauktion-{TIMESTAMP}'
         md = f'# Tjanseauktion {DATE.year}\n\n'
 
@@ -22,5 +23,11 @@ class OutputWriter:
 
             md += '\n'
 
+        if stats:
+            md += '## Statistics\n\n'
+            md += f'- Chores bought: {stats.n_bought}\n'
+            md += f'- Average price: {stats.average_price:.0f}\n'
+            md += f'- Coins in circulation: {stats.coins_in_circulation}\n'
+
         with open(f'{file_name}.md', 'w') as f:
             f.write(md)
@@ -0,0 +1,193 @@
+from .engine import AuctionEngine
+from .logger import MessageLogger, StateLogger
+from .serializer import SERIALIZERS
+
+import os
+import re
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+# message log actions which are AuctionEngine commands, see AuctionEngine.apply
+MESSAGE_OPS = ['bid', 'win', 'free', 'sell', 'reset', 'revert', 'undo', 'redo']
+BID_STR_PATTERN = re.compile(r'coins \((.*)\)')
+
+
+class ReplayResult(NamedTuple):
+    engine: AuctionEngine
+    n_actions: int
+    seconds: float
+
+    @property
+    def actions_per_sec(self) -> float:
+        return self.n_actions / self.seconds if self.seconds else float('inf')
+
+
+def read_journal(path: str) -> Tuple[dict, List[dict]]:
+    """
+    :return: initial state of the journal at :param path, and the records following it
+    """
+    if not os.path.isfile(path):
+        raise ValueError(f'{path} does not exist')
+
+    records = StateLogger.parse_journal(path)
+    if not records or records[0]['op'] != 'init':
+        raise ValueError(f'{path} is not a state journal, it must start with an init record')
+
+    return records[0]['state'], records[1:]
+
+
+def read_message_log(path: str) -> List[dict]:
+    """
+    Convert the successful actions of a message log to AuctionEngine records. Messages that are not
+    commands, e.g., errors and conversions, are skipped.
+    """
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for i, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                fields = MessageLogger.parse_line(line)
+            except ValueError as e:
+                raise ValueError(f'{path}:{i + 1}: invalid message log line ({e})')
+
+            op = fields['action']
+            if op not in MESSAGE_OPS:
+                continue
+
+            record = {'op': op}
+            if op in ['bid', 'win', 'free', 'sell']:
+                record['team'] = fields['team']
+            if op == 'bid':
+                match = BID_STR_PATTERN.search(fields['txt'])
+                record['bid'] = fields['bid']
+                record['bid_str'] = match.group(1) if match else ''
+                if fields['bid_time'] is not None:
+                    record['timestamp'] = fields['bid_time']
+            records.append(record)
+
+    return records
+
+
+def replay(state: dict, records: List[dict], overbid_factor: float, undo_limit: int) -> ReplayResult:
+    """
+    Re-execute :param records on :param state, i.e., the state of a journal init record
+    :raises ValueError: if a record is rejected, meaning the log doesn't match the auction rules
+    """
+    engine = AuctionEngine(*StateLogger.build_state(state), overbid_factor=overbid_factor, undo_limit=undo_limit)
+
+    start = time.perf_counter()
+    for i, record in enumerate(records):
+        msg = engine.apply(record)
+        if not msg.outcome.is_success:
+            raise ValueError(f'record {i + 1} {record} was rejected: {msg.txt}')
+
+    return ReplayResult(engine, len(records), time.perf_counter() - start)
+
+
+def find_snapshot(journal_path: str) -> Optional[str]:
+    """
+    Find the snapshot written along with the journal at :param journal_path, in any format
+    """
+    base = journal_path[:-len('.journal')] if journal_path.endswith('.journal') else journal_path
+    for serializer in SERIALIZERS.values():
+        path = f'{base}.{serializer.EXTENSION}'
+        if os.path.isfile(path):
+            return path
+
+    return None
+
+
+def recover(journal_path: str, overbid_factor: float, undo_limit: int) -> Optional[Tuple[AuctionEngine, str]]:
+    """
+    Load state the way the tjanseauktion does on launch: the snapshot, followed by the journal records
+    written after it
+    :return: the recovered engine and the snapshot path, or None if no snapshot is present
+    """
+    snapshot_path = find_snapshot(journal_path)
+    if not snapshot_path:
+        return None
+
+    serializer = next(x() for x in SERIALIZERS.values() if snapshot_path.endswith(f'.{x.EXTENSION}'))
+    with open(snapshot_path, 'rb') as f:
+        data = serializer.loads(f.read())
+    if 'journal_offset' not in data:
+        raise ValueError(f'{snapshot_path} was not written in journal mode')
+
+    tail = [x for x in StateLogger.parse_journal(journal_path, data['journal_offset']) if x['op'] != 'init']
+    return replay(data, tail, overbid_factor, undo_limit).engine, snapshot_path
+
+
+def diff_state(expected: AuctionEngine, actual: AuctionEngine) -> List[str]:
+    """
+    :return: differences in team coins, chores and instant wins, and in the current auction
+    """
+    diffs = []
+    if len(expected.teams) != len(actual.teams):
+        return [f'expected {len(expected.teams)} teams, got {len(actual.teams)}']
+
+    for e, a in zip(expected.teams, actual.teams):
+        if e.coins != a.coins:
+            diffs.append(f'{e}: expected {e.coins} coins, got {a.coins}')
+        if [str(x) for x in e.chores] != [str(x) for x in a.chores]:
+            diffs.append(f'{e}: expected chores {[str(x) for x in e.chores]}, got {[str(x) for x in a.chores]}')
+        if e.has_free_win != a.has_free_win:
+            diffs.append(f'{e}: expected instant win {"unused" if e.has_free_win else "used"}')
+
+    if expected.queue.cursor != actual.queue.cursor:
+        diffs.append(f'expected {expected.queue.cursor} completed auctions, got {actual.queue.cursor}')
+
+    return diffs
+
+
+def default_journal(message_log_path: str) -> str:
+    """
+    Journal written on the same day as the message log at :param message_log_path
+    """
+    directory, name = os.path.split(message_log_path)
+    date = name[len(MessageLogger.LOG_NAME) + 1:].rsplit('.', 1)[0]
+    return os.path.join(directory, f'{StateLogger.LOG_NAME}-{date}.journal')
+
+
+def main(path: str, journal_path: Optional[str], overbid_factor: float, undo_limit: int) -> int:
+    """
+    Replay a state journal or a message log, and check that it ends in the persisted state
+    :param path: state journal or message log to replay
+    :param journal_path: journal holding the initial state of a message log, defaults to the journal of the same day
+    :return: exit code; 0 if the replayed state matches, 1 if not and 2 if the logs can't be replayed
+    """
+    try:
+        if path.endswith('.journal'):
+            journal_path = path
+            state, records = read_journal(path)
+        else:
+            journal_path = journal_path or default_journal(path)
+            state, _ = read_journal(journal_path)
+            records = read_message_log(path)
+
+        result = replay(state, records, overbid_factor, undo_limit)
+        recovered = recover(journal_path, overbid_factor, undo_limit)
+    except (OSError, ValueError, KeyError) as e:
+        print(f'Error: {e}')
+        return 2
+
+    print(f'Replayed {result.n_actions} actions from {path} in {result.seconds * 1000:.1f} ms '
+          f'({result.actions_per_sec:.0f} actions/s)\n')
+    for team in result.engine.teams:
+        print(f'{team}\tcoins: {team.coins}\tchores: {len(team.chores)}')
+    print()
+
+    if not recovered:
+        print(f'No snapshot found next to {journal_path}, nothing to compare with')
+        return 0
+
+    engine, snapshot_path = recovered
+    diffs = diff_state(engine, result.engine)
+    if diffs:
+        print(f'MISMATCH with {snapshot_path}:')
+        for diff in diffs:
+            print(f'  {diff}')
+        return 1
+
+    print(f'OK: final state matches {snapshot_path}')
+    return 0
@@ -0,0 +1,119 @@
+from .currency import Rates, DEFAULT_RATES
+from .engine import AuctionEngine
+from .team import Team
+
+from typing import Optional
+
+
+def auction_view(engine: AuctionEngine) -> Optional[dict]:
+    """
+    Current auction as shown in the header of the UI, None once all chores are sold
+    """
+    auction = engine.cur_auction
+    if not auction:
+        return None
+    return {
+        'cursor': engine.queue.cursor,
+        'chore': str(auction),
+        'current_bid': auction.current_bid,
+        'current_bid_str': auction.current_bid_str,
+        'bidder': auction.bidder.id if auction.bidder else None
+    }
+
+
+def team_view(team: Team) -> dict:
+    """
+    Team as shown in the team table of the UI
+    """
+    return {'id': team.id, 'coins': team.coins, 'chores': len(team.chores), 'has_free_win': team.has_free_win}
+
+
+def diff_view(old: Optional[dict], new: Optional[dict]) -> Optional[dict]:
+    """
+    Fields of :param new which differ from :param old, or all of :param new if either is None
+    """
+    if old is None or new is None:
+        return new
+    return {k: v for k, v in new.items() if old[k] != v}
+
+
+class Scoreboard:
+    """
+    The current auction and team table of an AuctionEngine as last published to viewers, see AuctionServer.
+    Viewers join with a snapshot, after which only the fields which changed are sent, e.g., the current bid and
+    bidder of a bid, or the coins and chore count of the buying team along with the next auction of a sale.
+    """
+
+    def __init__(self, engine: AuctionEngine):
+        self.engine = engine
+        self.auction = auction_view(engine)
+        self.teams = [team_view(x) for x in engine.teams]
+
+    def snapshot(self) -> dict:
+        return {'auction': self.auction, 'teams': self.teams}
+
+    def changes(self) -> dict:
+        """
+        Fields changed since they were last published, which are published by calling this. The auction is
+        included if any of its fields changed, and teams are included by ID along with their changed fields.
+        """
+        changes = {}
+
+        auction = auction_view(self.engine)
+        if auction != self.auction:
+            changes['auction'] = diff_view(self.auction, auction)
+            self.auction = auction
+
+        teams = []
+        for team in self.engine.teams:
+            view = team_view(team)
+            old = self.teams[team.id]
+            if view != old:
+                self.teams[team.id] = view
+                teams.append({'id': team.id, **diff_view(old, view)})
+        if teams:
+            changes['teams'] = teams
+
+        return changes
+
+
+def apply_delta(state: dict, delta: dict) -> dict:
+    """
+    Apply the changes of a delta to :param state, a snapshot with the deltas before :param delta applied
+    """
+    if 'auction' in delta:
+        auction = delta['auction']
+        # an auction is sent in full when the first auction starts or the last one ends
+        if auction is None or state['auction'] is None:
+            state['auction'] = auction
+        else:
+            state['auction'].update(auction)
+
+    for team in delta.get('teams', ()):
+        state['teams'][team['id']].update(team)
+
+    return state
+
+
+def render(state: dict, rates: Rates = DEFAULT_RATES, txt: str = '') -> str:
+    """
+    Render a snapshot as the header and team table of the UI, for showing on a projector
+    :param txt: message of the last command
+    """
+    auction = state['auction']
+    if auction:
+        bidder = f"team{auction['bidder']}" if auction['bidder'] is not None else 'None'
+        lines = [f"Current auction: {auction['chore']}",
+                 f"Highest bidder: {bidder} ({auction['current_bid']} / {auction['current_bid_str']})"]
+    else:
+        lines = ['Done!', '-']
+    lines.append('')
+
+    for team in state['teams']:
+        coin_str = ','.join(str(x) for x in rates.split(team['coins']))
+        free_win = 'instant win' if team['has_free_win'] else ''
+        lines.append(f"team{team['id']:<4}{team['coins']:>7} coins ({coin_str}){team['chores']:>4} chores  {free_win}")
+
+    if txt:
+        lines += ['', txt]
+    return '\n'.join(lines)
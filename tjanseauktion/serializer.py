@@ -0,0 +1,80 @@
+import json
+import pickle
+from abc import ABC, abstractmethod
+
+
+class Serializer(ABC):
+    """
+    Encodes persisted state to bytes and back. Subclasses define the on-disk format, and
+    EXTENSION is used as file extension for logs written with the format.
+    """
+    EXTENSION = ''
+
+    @abstractmethod
+    def dumps(self, data: dict) -> bytes:
+        """
+        :return: encoding of :param data
+        """
+
+    @abstractmethod
+    def loads(self, raw: bytes) -> dict:
+        """
+        :raises ValueError: if :param raw is not a valid encoding
+        """
+
+
+class JsonSerializer(Serializer):
+    """
+    Indented JSON, meant to be read by humans
+    """
+    EXTENSION = 'json'
+
+    def dumps(self, data: dict) -> bytes:
+        return json.dumps(data, indent=4, ensure_ascii=False).encode('utf-8')
+
+    def loads(self, raw: bytes) -> dict:
+        return json.loads(raw.decode('utf-8'))
+
+
+class CompactJsonSerializer(JsonSerializer):
+    """
+    JSON without any whitespace
+    """
+
+    def dumps(self, data: dict) -> bytes:
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class BinarySerializer(Serializer):
+    """
+    Pickle protocol 4. CI runs Python 3.9, but the tjanseauktion supports Python 3.6+, which can't read
+    protocol 5 (3.8+). Protocol 5 only adds out-of-band buffers, which plain state dicts don't use.
+    Only load files written by the tjanseauktion itself - unpickling can execute arbitrary code.
+    """
+    EXTENSION = 'bin'
+    PROTOCOL = 4
+
+    def dumps(self, data: dict) -> bytes:
+        return pickle.dumps(data, protocol=self.PROTOCOL)
+
+    def loads(self, raw: bytes) -> dict:
+        try:
+            return pickle.loads(raw)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError) as e:
+            raise ValueError(f'invalid pickle data: {e}')
+
+
+SERIALIZERS = {
+    'json': JsonSerializer,
+    'compact': CompactJsonSerializer,
+    'binary': BinarySerializer
+}
+
+
+def get_serializer(name: str) -> Serializer:
+    """
+    Construct serializer by name, as set in cfg.ini
+    """
+    if name not in SERIALIZERS:
+        raise ValueError(f'unknown state format "{name}", expected one of {", ".join(SERIALIZERS)}')
+    return SERIALIZERS[name]()
@@ -0,0 +1,498 @@
+from . import constants
+from .command import Bid, Freebie, InstantWin, parse_bid_command
+from .config import Settings
+from .currency import Rates, DEFAULT_RATES
+from .engine import AuctionEngine
+from .logger import MessageLogger, StateLogger, StateError, FsyncPolicy, open_engine
+from .message import Message
+from .outcome import Outcome
+from .output import OutputWriter
+from .scoreboard import Scoreboard, apply_delta, render
+from .serializer import get_serializer
+
+import asyncio
+import functools
+import json
+import os
+import signal
+import sys
+import time
+import traceback
+from typing import Awaitable, Callable, List, NamedTuple, Optional, Set
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_VIEWER_PORT = 8766
+# commands without arguments, see AuctionEngine
+ENGINE_OPS = ('sell', 'reset', 'revert', 'undo', 'redo')
+# keys of the UI, also accepted by the operator client
+OPERATOR_KEYS = {'s': 'sell', 'r': 'reset', 'p': 'revert', 'u': 'undo', 'y': 'redo'}
+# clients whose unsent output exceeds this many bytes are disconnected, rather than buffered without bound
+MAX_CLIENT_BUFFER = 2 ** 20
+# moves the cursor home and clears the terminal
+CLEAR_SCREEN = '\x1b[H\x1b[2J'
+# longest line read by clients, e.g., a snapshot of many teams
+MAX_LINE_SIZE = 2 ** 24
+
+
+def encode(data: dict) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+class Command(NamedTuple):
+    # order the command was received in, starting from 1
+    seq: int
+    # server time the command was received at, in seconds since the epoch
+    timestamp: float
+    client: 'Client'
+    request: dict
+
+
+class Client:
+    """
+    A connected operator or viewer. Output is written without waiting for the client to read it, so a single slow client
+    can't hold up the auction.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, read_only: bool = False):
+        """
+        :param read_only: whether the client is a viewer, which can't enter commands
+        """
+        self.writer = writer
+        self.read_only = read_only
+
+    def send(self, data: bytes) -> bool:
+        """
+        :return: False if the client is disconnected, either already or because it stopped reading its output
+        """
+        if self.writer.transport.is_closing():
+            return False
+        self.writer.write(data)
+        if self.writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+            self.writer.close()
+            return False
+        return True
+
+
+class AuctionServer:
+    """
+    Lets several operators enter commands of a single AuctionEngine over TCP or a Unix socket.
+
+    The protocol is JSON Lines in both directions. Clients send commands, either a bid as typed in the
+    bid Textbox of the UI, or one of ENGINE_OPS:
+
+        {"id": 1, "op": "bid", "text": "2 1,,7"}
+        {"id": 2, "op": "sell"}
+
+    A bid which was missed may be entered late, along with how many seconds before it was received it was made,
+    e.g., {"id": 3, "op": "bid", "text": "4 ,,120 @5"}, see parse_bid_command.
+
+    Commands of all clients are put on a single queue in the order they are received, stamped with a sequence
+    number and the server time, and executed one at a time. The sender gets the result of its command:
+
+        {"type": "result", "id": 1, "seq": 17, "timestamp": 1700000000.123, "outcome": "ok", "txt": "..."}
+
+    and every successful command is broadcast to all clients as a delta, holding only the fields of the current
+    auction and of the teams which changed, see Scoreboard:
+
+        {"type": "delta", "seq": 17, "timestamp": ..., "op": "bid", "team": 2, "txt": "...",
+         "auction": {"current_bid": 330, "current_bid_str": "0,0,330", "bidder": 2}}
+        {"type": "delta", "seq": 18, "timestamp": ..., "op": "sell", "team": 2, "txt": "...",
+         "auction": {"cursor": 4, "chore": "...", "current_bid": 0, "current_bid_str": "", "bidder": null},
+         "teams": [{"id": 2, "coins": 4670, "chores": 2}]}
+
+    On connecting, a client first receives a snapshot of the current auction and all teams, such that applying
+    the deltas which follow keeps it up to date, see apply_delta.
+
+    Viewers connect to listeners started with read_only=True, e.g., to show the team table on a projector.
+    They receive the same snapshot and deltas, but their commands are rejected. Deltas are encoded once and
+    written to all clients without waiting, so a single process keeps up with hundreds of viewers.
+    """
+
+    def __init__(self, engine: AuctionEngine, rates: Rates = DEFAULT_RATES,
+                 on_message: Optional[Callable[[Message], None]] = None):
+        """
+        :param rates: currency rates bids are valued at
+        :param on_message: called with the message of every executed command, e.g., to log it
+        """
+        self.engine = engine
+        self.rates = rates
+        self.on_message = on_message
+        self.clients = set()  # type: Set[Client]
+        # sequence number of the last received command
+        self.seq = 0
+        # sequence number of the last executed command
+        self.executed_seq = 0
+        self.commands = None  # type: Optional[asyncio.Queue]
+        self.servers = []  # type: List[asyncio.AbstractServer]
+        self._runner = None  # type: Optional[asyncio.Task]
+        # state last sent to clients, which deltas are computed against
+        self.scoreboard = Scoreboard(engine)
+
+    async def start(self):
+        """
+        Start executing commands. Called by listen_tcp and listen_unix.
+        """
+        if not self._runner:
+            self.commands = asyncio.Queue()
+            self._runner = asyncio.ensure_future(self._run())
+
+    async def listen_tcp(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, read_only: bool = False) -> int:
+        """
+        :param port: 0 to pick a free port
+        :param read_only: whether clients are viewers, which can't enter commands
+        :return: port listened on
+        """
+        await self.start()
+        server = await asyncio.start_server(functools.partial(self._handle, read_only=read_only), host, port)
+        self.servers.append(server)
+        return server.sockets[0].getsockname()[1]
+
+    async def listen_unix(self, path: str, read_only: bool = False):
+        await self.start()
+        self.servers.append(await asyncio.start_unix_server(functools.partial(self._handle, read_only=read_only),
+                                                            path))
+
+    async def close(self):
+        """
+        Stop listening, disconnect all clients, and stop executing commands. Commands still queued are dropped.
+        """
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        self.servers = []
+        for client in self.clients:
+            client.writer.close()
+        self.clients.clear()
+        if self._runner:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    def snapshot(self) -> dict:
+        return {'type': 'snapshot', 'seq': self.executed_seq, **self.scoreboard.snapshot()}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, read_only: bool = False):
+        client = Client(writer, read_only)
+        self.clients.add(client)
+        client.send(encode(self.snapshot()))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.receive(client, line)
+        except (ConnectionError, ValueError):
+            # ValueError: line exceeds the limit of the reader
+            pass
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    def receive(self, client: Client, line: bytes):
+        """
+        Queue a command received from :param client
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('expected a JSON object')
+        except ValueError as e:
+            self._reject(client, None, f'invalid request ({e})')
+            return
+
+        if client.read_only:
+            self._reject(client, request.get('id'), 'viewers can\'t enter commands')
+            return
+
+        self.seq += 1
+        self.commands.put_nowait(Command(self.seq, time.time(), client, request))
+
+    @staticmethod
+    def _reject(client: Client, request_id, txt: str):
+        """
+        Reply to a request which is not queued, or failed to execute
+        """
+        client.send(encode({'type': 'result', 'id': request_id, 'seq': None, 'timestamp': time.time(),
+                            'outcome': Outcome.INVALID_COMMAND.value, 'txt': f'Error: {txt}'}))
+
+    async def _run(self):
+        while True:
+            command = await self.commands.get()
+            try:
+                self.process(command)
+            except Exception as e:
+                # an unexpected error must not stop the commands queued after it
+                traceback.print_exc()
+                self._reject(command.client, command.request.get('id'), f'command failed ({e!r})')
+
+    def process(self, command: Command):
+        """
+        Execute a command, send its result to its client, and broadcast the change of state to all clients
+        """
+        msg = self.execute(command.request, command.timestamp)
+        self.executed_seq = command.seq
+        if self.on_message:
+            self.on_message(msg)
+
+        command.client.send(encode({'type': 'result', 'id': command.request.get('id'), 'seq': command.seq,
+                                    'timestamp': command.timestamp, 'outcome': msg.outcome.value, 'txt': msg.txt}))
+        if msg.outcome.is_success:
+            self.broadcast(self.delta(command, msg))
+
+    def execute(self, request: dict, timestamp: float) -> Message:
+        """
+        :param timestamp: time the request was received
+        """
+        op = request.get('op')
+
+        if op == 'bid':
+            text = request.get('text')
+            if not isinstance(text, str):
+                return self._invalid('bid requires "text", e.g., "2 1,,7"')
+            command = parse_bid_command(text)
+            if isinstance(command, Bid):
+                # bids entered late are inserted among the bids made after them, see Auction.try_bid
+                return self.engine.bid(command.team, command.value(self.rates), command.bid_str,
+                                       command.timestamp(timestamp))
+            if isinstance(command, InstantWin):
+                return self.engine.instant_win(command.team)
+            if isinstance(command, Freebie):
+                return self.engine.freebie(command.team)
+            return self._invalid(f'input not valid ({text.strip()}), {command}')
+
+        if op in ENGINE_OPS:
+            return getattr(self.engine, op)()
+
+        return self._invalid(f'unknown op {op!r}')
+
+    @staticmethod
+    def _invalid(txt: str) -> Message:
+        return Message(f'Error: {txt}', colour=constants.COLOUR_ERR_MSG, outcome=Outcome.INVALID_COMMAND)
+
+    def delta(self, command: Command, msg: Message) -> dict:
+        """
+        Changes of state since the last delta, caused by :param command
+        """
+        return {'type': 'delta', 'seq': command.seq, 'timestamp': command.timestamp, 'op': msg.action,
+                'team': msg.team, 'txt': msg.txt, **self.scoreboard.changes()}
+
+    def broadcast(self, data: dict):
+        """
+        Send :param data to all clients, encoding it once
+        """
+        raw = encode(data)
+        for client in list(self.clients):
+            if not client.send(raw):
+                self.clients.discard(client)
+
+
+class AuctionClient:
+    """
+    Client of an AuctionServer, used by the operator client and in tests
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.last_id = 0
+        # messages other than results received while waiting for a result, see AuctionClient.request
+        self.events = []  # type: List[dict]
+
+    @classmethod
+    async def connect(cls, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, path: Optional[str] = None):
+        """
+        :param path: Unix socket to connect to instead of :param host and :param port
+        """
+        if path:
+            reader, writer = await asyncio.open_unix_connection(path, limit=MAX_LINE_SIZE)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE_SIZE)
+        return cls(reader, writer)
+
+    async def send(self, op: str, text: Optional[str] = None) -> int:
+        """
+        :return: ID of the request, which its result refers to
+        """
+        self.last_id += 1
+        request = {'id': self.last_id, 'op': op}
+        if text is not None:
+            request['text'] = text
+        self.writer.write(encode(request))
+        await self.writer.drain()
+        return self.last_id
+
+    async def receive(self) -> Optional[dict]:
+        """
+        :return: next message from the server, None once disconnected
+        """
+        line = await self.reader.readline()
+        return json.loads(line) if line else None
+
+    async def request(self, op: str, text: Optional[str] = None) -> dict:
+        """
+        Send a command and wait for its result
+        """
+        request_id = await self.send(op, text)
+        while True:
+            data = await self.receive()
+            if data is None:
+                raise ConnectionError('disconnected by the server')
+            if data['type'] == 'result' and data['id'] == request_id:
+                return data
+            self.events.append(data)
+
+    def close(self):
+        self.writer.close()
+
+
+def main(settings: Settings, seed: Optional[int], host: str, port: int, path: Optional[str],
+         viewer_port: int = DEFAULT_VIEWER_PORT, viewer_path: Optional[str] = None) -> int:
+    """
+    Serve the auction until interrupted
+    :param path: Unix socket to listen on for operators instead of :param host and :param port
+    :param viewer_port: port to listen on for viewers, 0 to not accept viewers on TCP
+    :param viewer_path: Unix socket to listen on for viewers
+    """
+    if not os.path.isdir('logs'):
+        os.mkdir('logs')
+
+    msg_logger = MessageLogger()
+    state_logger = StateLogger(journal=settings.journal, snapshot_interval=settings.snapshot_interval,
+                               fsync_policy=FsyncPolicy.from_str(settings.fsync),
+                               serializer=get_serializer(settings.format))
+    try:
+        engine = open_engine(settings, seed, state_logger, msg_logger)
+    except StateError as e:
+        msg_logger.close()
+        print(f'Error: {e}', file=sys.stderr)
+        return 1
+
+    def on_message(msg: Message):
+        msg_logger.log_msg(msg)
+        if msg.outcome.is_success and engine.is_done():
+            OutputWriter.write_to_pdf(engine.teams, engine.stats)
+            print('All chores have been sold. MD saved to run dir.')
+
+    server = AuctionServer(engine, settings.rates, on_message)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        # stop gracefully when terminated, flushing the logs
+        loop.add_signal_handler(signal.SIGTERM, loop.stop)
+    except (NotImplementedError, AttributeError):
+        # not supported on Windows
+        pass
+    try:
+        if path:
+            loop.run_until_complete(server.listen_unix(path))
+            print(f'Listening for operators on {path}')
+        else:
+            port = loop.run_until_complete(server.listen_tcp(host, port))
+            print(f'Listening for operators on {host}:{port}')
+        if viewer_path:
+            loop.run_until_complete(server.listen_unix(viewer_path, read_only=True))
+            print(f'Listening for viewers on {viewer_path}')
+        if viewer_port:
+            viewer_port = loop.run_until_complete(server.listen_tcp(host, viewer_port, read_only=True))
+            print(f'Listening for viewers on {host}:{viewer_port}')
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(server.close())
+        loop.close()
+        # the state log comes first, as it is needed to resume the auction
+        state_logger.close()
+        msg_logger.close()
+    return 0
+
+
+async def operate(client: AuctionClient):
+    """
+    Send lines of stdin as commands: a bid as typed in the UI, or a key of the UI, e.g., "s" to sell.
+    Errors of own commands and the changes of all operators are printed.
+    """
+    loop = asyncio.get_event_loop()
+
+    async def print_messages():
+        while True:
+            data = await client.receive()
+            if data is None:
+                print('Disconnected by the server')
+                return
+            if data['type'] == 'result':
+                if data['outcome'] not in ('ok', 'override'):
+                    print(data['txt'])
+                continue
+
+            if data['type'] == 'delta':
+                print(data['txt'])
+            auction = data.get('auction', {})
+            if auction is None:
+                print('Done!')
+            elif 'chore' in auction:
+                print(f"Current auction: {auction['chore']}")
+
+    printer = asyncio.ensure_future(print_messages())
+    try:
+        while not printer.done():
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
+            line = line.strip()
+            if line:
+                op = OPERATOR_KEYS.get(line)
+                await client.send(op or 'bid', None if op else line)
+    finally:
+        printer.cancel()
+        await asyncio.gather(printer, return_exceptions=True)
+        client.close()
+
+
+async def view(client: AuctionClient, rates: Rates = DEFAULT_RATES):
+    """
+    Redraw the current auction and team table on every change
+    """
+    state, txt = None, ''
+    try:
+        while True:
+            data = await client.receive()
+            if data is None:
+                print('Disconnected by the server')
+                return
+            if data['type'] == 'snapshot':
+                state = data
+            elif data['type'] == 'delta':
+                apply_delta(state, data)
+                txt = data['txt']
+            else:
+                continue
+            sys.stdout.write(CLEAR_SCREEN + render(state, rates, txt) + '\n')
+            sys.stdout.flush()
+    finally:
+        client.close()
+
+
+def client_main(host: str, port: int, path: Optional[str], run: Callable[[AuctionClient], Awaitable]) -> int:
+    """
+    Connect to a server and :param run the client until interrupted or disconnected
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        client = loop.run_until_complete(AuctionClient.connect(host, port, path))
+    except OSError as e:
+        print(f'Error: could not connect ({e})', file=sys.stderr)
+        loop.close()
+        return 1
+    try:
+        loop.run_until_complete(run(client))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.close()
+    return 0
@@ -0,0 +1,399 @@
+from . import constants
+from .auction import Auction
+from .chore import Chore
+from .team import Team
+
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class LotContext(NamedTuple):
+    """
+    What a bot knows when deciding how much to bid on the current auction
+    """
+    team: Team
+    # value of the chore to the team in coins; secret auctions are valued at the fair price
+    value: int
+    # chores the team still needs, and auctions not yet completed, including the current one
+    n_needed: int
+    n_left: int
+
+
+class Bot(ABC):
+    """
+    Bidding strategy of a simulated team. Bots bid the lowest accepted bid whenever they are outbid,
+    until the bid would exceed their limit.
+    """
+    NAME = ''
+    # late bots only bid once no other team will, see run_bidding
+    IS_LATE = False
+
+    @abstractmethod
+    def limit(self, ctx: LotContext) -> int:
+        """
+        :return: highest bid the bot will place on the current auction, 0 to not bid at all
+        """
+
+    def wants_instant_win(self, ctx: LotContext, price: int) -> bool:
+        """
+        Decide whether to use the instant win once bidding has stopped at :param price with another team in the lead
+        """
+        return False
+
+
+class GreedyBot(Bot):
+    """
+    Bids up to the value of the chore, regardless of how many chores it still needs to buy
+    """
+    NAME = 'greedy'
+
+    def limit(self, ctx: LotContext) -> int:
+        return min(ctx.value, ctx.team.coins)
+
+
+class PacingBot(Bot):
+    """
+    Spreads its coins over the chores it still needs, bidding at most SLACK times its budget per chore
+    """
+    NAME = 'pacing'
+    SLACK = 1.5
+
+    def limit(self, ctx: LotContext) -> int:
+        return min(ctx.value, int(ctx.team.coins / ctx.n_needed * self.SLACK), ctx.team.coins)
+
+
+class SniperBot(PacingBot):
+    """
+    Paces its coins like PacingBot, but stays out of the bidding until it is about to stop, then jumps
+    straight to its limit
+    """
+    NAME = 'sniper'
+    IS_LATE = True
+
+
+class InstantWinBot(PacingBot):
+    """
+    Paces its coins like PacingBot, and saves its instant win for the worst case: the first chore it is
+    priced out of, i.e., a chore it values above the winning bid but can't afford within its budget
+    """
+    NAME = 'instant-win'
+
+    def wants_instant_win(self, ctx: LotContext, price: int) -> bool:
+        return price >= self.limit(ctx) and ctx.value > price
+
+
+STRATEGIES = {
+    'greedy': GreedyBot,
+    'pacing': PacingBot,
+    'sniper': SniperBot,
+    'instant-win': InstantWinBot
+}
+
+
+def get_strategy(name: str) -> Bot:
+    """
+    Construct bot by strategy name
+    """
+    if name not in STRATEGIES:
+        raise ValueError(f'unknown strategy "{name}", expected one of {", ".join(STRATEGIES)}')
+    return STRATEGIES[name]()
+
+
+class SimulationParams(NamedTuple):
+    """
+    Settings of the simulated auctions, i.e., the settings being tuned
+    """
+    n_teams: int
+    n_secrets: int
+    overbid_factor: float
+    start_coins: int = constants.START_COINS
+    # strategies assigned to teams in turn, e.g., team0 greedy, team1 pacing, ..., team4 greedy
+    strategies: Tuple[str, ...] = tuple(STRATEGIES)
+    # days whose chores are auctioned first, see Auction.create_auctions
+    day_order: Tuple[str, ...] = constants.DAY_ORDER
+
+
+class StrategyTotals:
+    """
+    Outcome of all teams playing a single strategy, summed over simulated auctions
+    """
+
+    def __init__(self):
+        self.n_teams = 0
+        # sum of chore values won, relative to the value of getting the fair price for every chore
+        self.utility = 0.
+        self.coins_left = 0
+        self.unused_instant_wins = 0
+
+    def merge(self, other: 'StrategyTotals'):
+        self.n_teams += other.n_teams
+        self.utility += other.utility
+        self.coins_left += other.coins_left
+        self.unused_instant_wins += other.unused_instant_wins
+
+
+class SimulationSummary:
+    """
+    Aggregated outcome of simulated auctions. Only counters and sums are kept, such that summaries of
+    batches simulated in separate processes are cheap to send back and merge.
+    """
+
+    def __init__(self):
+        self.n_runs = 0
+        self.n_auctions = 0
+        # price -> amount of chores bought at that price, excluding instant wins and freebies
+        self.prices = Counter()  # type: Counter
+        self.n_instant_wins = 0
+        self.n_freebies = 0
+        # auctions no team could bid on while several teams still needed chores
+        self.n_unsold = 0
+        # sum over runs of the Gini coefficient of team utility, 0 being a perfectly fair auction
+        self.gini_sum = 0.
+        self.strategies = {}  # type: Dict[str, StrategyTotals]
+
+    def merge(self, other: 'SimulationSummary'):
+        self.n_runs += other.n_runs
+        self.n_auctions += other.n_auctions
+        self.prices.update(other.prices)
+        self.n_instant_wins += other.n_instant_wins
+        self.n_freebies += other.n_freebies
+        self.n_unsold += other.n_unsold
+        self.gini_sum += other.gini_sum
+        for name, totals in other.strategies.items():
+            self.strategies.setdefault(name, StrategyTotals()).merge(totals)
+
+    @property
+    def n_bought(self) -> int:
+        return sum(self.prices.values())
+
+    @property
+    def mean_price(self) -> float:
+        return sum(p * n for p, n in self.prices.items()) / self.n_bought if self.prices else 0.
+
+    @property
+    def mean_gini(self) -> float:
+        return self.gini_sum / self.n_runs if self.n_runs else 0.
+
+    def price_percentile(self, percent: float) -> int:
+        """
+        Lowest price at or below which :param percent of the chores were bought
+        """
+        if not self.prices:
+            return 0
+
+        target = self.n_bought * percent / 100
+        seen = 0
+        for price in sorted(self.prices):
+            seen += self.prices[price]
+            if seen >= target:
+                return price
+        return max(self.prices)
+
+    def report(self) -> str:
+        lines = [
+            f'Auctions: {self.n_runs} ({self.n_auctions} chores, {self.n_bought} bought, '
+            f'{self.n_instant_wins} instant wins, {self.n_freebies} freebies, {self.n_unsold} unsold)',
+            f'Price: mean {self.mean_price:.0f}, ' + ', '.join(f'p{p} {self.price_percentile(p)}' for p in [10, 50, 90])
+            + f', max {max(self.prices) if self.prices else 0}',
+            f'Fairness: mean Gini coefficient of team utility {self.mean_gini:.3f}',
+            '',
+            f'{"strategy":<12}{"utility":>10}{"coins left":>12}{"unused instant wins":>21}'
+        ]
+        for name, totals in self.strategies.items():
+            n = totals.n_teams
+            lines.append(f'{name:<12}{totals.utility / n:>10.2f}{totals.coins_left / n:>12.0f}'
+                         f'{totals.unused_instant_wins / n:>20.0%}')
+
+        return '\n'.join(lines)
+
+
+def gini(values: List[float]) -> float:
+    """
+    Gini coefficient of :param values: 0 if all values are equal, approaching 1 as one value dominates
+    """
+    total = sum(values)
+    if not total:
+        return 0.
+
+    n = len(values)
+    weighted = sum((i + 1) * x for i, x in enumerate(sorted(values)))
+    return 2 * weighted / (n * total) - (n + 1) / n
+
+
+def run_bidding(auction: Auction, teams: List[Team], bots: List[Bot], limits: List[int], order: List[int],
+                overbid_factor: float) -> Optional[int]:
+    """
+    Let bots outbid each other on :param auction until no team places a bid. Teams are asked in :param order,
+    and late bots are only asked once every other bot has stopped. Only the winning bid is placed on the
+    auction, as the lowest accepted bid only depends on the current bid.
+    :return: ID of the highest bidder, None if no bids were placed
+    """
+    early = [i for i in order if limits[i] and not bots[i].IS_LATE]
+    late = [i for i in order if limits[i] and bots[i].IS_LATE]
+    price, leader = 0, None
+    while True:
+        bid = Auction.min_bid(price, overbid_factor)
+        early = [i for i in early if limits[i] >= bid]
+        if len(early) > 1:
+            # the first two early bots outbid each other until one of them drops out
+            a, b = early[0], early[1]
+            bidder = b if leader == a else a
+            cap = min(limits[a], limits[b])
+            while bid <= cap:
+                price, leader = bid, bidder
+                bidder = a if bidder == b else b
+                bid = Auction.min_bid(price, overbid_factor)
+            continue
+
+        bidder = early[0] if early and early[0] != leader else None
+        if bidder is None:
+            bidder = next((i for i in late if i != leader and limits[i] >= bid), None)
+            if bidder is None:
+                break
+            bid = limits[bidder]
+        price, leader = bid, bidder
+
+    if leader is not None:
+        auction.try_bid(price, teams[leader], str(price), overbid_factor)
+    return leader
+
+
+def simulate_auction(chores: List[Chore], params: SimulationParams, rng: random.Random,
+                     summary: Optional[SimulationSummary] = None) -> SimulationSummary:
+    """
+    Simulate a full tjanseauktion with bots bidding on every auction, and add its outcome to :param summary.
+
+    The value of a chore to a team is its fair price (start coins / chores per team) scaled by a factor shared
+    by all teams, i.e., how popular the chore is, and by a factor private to the team. Secret auctions are
+    valued at the fair price, while the free chores hidden among them are worth twice the fair price.
+    """
+    summary = summary or SimulationSummary()
+    teams = [Team(i, params.start_coins) for i in range(params.n_teams)]
+    names = [params.strategies[i % len(params.strategies)] for i in range(params.n_teams)]
+    bots = [get_strategy(x) for x in names]
+
+    auctions = Auction.create_auctions(chores, params.n_secrets, params.n_teams, rng, params.day_order)
+    n_chores_per_team = math.ceil(len(chores) / params.n_teams)
+    fair_price = params.start_coins / n_chores_per_team
+    popularity = [rng.uniform(.5, 1.5) for _ in auctions]
+    values = [
+        [2 * fair_price if a.chore.desc == constants.FREE_CHORE_DESC else fair_price * p * rng.uniform(.75, 1.25)
+         for a, p in zip(auctions, popularity)]
+        for _ in teams
+    ]
+    utility = [0.] * len(teams)
+
+    for i, auction in enumerate(auctions):
+        ctxs = [LotContext(t, int(fair_price if auction.is_secret else values[t.id][i]),
+                           n_chores_per_team - len(t.chores), len(auctions) - i) for t in teams]
+        limits = [bot.limit(ctx) if ctx.n_needed > 0 else 0 for bot, ctx in zip(bots, ctxs)]
+        order = list(range(len(teams)))
+        rng.shuffle(order)
+
+        leader = run_bidding(auction, teams, bots, limits, order, params.overbid_factor)
+        instant_winner = next((x for x in order if x != leader and teams[x].has_free_win and ctxs[x].n_needed > 0
+                               and bots[x].wants_instant_win(ctxs[x], auction.current_bid)), None)
+
+        if instant_winner is not None:
+            auction.reset_bids()
+            auction.instant_win(teams[instant_winner])
+            summary.n_instant_wins += 1
+        elif leader is not None:
+            summary.prices[auction.current_bid] += 1
+            auction.complete_auction()
+        else:
+            # nobody could bid, so the chore goes to the team needing chores the most, which is a regular
+            # freebie if at most a single team still needs chores
+            needing = [x for x in teams if len(x.chores) < n_chores_per_team]
+            auction.freebie(min(needing or teams, key=lambda x: len(x.chores)))
+            if len(needing) > 1:
+                summary.n_unsold += 1
+            else:
+                summary.n_freebies += 1
+        utility[auction.bidder.id] += values[auction.bidder.id][i] / (fair_price * n_chores_per_team)
+
+    summary.n_runs += 1
+    summary.n_auctions += len(auctions)
+    summary.gini_sum += gini(utility)
+    for team, name in zip(teams, names):
+        totals = summary.strategies.setdefault(name, StrategyTotals())
+        totals.n_teams += 1
+        totals.utility += utility[team.id]
+        totals.coins_left += team.coins
+        totals.unused_instant_wins += team.has_free_win
+
+    return summary
+
+
+def simulate_batch(chores: List[Chore], params: SimulationParams, seeds: Iterable[int]) -> SimulationSummary:
+    """
+    Simulate an auction per seed in :param seeds, run in a worker process by simulate
+    """
+    summary = SimulationSummary()
+    for seed in seeds:
+        simulate_auction(chores, params, random.Random(seed), summary)
+    return summary
+
+
+def simulate(chores: List[Chore], params: SimulationParams, n_runs: int, seed: int = 0,
+             workers: Optional[int] = None) -> SimulationSummary:
+    """
+    Simulate :param n_runs auctions in parallel. Auction i is seeded with :param seed + i, so the outcome
+    doesn't depend on the amount of workers.
+    :param workers: amount of processes, defaults to the amount of CPUs. With 1 worker, auctions are
+                    simulated in this process
+    """
+    workers = workers or os.cpu_count() or 1
+    seeds = range(seed, seed + n_runs)
+    if workers == 1 or n_runs < 2:
+        return simulate_batch(chores, params, seeds)
+
+    # several batches per worker, such that a slow batch doesn't leave the other workers idle
+    n_batches = min(n_runs, workers * 4)
+    summary = SimulationSummary()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        batches = [seeds[i::n_batches] for i in range(n_batches)]
+        for batch in pool.map(simulate_batch, itertools.repeat(chores), itertools.repeat(params), batches):
+            summary.merge(batch)
+
+    return summary
+
+
+def main(chores: List[Chore], grid: List[SimulationParams], n_runs: int, seed: int, workers: Optional[int],
+         vectorised: bool = False) -> int:
+    """
+    Simulate :param n_runs auctions for each combination of settings in :param grid and print their summaries
+    :param vectorised: simulate all auctions at once with numpy, see tjanseauktion.vectorised
+    :return: exit code
+    """
+    if vectorised:
+        try:
+            from . import vectorised as engine
+        except ImportError:
+            print('Error: --numpy requires numpy, install it with pip install -r requirements-numpy.txt',
+                  file=sys.stderr)
+            return 2
+
+    for params in grid:
+        start = time.perf_counter()
+        if vectorised:
+            summary = engine.simulate(chores, params, n_runs, seed)
+        else:
+            summary = simulate(chores, params, n_runs, seed, workers)
+        seconds = time.perf_counter() - start
+
+        print(f'start coins: {params.start_coins}, min overbid: {params.overbid_factor:.0%}, '
+              f'secrets: {params.n_secrets}, teams: {params.n_teams} '
+              f'({seconds:.1f} s, {n_runs / seconds:.0f} auctions/s)')
+        print(summary.report())
+        print()
+
+    return 0
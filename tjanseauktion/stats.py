@@ -0,0 +1,90 @@
+from . import constants
+from .auction import Auction
+from .auction_queue import AuctionQueue
+from .team import Team
+
+from typing import List
+
+
+class AuctionStats:
+    """
+    Statistics of the tjanseauktion, kept up to date as auctions are completed and reverted such that
+    reading them never requires a scan over auctions or teams. Only the AuctionEngine updates them.
+    """
+
+    def __init__(self, n_chores_per_team: int):
+        self.n_chores_per_team = n_chores_per_team
+        # auctions not yet completed, including the current auction
+        self.secrets_left = 0
+        self.free_chores_left = 0
+        # teams with at least n_chores_per_team chores
+        self.teams_satisfied = 0
+        self.coins_in_circulation = 0
+        # coins paid for chores, and amount of chores paid for, i.e., excluding instant wins and freebies
+        self.coins_spent = 0
+        self.n_bought = 0
+
+    @classmethod
+    def from_state(cls, teams: List[Team], queue: AuctionQueue, n_chores_per_team: int):
+        """
+        Compute statistics from scratch, done once when the engine is constructed
+        """
+        stats = cls(n_chores_per_team)
+        for i, auction in enumerate(queue):
+            if i >= queue.cursor:
+                stats.secrets_left += auction.is_secret
+                stats.free_chores_left += auction.chore.desc == constants.FREE_CHORE_DESC
+            elif auction.current_bid > 0:
+                stats.coins_spent += auction.current_bid
+                stats.n_bought += 1
+
+        stats.teams_satisfied = sum(1 for x in teams if len(x.chores) >= n_chores_per_team)
+        stats.coins_in_circulation = sum(x.coins for x in teams)
+
+        return stats
+
+    def memento(self) -> tuple:
+        return (self.secrets_left, self.free_chores_left, self.teams_satisfied, self.coins_in_circulation,
+                self.coins_spent, self.n_bought)
+
+    def restore(self, memento: tuple):
+        (self.secrets_left, self.free_chores_left, self.teams_satisfied, self.coins_in_circulation,
+         self.coins_spent, self.n_bought) = memento
+
+    @property
+    def average_price(self) -> float:
+        """
+        Average amount of coins paid per chore bought
+        """
+        return self.coins_spent / self.n_bought if self.n_bought else 0.
+
+    def auction_completed(self, auction: Auction):
+        """
+        Update after :param auction has been completed, i.e., its chore was added to the bidder
+        """
+        self._count_remaining(auction, -1)
+        if auction.current_bid > 0:
+            self.coins_in_circulation -= auction.current_bid
+            self.coins_spent += auction.current_bid
+            self.n_bought += 1
+        if len(auction.bidder.chores) == self.n_chores_per_team:
+            self.teams_satisfied += 1
+
+    def auction_reverted(self, auction: Auction):
+        """
+        Update after :param auction has been reverted, i.e., its chore was removed from the bidder,
+        but before its bids are reset
+        """
+        self._count_remaining(auction, 1)
+        if auction.current_bid > 0:
+            self.coins_in_circulation += auction.current_bid
+            self.coins_spent -= auction.current_bid
+            self.n_bought -= 1
+        if len(auction.bidder.chores) == self.n_chores_per_team - 1:
+            self.teams_satisfied -= 1
+
+    def _count_remaining(self, auction: Auction, delta: int):
+        if auction.is_secret:
+            self.secrets_left += delta
+        if auction.chore.desc == constants.FREE_CHORE_DESC:
+            self.free_chores_left += delta
@@ -1,25 +1,23 @@
 from . import constants
 from . import common
 from .chore import Chore
+from .currency import Rates, DEFAULT_RATES
 
-import math
-from typing import List
+from typing import List, Dict, Optional
 
 
 class Team:
-    COIN_STR_LEN = 0
+    __slots__ = ('coins', 'chores', 'id', 'has_free_win')
 
-    def __init__(self, _id: int):
-        self.coins = constants.START_COINS
+    def __init__(self, _id: int, coins: int = constants.START_COINS):
+        """
+        :param coins: coins the team starts with, as defined by ./cfg.ini
+        """
+        self.coins = coins
         self.chores = []  # type: List[Chore]
         self.id = _id
         self.has_free_win = True
 
-        # to ensure pretty UI format, we set and use the initial length of the coin strings
-        # and use it as offset for the team table rows
-        if not self.COIN_STR_LEN:
-            self.COIN_STR_LEN = len(self.coin_string())
-
     def __str__(self):
         return f'team{self.id}'
 
@@ -31,28 +29,29 @@ class Team:
             return False
         return self.id == other.id
 
-    def coin_string(self) -> str:
+    def coin_string(self, rates: Rates = DEFAULT_RATES) -> str:
         """
         Generate coin string on the format "high.mid.low"
         """
-        high = math.floor(self.coins / constants.HIGH_VALUE)
-        mid = math.floor(self.coins % constants.HIGH_VALUE / constants.MID_VALUE)
-        low = self.coins % constants.HIGH_VALUE % constants.MID_VALUE
+        high, mid, low = rates.split(self.coins)
         insta_win = '★' if self.has_free_win else '☠'
 
         return f'{high}.{mid}.{low} | {self.coins} | {insta_win}'
 
-    def ui_row_string(self) -> str:
+    def ui_row_string(self, rates: Rates = DEFAULT_RATES, coin_str_len: int = 0) -> str:
         """
         Construct string for a table row in the UI
+        :param coin_str_len: length the coin strings are right aligned to, to ensure pretty UI format. The UI uses
+                             the length of the coin string of the start coins
         """
         chore_str = f'Chores: {len(self.chores)}'
         id_str = f'ID: {self.id}'
         name_str = f'team{self.id}'
-        coin_str = self.coin_string()
+        coin_str = self.coin_string(rates)
+        offset = max(coin_str_len - len(coin_str), 0)
 
         return f'{common.string_with_spacing(chore_str)}{common.string_with_spacing(id_str)}' \
-               f'{common.string_with_spacing(name_str, offset=self.COIN_STR_LEN - len(coin_str))}{coin_str}'
+               f'{common.string_with_spacing(name_str, offset=offset)}{coin_str}'
 
     def can_afford(self, price: int) -> bool:
         """
@@ -83,19 +82,38 @@ class Team:
         """
         self.chores.append(chore)
 
-    def to_json(self):
+    def memento(self) -> tuple:
+        """
+        State changed by auctions, see History
+        """
+        return self.coins, self.has_free_win, tuple(self.chores)
+
+    def restore(self, memento: tuple):
+        self.coins, self.has_free_win, chores = memento
+        self.chores = list(chores)
+
+    def to_json(self, chore_index: Optional[Dict[int, int]] = None):
+        """
+        :param chore_index: maps id() of each chore to its index in the persisted state. If given,
+                            chores are stored as indexes instead of copies
+        """
         return {
             'coins': self.coins,
-            'chores': [x.to_json() for x in self.chores],
+            'chores': [chore_index[id(x)] for x in self.chores] if chore_index is not None
+            else [x.to_json() for x in self.chores],
             'id': self.id,
             'has_free_win': self.has_free_win
         }
 
     @classmethod
-    def from_json(cls, row: dict):
+    def from_json(cls, row: dict, chores: Optional[List[Chore]] = None):
+        """
+        :param chores: chores of the persisted state, used to resolve chore indexes to shared objects
+        """
         t = Team(row['id'])
         t.coins = row['coins']
-        t.chores = [Chore.from_json(r) for r in row['chores']]
+        t.chores = [chores[r] for r in row['chores']] if chores is not None \
+            else [Chore.from_json(r) for r in row['chores']]
         t.has_free_win = row['has_free_win']
 
         return t
\ No newline at end of file
@@ -1,24 +1,99 @@
 from . import constants
 from . import common
-from .config import Config
-from .team import Team
-from .auction import Auction
-from .chore import Chore
+from .config import Config, Settings
+from .command import Bid, Convert, Freebie, InstantWin, parse_bid_command, parse_convert_command
 from .fextbox import Fextbox
-from .validation import InputValidation
+from .layout import Box, Layout
 from .message import Message
-from .logger import MessageLogger, StateLogger
+from .logger import MessageLogger, StateLogger, StateError, FsyncPolicy, open_engine
 from .output import OutputWriter
+from .serializer import get_serializer
+from .team import Team
 
 import curses
-import math
 import os
+import sys
+import time
 from curses.textpad import rectangle
-from typing import Optional, List
+from typing import Optional, List, Dict, Set
+
+
+class Damage:
+    """
+    Regions of the UI that changed since they were last drawn. Regions are only repainted when damaged,
+    and team rows are tracked individually, as most actions only change a single team.
+    """
+    HEADER = 'header'
+    TEAMS = 'teams'
+    STATS = 'stats'
+    MSG = 'msg'
+    LOG = 'log'
+    INPUT = 'input'
+    ALL = (HEADER, TEAMS, STATS, MSG, LOG, INPUT)
+
+    def __init__(self):
+        self.regions = set()  # type: Set[str]
+        self.teams = set()  # type: Set[int]
+
+    def __contains__(self, region: str) -> bool:
+        return region in self.regions
+
+    def add(self, *regions: str):
+        self.regions.update(regions)
+
+    def add_team(self, team_id: int):
+        self.regions.add(self.TEAMS)
+        self.teams.add(team_id)
+
+    def add_action(self, record: dict):
+        """
+        Damage the regions changed by an engine command, see AuctionEngine
+        """
+        self.add(self.HEADER)
+        # bids only change the current auction; teams pay once the auction is completed
+        if record['op'] in ('win', 'free', 'sell', 'revert'):
+            self.add(self.STATS)
+            self.add_team(record['team'])
+        # team of the undone or redone action, if any
+        elif record['op'] in ('undo', 'redo'):
+            self.add(self.STATS)
+            if record['team'] is not None:
+                self.add_team(record['team'])
+
+    def clear(self):
+        self.regions.clear()
+        self.teams.clear()
+
+
+class FrameStats:
+    """
+    Counts drawn frames and allocated curses windows. Windows are allocated once at startup and
+    reused afterwards, so any allocations in later frames are a regression.
+    """
+
+    def __init__(self):
+        self.frames = 0
+        self.window_allocs = 0
+        self.frame_window_allocs = 0
+        # allocations of frames after the first
+        self.late_window_allocs = 0
+
+    def __str__(self):
+        return f'{self.frames} frames drawn, {self.window_allocs} windows allocated ' \
+               f'({self.late_window_allocs} after first frame)'
+
+    def window_allocated(self):
+        self.window_allocs += 1
+        self.frame_window_allocs += 1
+
+    def frame_drawn(self):
+        if self.frames:
+            self.late_window_allocs += self.frame_window_allocs
+        self.frames += 1
+        self.frame_window_allocs = 0
 
 
 class UI:
-    WINDOW_TOP_MARGIN = 1
     TITLE = "Tjanseauktion"
     HR = "-" * 40
     HEADER_ELEMS = [
@@ -33,66 +108,69 @@ class UI:
         {'cmd': 'b', 'help': "Edit bid text box"},
         {'help': "<ENTER> to try and place bid"},
         {'help': "<ESC> to cancel"},
-        {'help': f"Bid syntax: {InputValidation.BID_PATTERN}"},
-        {'help': f"Instant win syntax: {InputValidation.BID_INSTANT_WIN_PATTERN}"},
-        {'help': f"Freebie syntax: {InputValidation.BID_FREEBIE_PATTERN}"},
+        {'help': "Bid syntax: team high,mid,low, e.g., 2 3,,10"},
+        {'help': "Instant win syntax: team win, e.g., 4 win"},
+        {'help': "Freebie syntax: team free, e.g., 7 free"},
+        {'help': "Late bid: bid @seconds ago, e.g., 2 ,,120 @5"},
         {'cmd': 'c', 'help': "Edit conversion text box"},
         {'help': "<ENTER> to try and convert"},
         {'help': "<ESC> to cancel"},
-        {'help': f"Syntax: {InputValidation.CONVERT_PATTERN}"},
+        {'help': "Syntax: high,mid,low, e.g., 4,20,"},
         {'cmd': 's', 'help': "Sell chore to highest bidder"},
         {'cmd': 'r', 'help': "Reset bids for current auction"},
-        {'cmd': 'p', 'help': "Revert last auction"}
+        {'cmd': 'p', 'help': "Revert last auction"},
+        {'cmd': 'u', 'help': "Undo last action"},
+        {'cmd': 'y', 'help': "Redo last undone action"}
     ]
+    STAT_MENU_ROWS = 9
 
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, settings: Optional[Settings] = None, profile: bool = False):
+        """
+        :param seed: seed of a new auction, overriding the seed in cfg.ini. Ignored when resuming an auction
+        :param settings: settings of cfg.ini, read from ./cfg.ini if not given
+        :param profile: print the FrameStats to stderr on close
+        """
         if not os.path.isdir('logs'):
             os.mkdir('logs')
 
-        self.cfg = Config()
+        self.settings = settings or Config().settings()
+        self.rates = self.settings.rates
+        # coin strings are right aligned to the length of the coin string of the start coins
+        self.coin_str_len = len(Team(0, self.settings.start_coins).coin_string(self.rates))
         self.msg_logger = MessageLogger()
-        self.state_logger = StateLogger()
-
-        if self.state_logger.is_state_log_present():
-            self.chores = Chore.load_chores()
-            self.teams, self.auctions, self.completed_auctions, self.cur_auction = self.state_logger.load_state()
-        else:
-            self.teams = [Team(i) for i in range(self.cfg.auction_n_teams())]
-            self.chores = Chore.load_chores()
-            self.auctions = Auction.create_auctions(self.chores, self.cfg.auction_n_secrets(), len(self.teams))
-            self.completed_auctions = []  # type: List[Auction]
-            self.cur_auction = self.auctions[0]  # type: Auction
-            del self.auctions[0]
+        self.state_logger = StateLogger(journal=self.settings.journal,
+                                        snapshot_interval=self.settings.snapshot_interval,
+                                        fsync_policy=FsyncPolicy.from_str(self.settings.fsync),
+                                        serializer=get_serializer(self.settings.format))
+
+        try:
+            self.engine = open_engine(self.settings, seed, self.state_logger, self.msg_logger)
+        except StateError:
+            self.msg_logger.close()
+            raise
+        self.engine.subscribe(lambda record, _: self.damage.add_action(record))
 
         self.window = curses.initscr()
-
-        self.bid_edit_win = None  # would love to type hint, but class is private
-        self.bid_box = None  # type: Optional[Fextbox]
-        self.convert_edit_win = None  # would love to type hint, but class is private
-        self.convert_box = None  # type: Optional[Fextbox]
-        self.input_textbox_cols = 20
-        self.log_textbox = None  # type: Optional[Fextbox]
-        self.log_win = None  # would love to type hint, but class is private
-        self.log_textbox_row = 0
-        # max amount of messages to keep in UI log
-        self.log_textbox_row_limit = 10
-        self.log_textbox_cols = 60
+        self.profile = profile
+        self.frame_stats = FrameStats()
+        self.layout = self.compute_layout()
+
+        # windows and textboxes are allocated once, and moved when the terminal is resized
+        self.bid_edit_win, self.bid_box = self.make_textbox(self.layout.bid_box)
+        self.convert_edit_win, self.convert_box = self.make_textbox(self.layout.convert_box)
+        self.log_win, self.log_textbox = self.make_textbox(self.layout.log_box, insert_mode=False)
         self.log_textbox_msgs = []  # type: List[Message]
 
         # window row state; ui is generated procedurally
-        self.cur_row = self.WINDOW_TOP_MARGIN
+        self.cur_row = self.layout.header_row
 
-        # output msg state; row is set once ui is generated
-        self.msg = None  # type: Optional[Message]
-        self.msg_output_row = 0
+        # retained drawing state; only damaged regions are repainted after the first frame
+        self.damage = Damage()
+        # (column, width) of text drawn on dynamic rows, such that it can be blanked before redrawing
+        self.drawn_extents = {}  # type: Dict[int, tuple]
 
-        # stat menu state; set once help text is generated
-        self.stat_menu_row = 0
-
-        # legend menu state; set once stat menu is generated
-        self.legend_menu_row = 0
-
-        self.n_chores_per_team = math.ceil(len(self.chores) / len(self.teams))
+        # output msg state
+        self.msg = None  # type: Optional[Message]
 
         # ensure terminal supports colours before enabling
         if curses.has_colors():
@@ -111,74 +189,146 @@ class UI:
         curses.curs_set(0)
 
         self.draw_ui()
-        self.window.refresh()
-        self.event_loop()
+
+    def close(self):
+        """
+        Flush and close logs
+        """
+        if self.profile:
+            print(self.frame_stats, file=sys.stderr)
+        # the state log comes first, as it is needed to resume the auction
+        self.state_logger.close()
+        self.msg_logger.close()
 
     def draw_ui(self):
         """
-        Procedurally draw terminal UI
+        Procedurally draw the full terminal UI. Static text is only drawn here, while regions
+        that change are repainted by UI.redraw once damaged
         """
+        self.window.erase()
+        self.drawn_extents.clear()
+
         self.draw_help_text()
         self.draw_stat_menu()
         self.draw_legend_menu()
         # reset current row
-        self.cur_row = self.WINDOW_TOP_MARGIN
+        self.cur_row = self.layout.header_row
 
-        # draw header elements
+        # draw static header elements; auction and bid rows are drawn by UI.draw_header
         for elem in self.HEADER_ELEMS:
-            if elem['text'] == 'auction':
-                if self.cur_auction:
-                    self.center_text("Current auction: " +
-                                     self.cur_auction.__str__(), elem['attr'])
-                else:
-                    self.center_text("Done!", elem['attr'])
-                continue
-            elif elem['text'] == 'bid':
-                if self.cur_auction:
-                    self.center_text(f"Highest bidder: {self.cur_auction.bidder} "
-                                     f"({self.cur_auction.current_bid} / {self.cur_auction.current_bid_str})", elem['attr'])
-                else:
-                    self.center_text("-", elem['attr'])
+            if elem['text'] in ('auction', 'bid'):
+                self.cur_row += 1
                 continue
 
             self.center_text(elem['text'], elem['attr'])
 
-        # draw team table
-        for i in range(len(self.teams)):
-            attr = curses.color_pair(constants.COLOUR_SUCCESS_MSG) \
-                if len(self.teams[i].chores) >= self.n_chores_per_team else 0
-            self.center_text(self.teams[i].ui_row_string(), attr=attr)
+        # skip team table, drawn by UI.draw_team_row
+        self.cur_row += len(self.engine.teams)
 
         self.center_text(self.HR)
 
         # draw text boxes
-        self.text_box_text("Place bid", "left", curses.A_UNDERLINE)
-        self.text_box_text("Convert", "right", curses.A_UNDERLINE)
-        self.bid_edit_win, self.bid_box = self.make_textbox(
-            1, self.input_textbox_cols, self.cur_row + 2, curses.COLS // 2 - int(self.input_textbox_cols * 1.5))
-        self.convert_edit_win, self.convert_box = self.make_textbox(
-            1, self.input_textbox_cols, self.cur_row + 2, curses.COLS // 2 + self.input_textbox_cols // 2)
-
-        # textboxes are thicc, so add plenty spacing
-        self.msg_output_row = self.cur_row + 5
-        self.log_textbox_row = self.cur_row + 7
+        self.text_box_text("Place bid", "left", curses.A_UNDERLINE, self.layout.textbox_text_row)
+        self.text_box_text("Convert", "right", curses.A_UNDERLINE, self.layout.textbox_text_row)
+        self.draw_textbox_border(self.layout.bid_box)
+        self.draw_textbox_border(self.layout.convert_box)
 
         # draw output log textbox
-        self.center_text('Output log', curses.A_UNDERLINE, self.log_textbox_row)
-        self.log_win, self.log_textbox = self.make_textbox(
-            self.log_textbox_row_limit, self.log_textbox_cols, self.log_textbox_row + 3,
-            curses.COLS // 2 - self.log_textbox_cols // 2, insert_mode=False
-        )
-
-        # draw log messages in log textbox
-        log_row = 0
-        for msg in self.log_textbox_msgs:
-            self.log_win.addstr(log_row, 0, msg.txt, msg.attr)
-            log_row += 1
+        self.center_text('Output log', curses.A_UNDERLINE, self.layout.log_text_row)
+        self.draw_textbox_border(self.layout.log_box)
+
+        self.damage.add(*Damage.ALL)
+        self.damage.teams.update(range(len(self.engine.teams)))
+        self.redraw()
+
+    def redraw(self):
+        """
+        Repaint damaged regions, and push all changes to the terminal in a single update
+        """
+        if Damage.HEADER in self.damage:
+            self.draw_header()
+        if Damage.TEAMS in self.damage:
+            for team_id in sorted(self.damage.teams):
+                self.draw_team_row(team_id)
+        if Damage.STATS in self.damage:
+            self.draw_stat_menu()
+        if Damage.MSG in self.damage:
+            self.draw_msg()
+
+        self.window.noutrefresh()
+        # sub windows are refreshed AFTER main window, otherwise their text is yeeted by black magic
+        if Damage.INPUT in self.damage:
+            self.bid_edit_win.noutrefresh()
+            self.convert_edit_win.noutrefresh()
+        if Damage.LOG in self.damage:
+            self.draw_log()
+        curses.doupdate()
+
+        self.damage.clear()
+        self.frame_stats.frame_drawn()
+
+    def compute_layout(self) -> Layout:
+        return Layout.compute(curses.COLS, len(self.HEADER_ELEMS), len(self.engine.teams),
+                              len(self.CMD_MENU), self.STAT_MENU_ROWS)
+
+    def resize(self):
+        """
+        Recompute layout for the new terminal size, move windows accordingly and redraw everything
+        """
+        curses.update_lines_cols()
+        self.layout = self.compute_layout()
+        for win, box in ((self.bid_edit_win, self.layout.bid_box),
+                         (self.convert_edit_win, self.layout.convert_box),
+                         (self.log_win, self.layout.log_box)):
+            try:
+                win.mvwin(box.y, box.x)
+            except curses.error:
+                # window doesn't fit in terminal; keep it in place until terminal is large enough
+                pass
+        self.draw_ui()
 
-        # draw output message from action, if present
-        if self.msg:
-            self.center_text(self.msg.txt, attr=self.msg.attr, row=self.msg_output_row)
+    def draw_header(self):
+        """
+        Draw current auction and highest bid
+        """
+        texts = [x['text'] for x in self.HEADER_ELEMS]
+        auction_row = self.layout.header_row + texts.index('auction')
+        auction_attr = self.HEADER_ELEMS[texts.index('auction')]['attr']
+        bid_row = self.layout.header_row + texts.index('bid')
+        bid_attr = self.HEADER_ELEMS[texts.index('bid')]['attr']
+        cur_auction = self.engine.cur_auction
+
+        if cur_auction:
+            self.redraw_text("Current auction: " + cur_auction.__str__(), auction_row, auction_attr)
+            self.redraw_text(f"Highest bidder: {cur_auction.bidder} "
+                             f"({cur_auction.current_bid} / {cur_auction.current_bid_str})", bid_row, bid_attr)
+        else:
+            self.redraw_text("Done!", auction_row, auction_attr)
+            self.redraw_text("-", bid_row, bid_attr)
+
+    def draw_team_row(self, team_id: int):
+        """
+        Draw row of team table, highlighted once the team has all of its chores
+        """
+        team = self.engine.teams[team_id]
+        attr = curses.color_pair(constants.COLOUR_SUCCESS_MSG) \
+            if len(team.chores) >= self.engine.n_chores_per_team else 0
+        self.redraw_text(team.ui_row_string(self.rates, self.coin_str_len), self.layout.team_table_row + team_id, attr)
+
+    def draw_msg(self):
+        """
+        Draw output message from last action, or blank the row if there is none
+        """
+        self.redraw_text(self.msg.txt if self.msg else '', self.layout.msg_output_row, self.msg.attr if self.msg else 0)
+
+    def draw_log(self):
+        """
+        Draw log messages in log textbox
+        """
+        self.log_win.erase()
+        for log_row, msg in enumerate(self.log_textbox_msgs):
+            self.log_win.addstr(log_row, 0, msg.txt, msg.attr)
+        self.log_win.noutrefresh()
 
     def event_loop(self):
         """
@@ -189,6 +339,8 @@ class UI:
         """
         while True:
             action = self.window.getch()
+            if self.msg:
+                self.damage.add(Damage.MSG)
             self.msg = None
 
             if action == ord('b'):
@@ -206,17 +358,22 @@ class UI:
             elif action == ord('p'):
                 self._revert_last_auction_action()
 
+            elif action == ord('u'):
+                self._undo_action()
+
+            elif action == ord('y'):
+                self._redo_action()
+
+            elif action == curses.KEY_RESIZE:
+                self.resize()
+
             self.log_last_message()
-            self.state_logger.log_state(self.teams, self.auctions, self.completed_auctions, self.cur_auction)
+            if self.msg:
+                self.damage.add(Damage.MSG)
 
-            self.window.clear()
-            self.draw_ui()
             # re-hide cursor in case we entered edit mode in previous action
             curses.curs_set(0)
-            self.window.refresh()
-            # log window needs to be refreshed AFTER main window, otherwise all text
-            # is yeeted by black magic
-            self.log_win.refresh()
+            self.redraw()
 
     def _bid_action(self):
         """
@@ -231,46 +388,22 @@ class UI:
             # esc is pressed
             pass
 
-        elif InputValidation.validate_bid_instant_win(msg):
-            team_id = self.parse_instant_win_bid(msg)
-            if team_id > len(self.teams):
-                self.msg = Message(f"Error: team{team_id} does not exist",
-                                   attr=curses.color_pair(constants.COLOUR_ERR_MSG))
-            else:
-                team = self.teams[team_id]
-                if not team.has_free_win:
-                    self.msg = Message(f"Error: team{team.id} has already used their instant win",
-                                       attr=curses.color_pair(constants.COLOUR_ERR_MSG))
-                else:
-                    self.msg = self.cur_auction.instant_win(team)
-                    self._prepare_next_auction()
-
-        elif InputValidation.validate_bid_input(msg):
-            team_id, bid = self.parse_bid(msg.strip())
-            if team_id > len(self.teams):
-                self.msg = Message(f"Error: team{team_id} does not exist",
-                                   attr=curses.color_pair(constants.COLOUR_ERR_MSG))
-            else:
-                normalized_msg = ':'.join(x if x else '0' for x in msg.split()[1].split(':')).strip()
-                self.msg = self.cur_auction.try_bid(bid, self.teams[team_id], normalized_msg,
-                                                    self.cfg.auction_min_overbid_factor())
-
-        elif InputValidation.validate_bid_freebie(msg):
-            team_id = self.parse_freebie_bid(msg)
-            if sum(1 for x in self.teams if not len(x.chores) == self.n_chores_per_team) > 1:
-                self.msg = Message(f"Error: more than 1 team still needs chores - freebie can't be used yet",
-                                   attr=curses.color_pair(constants.COLOUR_ERR_MSG))
-            elif team_id > len(self.teams):
-                self.msg = Message(f"Error: team{team_id} does not exist",
-                                   attr=curses.color_pair(constants.COLOUR_ERR_MSG))
-            else:
-                self.msg = self.cur_auction.freebie(self.teams[team_id])
-                self._prepare_next_auction()
-
         else:
-            self.msg = Message(f"Error: input not valid ({msg.strip()}). Check command menu for syntax.",
-                               attr=curses.color_pair(constants.COLOUR_ERR_MSG))
-        self.bid_edit_win.clear()
+            command = parse_bid_command(msg)
+            if isinstance(command, Bid):
+                self.msg = self.engine.bid(command.team, command.value(self.rates), command.bid_str,
+                                           command.timestamp(time.time()))
+            elif isinstance(command, InstantWin):
+                self.msg = self.engine.instant_win(command.team)
+                self._finish_if_done()
+            elif isinstance(command, Freebie):
+                self.msg = self.engine.freebie(command.team)
+                self._finish_if_done()
+            else:
+                self.msg = Message(f"Error: input not valid ({msg.strip()}), {command}. "
+                                   f"Check command menu for syntax.", colour=constants.COLOUR_ERR_MSG)
+        self.bid_edit_win.erase()
+        self.damage.add(Damage.INPUT)
 
     def _convert_action(self):
         """
@@ -284,15 +417,18 @@ class UI:
         if not msg:
             # esc is pressed
             pass
-        elif InputValidation.validate_convert_input(msg):
-            value = self.parse_conversion(msg.strip())
-            normalized_msg = ':'.join(x if x else '0' for x in msg.split(':')).strip()
-            self.msg = Message(f"\"{normalized_msg}\" is {value} coins",
-                               attr=curses.color_pair(constants.COLOUR_SUCCESS_MSG))
         else:
-            self.msg = Message(f"Error: input not valid ({msg.strip()}). Check command menu for syntax.",
-                               attr=curses.color_pair(constants.COLOUR_ERR_MSG))
-        self.bid_edit_win.clear()
+            command = parse_convert_command(msg)
+            if isinstance(command, Convert):
+                value = command.value(self.rates)
+                self.msg = Message(f"\"{command.conversion_str}\" is {value} coins",
+                                   colour=constants.COLOUR_SUCCESS_MSG,
+                                   action='convert', bid=value)
+            else:
+                self.msg = Message(f"Error: input not valid ({msg.strip()}), {command}. "
+                                   f"Check command menu for syntax.", colour=constants.COLOUR_ERR_MSG)
+        self.convert_edit_win.erase()
+        self.damage.add(Damage.INPUT)
 
     def _sell_chore_action(self):
         """
@@ -300,12 +436,8 @@ class UI:
 
         Sell the current auction to the current highest bidder and setup the next auction.
         """
-        if self.cur_auction.bidder:
-            self.msg = self.cur_auction.complete_auction()
-            self._prepare_next_auction()
-        else:
-            self.msg = Message(f"Error: no bids have been made on auction",
-                               attr=curses.color_pair(constants.COLOUR_ERR_MSG))
+        self.msg = self.engine.sell()
+        self._finish_if_done()
 
     def _reset_auction_action(self):
         """
@@ -313,40 +445,43 @@ class UI:
 
         Reset the state of the current auction
         """
-        self.cur_auction.reset_bids()
-        self.msg = Message('Reset current auction state',
-                           attr=curses.color_pair(constants.COLOUR_SUCCESS_MSG))
+        self.msg = self.engine.reset()
 
     def _revert_last_auction_action(self):
-        if len(self.completed_auctions) > 0:
-            self.auctions.insert(0, self.cur_auction)
-            self.cur_auction = self.completed_auctions.pop()
-            # if bid is not present, instant win was used
-            if self.cur_auction.current_bid == -1:
-                self.cur_auction.bidder.has_free_win = True
-            else:
-                self.cur_auction.bidder.coins += self.cur_auction.current_bid
-            self.cur_auction.bidder.chores.pop()
-            self.cur_auction.reset_bids()
-            self.msg = Message('Reverted last auction',
-                               attr=curses.color_pair(constants.COLOUR_SUCCESS_MSG))
-        else:
-            self.msg = Message('Error: no auctions have been completed',
-                               attr=curses.color_pair(constants.COLOUR_ERR_MSG))
+        """
+        Revert auction action. Triggered by the 'p' key.
 
-    def _prepare_next_auction(self):
-        if not self.auctions:
-            # no more auctions remain
-            OutputWriter.write_to_pdf(self.teams)
-            self.msg = Message('All chores have been sold. MD saved to run dir.',
-                               attr=curses.color_pair(constants.COLOUR_SUCCESS_MSG))
-            self.completed_auctions.append(self.cur_auction)
-            self.cur_auction = None
-            return
+        Revert the last completed auction and make it the current auction
+        """
+        self.msg = self.engine.revert()
+
+    def _undo_action(self):
+        """
+        Undo action. Triggered by the 'u' key.
 
-        self.completed_auctions.append(self.cur_auction)
-        self.cur_auction = self.auctions[0]
-        del self.auctions[0]
+        Undo the last action, e.g., a single bid or a sale
+        """
+        self.msg = self.engine.undo()
+
+    def _redo_action(self):
+        """
+        Redo action. Triggered by the 'y' key.
+
+        Redo the last undone action
+        """
+        self.msg = self.engine.redo()
+        self._finish_if_done()
+
+    def _finish_if_done(self):
+        """
+        Save the result once the last auction has been completed
+        """
+        if self.msg.outcome.is_success and self.engine.is_done():
+            OutputWriter.write_to_pdf(self.engine.teams, self.engine.stats)
+            # keep the message of the final sale in the logs
+            self.log_last_message()
+            self.msg = Message('All chores have been sold. MD saved to run dir.',
+                               colour=constants.COLOUR_SUCCESS_MSG)
 
     def center_text(self, txt: str, attr: int = 0, row: int = 0):
         """
@@ -358,6 +493,18 @@ class UI:
         self.window.addstr(row if row else self.cur_row, curses.COLS // 2 - len(txt) // 2, txt, attr)
         self.cur_row += 1
 
+    def redraw_text(self, txt: str, row: int, attr: int = 0):
+        """
+        Draw :param txt with center alignment at :param row, blanking any text previously drawn at the row
+        """
+        if row in self.drawn_extents:
+            col, width = self.drawn_extents[row]
+            self.window.addstr(row, col, ' ' * width)
+
+        col = curses.COLS // 2 - len(txt) // 2
+        self.window.addstr(row, col, txt, attr)
+        self.drawn_extents[row] = (col, len(txt))
+
     def left_margin_text(self, txt: str, row: int, attr: int = 0) -> int:
         """
         Draw :param txt with left alignment
@@ -365,7 +512,8 @@ class UI:
         :param row: row index to print the text at
         :param attr: any attributes of the text (e.g., bold font or colour)
         """
-        self.window.addstr(row, 0, txt, attr)
+        # pad to the width of the menus, such that text of a redrawn row is overwritten
+        self.window.addstr(row, 0, txt.ljust(len(self.HR)), attr)
         row += 1
         return row
 
@@ -378,73 +526,35 @@ class UI:
         :param row: row index to print the text at
         """
         col = curses.COLS // 2 - len(txt) // 2
-        col = col - self.input_textbox_cols if alignment == 'left' else col + self.input_textbox_cols
+        col = col - Layout.INPUT_BOX_COLS if alignment == 'left' else col + Layout.INPUT_BOX_COLS
         self.window.addstr(row if row else self.cur_row, col, txt, attr)
 
-    def make_textbox(self, h: int, w: int, y: int, x: int, insert_mode: bool = True):
-        """
-        Generate a textbox with input dimensions and location
-        """
-        win = curses.newwin(h, w, y, x)
-        box = Fextbox(win, insert_mode=insert_mode)
-        rectangle(self.window, y-1, x-1, y+h, x+w)
-
-        return win, box
-
-    @staticmethod
-    def parse_bid(bid: str) -> tuple:
-        """
-        Parse bid string input from bid Textbox. Doesn't include any validation, and should as such
-        be called after its' corresponding InputValidation handler
-        """
-        rates = [constants.HIGH_VALUE, constants.MID_VALUE, constants.LOW_VALUE]
-        team_id, bid_str = bid.split(' ')
-        currency_bids = [int(x) if x else '' for x in bid_str.split(',')]
-        bid_int = sum(cash * rate for cash, rate in zip(currency_bids, rates) if cash) or 0
-
-        return int(team_id), bid_int
-
-    @staticmethod
-    def parse_instant_win_bid(bid: str) -> int:
-        """
-        Parse instant win bid string input from bid Textbox. Doesn't include any validation,
-        and should as such be called after its' corresponding InputValidation handler
+    def make_textbox(self, box: Box, insert_mode: bool = True):
         """
-        return int(bid.split()[0])
-
-    @staticmethod
-    def parse_freebie_bid(bid: str) -> int:
-        """
-        Parse freebie bid string input from bid Textbox. Doesn't include any validation,
-        and should as such be called after its' corresponding InputValidation handler
+        Allocate a textbox with the dimensions and location of :param box
         """
-        return int(bid.split()[0])
+        win = curses.newwin(box.h, box.w, box.y, box.x)
+        self.frame_stats.window_allocated()
 
-    @staticmethod
-    def parse_conversion(conversion: str) -> int:
-        """
-        Parse conversion string input from bid Textbox. Doesn't include any validation, and should
-        as such be called after its' corresponding InputValidation handler
-        """
-        rates = [constants.HIGH_VALUE, constants.MID_VALUE, constants.LOW_VALUE]
-        conversions = [int(x) if x else '' for x in conversion.split(',')]
-        value = sum(cash * rate for cash, rate in zip(conversions, rates) if cash) or 0
+        return win, Fextbox(win, insert_mode=insert_mode)
 
-        return value
+    def draw_textbox_border(self, box: Box):
+        rectangle(self.window, box.y - 1, box.x - 1, box.y + box.h, box.x + box.w)
 
     def log_last_message(self):
-        if len(self.log_textbox_msgs) >= 10:
+        if len(self.log_textbox_msgs) >= Layout.LOG_BOX_ROWS:
             _ = self.log_textbox_msgs.pop()
 
         if self.msg:
             self.log_textbox_msgs.insert(0, self.msg)
             self.msg_logger.log_msg(self.msg)
+            self.damage.add(Damage.LOG)
 
     def draw_help_text(self):
         """
-        Draw help text in UI and setup initial statistics text row
+        Draw help text in UI
         """
-        cur_row = self.left_margin_text('Command menu', 1, curses.A_UNDERLINE)
+        cur_row = self.left_margin_text('Command menu', self.layout.TOP_MARGIN, curses.A_UNDERLINE)
         cur_row = self.left_margin_text(self.HR, cur_row)
 
         for cmd in self.CMD_MENU:
@@ -453,46 +563,43 @@ class UI:
             else:
                 cur_row = self.left_margin_text(f'\t{cmd["help"]}', cur_row)
 
-        self.stat_menu_row = cur_row + 3
-
     def draw_stat_menu(self):
         """
         Draw statistics menu
         """
-        cur_row = self.stat_menu_row
+        cur_row = self.layout.stat_menu_row
 
         cur_row = self.left_margin_text('Statistics', cur_row, curses.A_UNDERLINE)
         cur_row = self.left_margin_text(self.HR, cur_row)
 
-        # +1 because we delete after current auction is selected
-        auctions_left = len(self.auctions) + (1 if self.cur_auction else 0)
-        auctions_done = len(self.completed_auctions)
-        secrets_left = sum(1 for x in self.auctions if x.is_secret)
-        free_chores_left = sum(1 for x in self.auctions if x.chore.desc == 'Fritjans')
+        stats = self.engine.stats
+        auctions_left = self.engine.queue.n_left
+        auctions_done = self.engine.queue.n_completed
         cur_row = self.left_margin_text(common.string_with_spacing(f'Total auctions:', spacing=30) + f'{auctions_left + auctions_done}', cur_row)
         cur_row = self.left_margin_text(common.string_with_spacing(f'Auctions left:', spacing=30) + f'{auctions_left}', cur_row)
         cur_row = self.left_margin_text(common.string_with_spacing(f'Auctions done:', spacing=30) + f'{auctions_done}', cur_row)
-        cur_row = self.left_margin_text(common.string_with_spacing(f'Secrets left:', spacing=30) + f'{secrets_left}', cur_row)
-        cur_row = self.left_margin_text(common.string_with_spacing(f'Free chores left:', spacing=30) + f'{free_chores_left}', cur_row)
-        cur_row = self.left_margin_text(common.string_with_spacing(f'Chores per team:', spacing=30) + f'{self.n_chores_per_team}', cur_row)
-
-        self.legend_menu_row = cur_row + 3
+        cur_row = self.left_margin_text(common.string_with_spacing(f'Secrets left:', spacing=30) + f'{stats.secrets_left}', cur_row)
+        cur_row = self.left_margin_text(common.string_with_spacing(f'Free chores left:', spacing=30) + f'{stats.free_chores_left}', cur_row)
+        cur_row = self.left_margin_text(common.string_with_spacing(f'Chores per team:', spacing=30) + f'{self.engine.n_chores_per_team}', cur_row)
+        cur_row = self.left_margin_text(common.string_with_spacing('Teams satisfied:', spacing=30) + f'{stats.teams_satisfied} / {len(self.engine.teams)}', cur_row)
+        cur_row = self.left_margin_text(common.string_with_spacing('Coins in circulation:', spacing=30) + f'{stats.coins_in_circulation}', cur_row)
+        self.left_margin_text(common.string_with_spacing('Average price:', spacing=30) + f'{stats.average_price:.0f}', cur_row)
 
     def draw_legend_menu(self):
-        cur_row = self.legend_menu_row
+        cur_row = self.layout.legend_menu_row
 
         cur_row = self.left_margin_text('Legend', cur_row, curses.A_UNDERLINE)
         cur_row = self.left_margin_text(self.HR, cur_row)
 
         high = f'{common.string_with_spacing("High:", spacing=15)}' \
-               f'{common.string_with_spacing(self.cfg.currency_high_name())}{constants.HIGH_VALUE}'
+               f'{common.string_with_spacing(self.settings.high_name)}{self.rates.high}'
         cur_row = self.left_margin_text(high, cur_row)
         mid = f'{common.string_with_spacing("Mid:", spacing=15)}' \
-              f'{common.string_with_spacing(self.cfg.currency_mid_name())}{constants.MID_VALUE}'
+              f'{common.string_with_spacing(self.settings.mid_name)}{self.rates.mid}'
         cur_row = self.left_margin_text(mid, cur_row)
         low = f'{common.string_with_spacing("Low:", spacing=15)}' \
-              f'{common.string_with_spacing(self.cfg.currency_low_name())}{constants.LOW_VALUE}'
+              f'{common.string_with_spacing(self.settings.low_name)}{self.rates.low}'
         cur_row = self.left_margin_text(low, cur_row)
         instant_win = f'{common.string_with_spacing("Instant win:", spacing=15)}' \
-                      f'{common.string_with_spacing(self.cfg.currency_instant_win_name())}'
+                      f'{common.string_with_spacing(self.settings.instant_win_name)}'
         cur_row = self.left_margin_text(instant_win, cur_row)
\ No newline at end of file
@@ -11,7 +11,7 @@ class InputValidation:
     def validate_bid_input(cls, bid: str) -> bool:
         """
         Validate bid Textbox input
-        Should match InputValidation.BID_PATTERN, e.g., "2 3:2:0", "5 :10:"
+        Should match InputValidation.BID_PATTERN, e.g., "2 3,2,0", "5 ,10,"
         """
         return bool(re.match(cls.BID_PATTERN, bid.strip()))
 
@@ -35,6 +35,6 @@ class InputValidation:
     def validate_convert_input(cls, conversion: str) -> bool:
         """
         Validate conversion Textbox input
-        Should match InputValidation.CONVERT_PATTERN, e.g., "6::9", "4:20:"
+        Should match InputValidation.CONVERT_PATTERN, e.g., "6,,9", "4,20,"
         """
         return bool(re.match(cls.CONVERT_PATTERN, conversion.strip()))
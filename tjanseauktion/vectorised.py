@@ -0,0 +1,311 @@
+from . import constants
+from .auction import Auction
+from .catalog import day_key
+from .chore import Chore
+from .outcome import Outcome
+from .simulation import PacingBot, SimulationParams, SimulationSummary, StrategyTotals
+
+import functools
+import itertools
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# outcomes of try_bids, indexed by the codes it returns
+OUTCOMES = (Outcome.OK, Outcome.OVERRIDE, Outcome.BID_TOO_LOW, Outcome.BIDDER_HAS_LEAD, Outcome.CANT_AFFORD,
+            Outcome.OVERBID_TOO_LOW)
+NO_TEAM = -1
+# bidding orders are drawn from every order of the teams up to this many teams, and by sorting random keys above
+MAX_LISTED_ORDERS = 8
+
+
+def min_bids(current_bids: np.ndarray, overbid_factor: float) -> np.ndarray:
+    """
+    Auction.min_bid of many auctions
+    """
+    return np.maximum(current_bids + 1, (current_bids + current_bids * overbid_factor).astype(np.int64))
+
+
+def try_bids(current_bids: np.ndarray, bidders: np.ndarray, bids: np.ndarray, teams: np.ndarray, coins: np.ndarray,
+             overbid_factor: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Auction.try_bid of many independent auctions at once, checking the rules in the same order
+    :param current_bids: highest bid of each auction
+    :param bidders: team ID of the highest bidder of each auction, NO_TEAM if there are no bids
+    :param bids: bid placed on each auction by the team in :param teams, which has :param coins
+    :return: outcome codes, see OUTCOMES, and the highest bids and bidders after the bids
+    """
+    current_bids = np.asarray(current_bids, dtype=np.int64)
+    bids = np.asarray(bids, dtype=np.int64)
+    same_bidder = bidders == teams
+
+    codes = np.select(
+        [same_bidder & (bids >= current_bids),
+         bids <= current_bids,
+         same_bidder,
+         coins < bids,
+         bids < (current_bids + current_bids * overbid_factor).astype(np.int64)],
+        [1, 2, 3, 4, 5],
+        default=0
+    )
+    accepted = codes <= 1
+
+    return codes, np.where(accepted, bids, current_bids), np.where(accepted, teams, bidders)
+
+
+def buy(coins: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """
+    Team.buy of many teams: coins are only deducted where the team can afford the price
+    :return: whether each purchase was made
+    """
+    can_afford = coins >= prices
+    coins -= np.where(can_afford, prices, 0)
+    return can_afford
+
+
+def bid_ladder(max_bid: int, overbid_factor: float) -> np.ndarray:
+    """
+    Every lowest accepted bid when bidding from 0 up to :param max_bid, see Auction.min_bid
+    """
+    ladder = [0]
+    while ladder[-1] <= max_bid:
+        ladder.append(Auction.min_bid(ladder[-1], overbid_factor))
+    return np.array(ladder, dtype=np.int64)
+
+
+def run_bidding(limits: np.ndarray, is_late: np.ndarray, orders: np.ndarray, overbid_factor: float,
+                max_bid: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    simulation.run_bidding of many independent auctions at once, ending with the same highest bidder and bid.
+    Rather than following every bid, bidding is resolved in two passes over the teams in bidding order.
+
+    Early bots enter one at a time: each outbids the bot still bidding until one of them drops out, which ends at
+    the highest lowest accepted bid within the lower limit, looked up on the bid ladder. The bot left bids once
+    if it isn't in the lead. After that at most one early bot is still bidding, so late bots jump in at their
+    limits one at a time, each answered by a single bid of the early bot, until no team bids anymore.
+
+    Teams are tracked by their column in the bidding order.
+    :param limits: limit of each team (columns) on each auction (rows)
+    :param is_late: whether each team is played by a late bot, see Bot.IS_LATE
+    :param orders: order in which teams are asked to bid on each auction
+    :param max_bid: upper bound of the limits, to share the bid ladder between calls
+    :return: highest bid and bidder of each auction, NO_TEAM if no bids were placed
+    """
+    n, n_teams = limits.shape
+    rows = np.arange(n)
+    # limits of the early and late bots by column in the bidding order, one contiguous row per column, as take is
+    # many times slower with a transposed index
+    flat_orders = np.ascontiguousarray(orders.T) + rows * n_teams
+    early_limits = (limits * ~is_late).astype(np.int32).ravel().take(flat_orders)
+    late_limits = (limits * is_late).ravel().take(flat_orders)
+    ladder, value_steps = _ladder_steps(int(limits.max(initial=0)) if max_bid is None else max_bid,
+                                        overbid_factor)
+
+    # the early bot still bidding and its limit, 0 if there is none, which are updated arithmetically rather
+    # than with np.where, as selecting by random masks is several times slower
+    champions = np.zeros(n, dtype=np.int32)
+    champion_limits = np.zeros(n, dtype=np.int32)
+    leaders = np.full(n, NO_TEAM, dtype=np.int32)
+    # prices stay on the ladder while only early bots bid
+    steps = np.zeros(n, dtype=np.int32)
+    next_bids = ladder.take(steps + 1)
+
+    for col, col_limits in enumerate(early_limits):
+        enters = col_limits >= next_bids
+        fights = enters & (champion_limits > 0)
+        # the bot not in the lead bids first, and the bots take turns until the lower limit is reached
+        n_bids = value_steps.take(np.minimum(champion_limits, col_limits)) - steps
+        col_leads = (leaders == champions) == ((n_bids & 1) == 1)
+        leaders += fights * (champions + col_leads * (col - champions) - leaders)
+        steps += fights * n_bids
+        # the bot with the higher limit keeps bidding, if it can afford the next bid. A bot entering without
+        # a fight always can
+        higher_limits = np.maximum(champion_limits, col_limits)
+        next_bids = ladder.take(steps + 1)
+        survives = higher_limits >= next_bids
+        champions += (enters & survives & (col_limits > champion_limits)) * (col - champions)
+        champion_limits += enters * (higher_limits * survives - champion_limits)
+
+    single = (champion_limits > 0) & (champions != leaders)
+    leaders += single * (champions - leaders)
+    prices = ladder.take(steps + single).astype(np.int64)
+
+    # late bots, on the auctions where any of them can bid
+    idx = np.flatnonzero(late_limits.max(axis=0) >= min_bids(prices, overbid_factor))
+    cols = np.arange(n_teams)[:, None]
+    while len(idx):
+        bids = min_bids(prices[idx], overbid_factor)
+        candidates = (late_limits[:, idx] >= bids) & (cols != leaders[idx])
+        late_cols = candidates.argmax(axis=0)
+        jumps = candidates[late_cols, np.arange(len(idx))]
+        idx, late_cols = idx[jumps], late_cols[jumps]
+
+        jump_prices = late_limits[late_cols, idx]
+        answers = min_bids(jump_prices, overbid_factor)
+        answered = champion_limits[idx] >= answers
+        prices[idx] = np.where(answered, answers, jump_prices)
+        leaders[idx] = np.where(answered, champions[idx], late_cols)
+        # prices only rise, so an early bot which can't answer is out for good
+        champion_limits[idx[~answered]] = 0
+
+    return prices, np.where(leaders == NO_TEAM, NO_TEAM, orders.ravel().take(rows * n_teams + leaders))
+
+
+@functools.lru_cache()
+def _ladder_steps(max_bid: int, overbid_factor: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    :return: bid ladder up to :param max_bid, and the step on it of the highest bid within each value
+    """
+    ladder = bid_ladder(max_bid, overbid_factor).astype(np.int32)
+    return ladder, (np.searchsorted(ladder, np.arange(ladder[-1]), side='right') - 1).astype(np.int32)
+
+
+@functools.lru_cache()
+def _all_orders(n_teams: int) -> np.ndarray:
+    # the smallest type keeps the table in cache
+    return np.array(list(itertools.permutations(range(n_teams))), dtype=np.int8)
+
+
+def _orders(n_runs: int, n_teams: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    :return: random order of the teams for each of :param n_runs auctions, drawn from every order of the teams as
+    picking rows is many times faster than sorting. Single precision keys sort twice as fast as double, and the odd
+    tie barely biases the order.
+    """
+    if n_teams <= MAX_LISTED_ORDERS:
+        all_orders = _all_orders(n_teams)
+        return all_orders.take(rng.integers(len(all_orders), size=n_runs), axis=0).astype(np.int64)
+    return rng.random((n_runs, n_teams), dtype=np.float32).argsort(axis=1)
+
+
+def _caps(start_coins: int, max_needed: int) -> np.ndarray:
+    """
+    Bot.limit of a team valuing the chore above all its coins, by whether it plays GreedyBot (or PacingBot or
+    one of its subclasses otherwise), the number of chores it needs and its coins. The limit on a chore is the
+    lower of its value and the cap, and looking caps up beats computing them for every team and auction.
+    """
+    coins = np.arange(start_coins + 1)
+    n_needed = np.arange(max_needed + 1)[:, None]
+    paced = np.minimum((coins / np.maximum(n_needed, 1) * PacingBot.SLACK).astype(np.int64), coins)
+    greedy = np.broadcast_to(coins, paced.shape)
+    # teams which need no more chores don't bid
+    return np.stack([paced, greedy]) * (n_needed > 0)
+
+
+def simulate(chores: List[Chore], params: SimulationParams, n_runs: int, seed: int = 0,
+             batch_size: int = 10000, summary: Optional[SimulationSummary] = None) -> SimulationSummary:
+    """
+    simulation.simulate_auction of :param n_runs auctions at once, :param batch_size auctions per step, with
+    the bots and chore valuations of the scalar simulation. Only the secret and free auctions matter to the
+    bots, so chores are reduced to their position in the auction order.
+    """
+    summary = summary or SimulationSummary()
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_runs, batch_size):
+        _simulate_batch(chores, params, min(batch_size, n_runs - start), rng, summary)
+    return summary
+
+
+def _simulate_batch(chores: List[Chore], params: SimulationParams, n_runs: int, rng: np.random.Generator,
+                    summary: SimulationSummary):
+    n_teams = params.n_teams
+    names = [params.strategies[i % len(params.strategies)] for i in range(n_teams)]
+    is_late = np.array([x == 'sniper' for x in names])
+    is_greedy = np.array([x == 'greedy' for x in names])
+    wants_instant_win = np.array([x == 'instant-win' for x in names])
+
+    # auctions as generated by Auction.create_auctions: free chores are appended, and chores of the day order go first
+    n_chores_per_team = math.ceil(len(chores) / n_teams)
+    n_free = (n_chores_per_team * n_teams) % len(chores)
+    n_auctions = len(chores) + n_free
+    by_day = day_key(params.day_order)
+    day_ranks = np.array([by_day(x.day) for x in chores] + [by_day('')] * n_free)
+    is_free = np.array([x.desc == constants.FREE_CHORE_DESC for x in chores] + [True] * n_free)
+    is_secret = (np.arange(n_auctions) >= len(chores))[None, :].repeat(n_runs, axis=0)
+    secrets = rng.random((n_runs, len(chores))).argsort(axis=1)[:, :params.n_secrets]
+    np.put_along_axis(is_secret, secrets, True, axis=1)
+    positions = (rng.random((n_runs, n_auctions)) + day_ranks).argsort(axis=1)
+    is_secret = np.take_along_axis(is_secret, positions, axis=1).T
+    is_free = is_free[positions].T
+
+    fair_price = params.start_coins / n_chores_per_team
+    popularity = rng.uniform(.5, 1.5, (n_auctions, n_runs, 1))
+
+    rows = np.arange(n_runs)
+    caps = _caps(params.start_coins, n_chores_per_team).ravel()
+    cap_offsets = is_greedy * (n_chores_per_team + 1) * (params.start_coins + 1)
+    coins = np.full((n_runs, n_teams), params.start_coins, dtype=np.int64)
+    n_chores = np.zeros((n_runs, n_teams), dtype=np.int64)
+    has_free_win = np.ones((n_runs, n_teams), dtype=bool)
+    utility = np.zeros((n_runs, n_teams))
+    prices = []
+
+    for i in range(n_auctions):
+        # values are drawn auction by auction, which is faster than for all auctions at once as they stay in cache
+        values = fair_price * popularity[i] * rng.uniform(.75, 1.25, (n_runs, n_teams))
+        values = np.where(is_free[i, :, None], 2 * fair_price, values)
+        seen = np.where(is_secret[i, :, None], int(fair_price), values.astype(np.int64))
+
+        n_needed = n_chores_per_team - n_chores
+        limits = np.minimum(seen, caps.take(cap_offsets + n_needed * (params.start_coins + 1) + coins))
+        orders = _orders(n_runs, n_teams, rng)
+        flat_orders = orders + rows[:, None] * n_teams
+
+        price, leader = run_bidding(limits, is_late, orders, params.overbid_factor, params.start_coins)
+
+        # InstantWinBot.wants_instant_win, asked in the bidding order
+        wants = (wants_instant_win & has_free_win & (n_needed > 0) & (np.arange(n_teams) != leader[:, None])
+                 & (price[:, None] >= limits) & (seen > price[:, None]))
+        ordered_wants = wants.ravel().take(flat_orders)
+        col = ordered_wants.argmax(axis=1)
+        has_instant_win = ordered_wants.ravel().take(rows * n_teams + col)
+        instant_winner = orders.ravel().take(rows * n_teams + col)
+
+        sold = ~has_instant_win & (leader != NO_TEAM)
+        bought = np.zeros(n_runs, dtype=bool)
+        winner_coins = coins[rows[sold], leader[sold]]
+        bought[sold] = buy(winner_coins, price[sold])
+        coins[rows[sold], leader[sold]] = winner_coins
+        prices.append(price[bought])
+
+        winner = np.where(has_instant_win, instant_winner, leader)
+        # nobody could bid: the team needing chores the most gets the chore. Few auctions end like that, so
+        # only those are looked at
+        given = np.flatnonzero(~has_instant_win & ~sold)
+        needing = n_needed[given] > 0
+        n_needing = needing.sum(axis=1)
+        candidates = np.where(needing | (n_needing == 0)[:, None], n_chores[given], np.iinfo(np.int64).max)
+        winner[given] = candidates.argmin(axis=1)
+
+        has_free_win[rows[has_instant_win], instant_winner[has_instant_win]] = False
+        flat_winners = rows * n_teams + winner
+        n_chores.ravel()[flat_winners] += 1
+        utility.ravel()[flat_winners] += values.ravel().take(flat_winners) / (fair_price * n_chores_per_team)
+
+        summary.n_instant_wins += int(has_instant_win.sum())
+        summary.n_unsold += int((n_needing > 1).sum())
+        summary.n_freebies += int((n_needing <= 1).sum())
+
+    paid, counts = np.unique(np.concatenate(prices), return_counts=True)
+    summary.prices.update(dict(zip(paid.tolist(), counts.tolist())))
+    summary.n_runs += n_runs
+    summary.n_auctions += n_runs * n_auctions
+    summary.gini_sum += float(ginis(utility).sum())
+    for t, name in enumerate(names):
+        totals = summary.strategies.setdefault(name, StrategyTotals())
+        totals.n_teams += n_runs
+        totals.utility += float(utility[:, t].sum())
+        totals.coins_left += int(coins[:, t].sum())
+        totals.unused_instant_wins += int(has_free_win[:, t].sum())
+
+
+def ginis(values: np.ndarray) -> np.ndarray:
+    """
+    simulation.gini of each row of :param values
+    """
+    n = values.shape[1]
+    totals = values.sum(axis=1)
+    weighted = (np.sort(values, axis=1) * np.arange(1, n + 1)).sum(axis=1)
+    safe = np.where(totals > 0, totals, 1)
+    return np.where(totals > 0, 2 * weighted / (n * safe) - (n + 1) / n, 0.)